@@ -0,0 +1,120 @@
+
+import os
+import os.path
+import json
+
+########################################################################
+#
+# Performance baselines.
+#
+# A baseline file is JSON, mapping `"<day> part <N> <input> (<python>)"`
+# to the stored timing for that job under that interpreter:
+# ```
+#   {
+#       "day_15 part 1 day_15.input (CPython 3.11.7)": {
+#           "day": "day_15", "part": 1, "input": "day_15.input",
+#           "python": "CPython 3.11.7",
+#           "median": <seconds>, "spread": <seconds>, "runs": <count>
+#       },
+#       ...
+#   }
+# ```
+#
+# A run is a regression when its median solve time is more than
+# `threshold` (a fraction) slower than the baseline median, and the
+# slowdown is also at least `min_delta` seconds -- the second condition
+# keeps sub-millisecond sample runs from tripping the gate on noise.
+
+default_threshold = 0.25
+
+default_min_delta = 0.005
+
+########################################################################
+#
+# Statistics.
+
+def median(values):
+    ordered = sorted(values)
+    middle = len(ordered) // 2
+    return (
+                ordered[middle]
+                if len(ordered) % 2
+                else (ordered[middle - 1] + ordered[middle]) / 2.0
+            )
+
+def median_absolute_deviation(values):
+    centre = median(values)
+    return median([abs(value - centre) for value in values])
+
+########################################################################
+#
+# Loading and saving.
+
+# Records of a day's other engines (see the runner's `engines`) are kept
+# apart from its reference engine's, and records of each interpreter
+# (see the runner's `--python`) apart from the others', as their timings
+# are not comparable.
+
+def baseline_key(record):
+    return '{} part {} {}{}{}'.format(
+                record['day'], record['part'], record['input'],
+                '' if record.get('engine', 'reference') in (None, 'reference') else ' [{}]'.format(record['engine']),
+                '' if record.get('python') is None else ' ({})'.format(record['python'])
+            )
+
+def load_baseline(filename):
+    if not os.path.exists(filename):
+        return {}
+    with open(filename) as baseline_file:
+        return json.load(baseline_file)
+
+# Store the successful records of a run, replacing the entries for the
+# same jobs and keeping the entries for any other jobs.
+
+def save_baseline(filename, records):
+
+    baseline = load_baseline(filename)
+
+    baseline.update(
+                (
+                    baseline_key(record),
+                    {
+                        'day': record['day'],
+                        'part': record['part'],
+                        'input': record['input'],
+                        'python': record.get('python'),
+                        'median': record['solve_time'],
+                        'spread': record.get('spread') or 0.0,
+                        'runs': len(record.get('solve_times') or [record['solve_time']]),
+                    }
+                )
+                for record in records
+                if record['status'] == 'ok' and record['solve_time'] is not None
+            )
+
+    temporary_filename = '{}.tmp'.format(filename)
+    with open(temporary_filename, 'w') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2, separators=(',', ': '), sort_keys=True)
+        baseline_file.write('\n')
+    os.rename(temporary_filename, filename)
+
+########################################################################
+#
+# Compare a record against the baseline, setting its `baseline_time`
+# and `regression` fields.  Records with no baseline entry, or which did
+# not run successfully, are left with `regression` of `None`.
+
+def compare_to_baseline(record, baseline, threshold=default_threshold, min_delta=default_min_delta):
+
+    entry = baseline.get(baseline_key(record))
+
+    if entry is None or record['status'] != 'ok' or record['solve_time'] is None:
+        return record
+
+    record['baseline_time'] = entry['median']
+    record['regression'] = (
+                record['solve_time'] > entry['median'] * (1 + threshold)
+                and record['solve_time'] - entry['median'] >= min_delta
+            )
+
+    return record
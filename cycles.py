@@ -0,0 +1,197 @@
+
+import itertools
+
+import snapshots
+
+from support import range
+
+########################################################################
+#
+# Cycle detection for iterated processes.
+#
+# Several days iterate a process far too many times to run it out (to
+# generation 50000000000, or 1000000000), relying on it settling into a
+# cycle, and each used to find the cycle its own way: by comparing each
+# state with the previous one only, or by searching a growing list of
+# earlier states.  The functions here find the cycle of any process
+# given as:
+#
+#   *   `start`, the initial state (step 0);
+#
+#   *   `step(state)`, which returns the next state;
+#
+#   *   `key(state)`, which returns a hashable value identifying the
+#       state for the purposes of the cycle (the state itself by
+#       default).  Two states with the same key must have the same
+#       successors' keys; a state may carry more than its key (an
+#       offset, say) as long as the key alone decides what comes next.
+#
+# A cycle is returned as `(prefix, period)`: the states from step
+# `prefix` on repeat every `period` steps, and `prefix` is the first
+# step that is part of the cycle.
+#
+# There are two modes:
+#
+#   *   'hash' records the step at which each key was first seen, and
+#       stops at the first key seen twice.  It steps the process exactly
+#       `prefix + period` times, and keeps every key (and, for
+#       `state_at`, every state) seen on the way.
+#
+#   *   'brent' is Brent's algorithm, which keeps only a couple of
+#       states, at the cost of stepping the process two to three times
+#       as often.  It suits processes with very long prefixes or periods
+#       or very large states.
+#
+# Hash mode also answers a slightly different question: the first step
+# whose key was seen before, which is what a process wants when its key
+# is some value it produces rather than a whole state (see `hash_cycle`).
+#
+# `limit` bounds the number of steps taken looking for a cycle; if no
+# cycle is found in that many steps, the functions return `None`.
+
+modes = ('hash', 'brent')
+
+def identity(state):
+    return state
+
+########################################################################
+#
+# Hash mode.
+#
+# Returns `(prefix, period, state)`, where `state` is the state at step
+# `prefix + period`, the first state whose key was seen before (at step
+# `prefix`).  When `history` is a list, the states from step 0 up to
+# (but not including) that state are appended to it.
+#
+# With snapshots on (see `snapshots`), a long search saves its state,
+# its keys seen and its history, and resumes from them.
+
+def hash_cycle(start, step, key=identity, limit=None, history=None):
+
+    seen = {}
+    state = start
+    first = 0
+    clock = None
+
+    if snapshots.active():
+        stream = snapshots.stream_key('hash_cycle', step, start, key, history is not None)
+        found = snapshots.resume(stream)
+        if found is not None and (limit is None or found[0] <= limit):
+            (first, (state, seen, saved_history)) = found
+            if history is not None:
+                history.extend(saved_history)
+        clock = snapshots.new_clock()
+
+    for step_num in (itertools.count(first) if limit is None else range(first, limit + 1)):
+        state_key = key(state)
+        if state_key in seen:
+            return (seen[state_key], step_num - seen[state_key], state)
+        seen[state_key] = step_num
+        if history is not None:
+            history.append(state)
+        state = step(state)
+        if clock is not None and snapshots.due(clock):
+            snapshots.save(stream, step_num + 1, (state, seen, history if history is not None else []))
+
+    return None
+
+########################################################################
+#
+# Brent mode.
+#
+# Find the period first, by moving a "hare" ahead of a "tortoise" which
+# jumps to the hare at each power of two, until the hare meets the
+# tortoise; then find the prefix by starting a tortoise at step 0 and a
+# hare `period` steps ahead, and moving them together until they meet.
+
+def brent_cycle(start, step, key=identity, limit=None):
+
+    power = period = 1
+    steps_taken = 1
+    tortoise_key = key(start)
+    hare = step(start)
+
+    while key(hare) != tortoise_key:
+        if limit is not None and steps_taken >= limit:
+            return None
+        if power == period:
+            tortoise_key = key(hare)
+            power *= 2
+            period = 0
+        hare = step(hare)
+        period += 1
+        steps_taken += 1
+
+    tortoise = hare = start
+    for _ in range(period):
+        hare = step(hare)
+
+    prefix = 0
+    while key(tortoise) != key(hare):
+        tortoise = step(tortoise)
+        hare = step(hare)
+        prefix += 1
+
+    return (prefix, period)
+
+########################################################################
+#
+# Find the cycle of a process, as `(prefix, period)`.
+
+def find_cycle(start, step, key=identity, mode='hash', limit=None):
+
+    if mode == 'hash':
+        cycle = hash_cycle(start, step, key, limit)
+        return cycle[:2] if cycle is not None else None
+
+    if mode == 'brent':
+        return brent_cycle(start, step, key, limit)
+
+    raise ValueError('unknown cycle detection mode {!r} (expected one of {})'.format(mode, ', '.join(modes)))
+
+########################################################################
+#
+# The earliest step whose state has the same key as step `n`'s, given
+# the process's cycle: `n` itself if `n` comes before the end of the
+# first period, otherwise the matching step in the first period.
+
+def equivalent_step(n, cycle):
+    (prefix, period) = cycle
+    return n if n < prefix + period else prefix + (n - prefix) % period
+
+# The states of a process from step 0 on.
+
+def iterate(start, step):
+    state = start
+    while True:
+        yield state
+        state = step(state)
+
+########################################################################
+#
+# The state at step `n` of a process, for any `n` however large.
+#
+# The state returned is the one at `equivalent_step(n, cycle)`, which
+# is the state at step `n` itself if the key is the whole state; if the
+# state carries more than its key, anything beyond the key is the
+# caller's to extrapolate (see day 12).
+#
+# A cycle already found for the process may be passed in as `cycle`, in
+# which case the process is stepped from the start up to the equivalent
+# step rather than searched again.
+
+def state_at(start, step, n, key=identity, mode='hash', cycle=None):
+
+    if cycle is None and mode == 'hash':
+        history = []
+        found = hash_cycle(start, step, key, n, history)
+        if found is None:
+            return history[n]
+        return history[equivalent_step(n, found[:2])]
+
+    if cycle is None:
+        cycle = find_cycle(start, step, key, mode, n)
+        if cycle is None:
+            cycle = (n + 1, 1)
+
+    return next(itertools.islice(iterate(start, step), equivalent_step(n, cycle), None))
@@ -0,0 +1,330 @@
+
+import os
+import os.path
+import sys
+import json
+import signal
+import socket
+import timeit
+import tempfile
+import hashlib
+import argparse
+import threading
+import traceback
+import collections
+import multiprocessing
+
+try:
+    import socketserver
+except ImportError:
+    import SocketServer as socketserver
+
+import runner
+import support
+import disk_cache
+
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
+########################################################################
+#
+# Long-lived solver daemon.
+#
+# Starting an interpreter and importing a solver costs more than many of
+# the solves themselves, so the daemon imports every `day_NN` module
+# once, forks worker processes which inherit the warm modules, and then
+# serves requests over a Unix domain socket.
+#
+# The protocol is JSON lines: a client sends one JSON object per line,
+# and gets one JSON object per line back, in order.  A request is:
+# ```
+#   {
+#       "day": "day_05" | "05" | 5, "part": 1|2,
+#       "input": <puzzle input text>  or  "path": <input filename>,
+#       "arguments": [<extra part arguments>]   (optional)
+#   }
+# ```
+# and the response is:
+# ```
+#   {
+#       "day": "day_05", "part": 1, "status": "ok"|"error",
+#       "result": <answer>, "error": <message or traceback>,
+#       "parse_time": <seconds>, "solve_time": <seconds>,
+#       "cache": "hit"|"miss", "parse_cache": "memory"|null
+#   }
+# ```
+# Without `arguments`, parts that take extra arguments get the ones the
+# runner uses for real inputs (see `runner.part_arguments`).
+#
+# Results are cached in the daemon, keyed by the day, part, arguments
+# and SHA-256 of the input, and each worker keeps its most recently
+# parsed inputs; both caches are bounded LRU caches.  Each worker is a
+# pool of one process, and every request for an input goes to the same
+# worker, chosen by the input's SHA-256, so the part 2 request following
+# a part 1 request reuses the input parsed for part 1.  Requests for
+# different inputs are spread across the workers.
+#
+# The modules are not reloaded, so the daemon must be restarted to pick
+# up changes to a solver.
+#
+# The socket lives in the user's runtime directory (`$XDG_RUNTIME_DIR`,
+# or the temporary directory), not among the cached results, where
+# evicting old entries could remove it; its name is unique to the
+# checkout, so daemons for different checkouts do not collide.
+
+runtime_directory = os.environ.get('XDG_RUNTIME_DIR') or tempfile.gettempdir()
+
+default_socket = os.path.join(
+            runtime_directory,
+            'solver-daemon-{}.sock'.format(hashlib.sha256(runner.base_directory.encode('utf-8')).hexdigest()[:12]),
+        )
+
+result_cache_size = 4096
+
+parsed_cache_size = 16
+
+########################################################################
+#
+# Bounded LRU cache.
+
+def lru_get(cache, key):
+    if key not in cache:
+        return None
+    value = cache.pop(key)
+    cache[key] = value
+    return value
+
+def lru_put(cache, key, value, size):
+    cache.pop(key, None)
+    cache[key] = value
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+########################################################################
+#
+# Worker side: parse (or reuse) the input and solve one part.
+#
+# Inline input arrives as text; solvers with `mapped_input` parse bytes,
+# the rest parse `str`, which in Python 2 are the same thing.  Inputs
+# given by path are loaded the same way the runner loads them.
+
+parsed_inputs = collections.OrderedDict()
+
+def input_data(text, mapped):
+    data = text.encode('utf-8')
+    return data if mapped or bytes is str else data.decode('utf-8')
+
+def solve(day, part, digest, text, path, arguments):
+
+    response = { 'day': day, 'part': part, 'parse_time': None, 'solve_time': None, 'parse_cache': None }
+
+    try:
+
+        module = runner.load_day(day)
+        mapped = getattr(module, 'mapped_input', False)
+
+        parsed = lru_get(parsed_inputs, (day, digest))
+        if parsed is not None:
+            parsed_data, response['parse_time'] = parsed
+            response['parse_cache'] = 'memory'
+        else:
+            t = timeit.default_timer()
+            parsed_data = (
+                        support.parse_input(module.process_input_data, path, mapped)
+                        if path is not None
+                        else module.process_input_data(input_data(text, mapped))
+                    )
+            response['parse_time'] = timeit.default_timer() - t
+            lru_put(parsed_inputs, (day, digest), (parsed_data, response['parse_time']), parsed_cache_size)
+
+        t = timeit.default_timer()
+        response['result'] = getattr(module, 'part_{}'.format(part))(parsed_data, *arguments)
+        response['solve_time'] = timeit.default_timer() - t
+        response['status'] = 'ok'
+
+    except Exception:
+
+        response['status'] = 'error'
+        response['error'] = traceback.format_exc()
+
+    return response
+
+########################################################################
+#
+# Daemon side: validate a request, answer it from the result cache or
+# hand it to the input's worker.  A request which cannot be answered,
+# for whatever reason, gets an error response, so that it never costs
+# the client its connection.
+
+def input_worker(server, digest):
+    return server.workers[int(digest, 16) % len(server.workers)]
+
+def bad_request(message):
+    return { 'status': 'error', 'error': message }
+
+def handle_request(server, request):
+
+    try:
+        day = runner.parse_day(str(request['day']))
+        part = int(request['part'])
+    except Exception:
+        return bad_request('a request needs a valid "day" and "part"')
+
+    if day not in server.days or part not in (1, 2):
+        return bad_request('no solver for {} part {}'.format(day, part))
+
+    text, path = request.get('input'), request.get('path')
+    if (text is None) == (path is None):
+        return bad_request('a request needs exactly one of "input" and "path"')
+    if not isinstance(text if text is not None else path, string_types):
+        return bad_request('"input" and "path" must be strings')
+    if not isinstance(request.get('arguments', []), list):
+        return bad_request('"arguments" must be a list')
+
+    try:
+        digest = (
+                    hashlib.sha256(text.encode('utf-8')).hexdigest()
+                    if text is not None
+                    else disk_cache.file_digest(path)
+                )
+    except (IOError, OSError) as error:
+        return bad_request('cannot read {}: {}'.format(path, error))
+
+    arguments = tuple(request.get('arguments', runner.part_arguments.get((day, part), {}).get('input', ())))
+
+    key = (day, part, digest, arguments)
+    with server.cache_lock:
+        cached = lru_get(server.results, key)
+    if cached is not None:
+        return dict(cached, cache='hit')
+
+    response = input_worker(server, digest).apply(solve, (day, part, digest, text, path, arguments))
+    response['cache'] = 'miss'
+
+    if response['status'] == 'ok':
+        with server.cache_lock:
+            lru_put(server.results, key, response, result_cache_size)
+
+    return response
+
+class RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in iter(self.rfile.readline, b''):
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError:
+                response = bad_request('request is not valid JSON')
+            else:
+                try:
+                    response = handle_request(self.server, request)
+                except Exception:
+                    response = bad_request(traceback.format_exc())
+            self.wfile.write((json.dumps(response, sort_keys=True, default=repr) + '\n').encode('utf-8'))
+            self.wfile.flush()
+
+class SolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+
+    daemon_threads = True
+
+########################################################################
+#
+# Start the daemon: import every solver, fork the workers, and serve
+# until interrupted.  Solvers which fail to import (for example for want
+# of an optional dependency) are left out.
+
+def serve(socket_path=default_socket, workers=None):
+
+    days = []
+    for day in runner.discover_days():
+        try:
+            runner.load_day(day)
+            days.append(day)
+        except Exception:
+            sys.stderr.write('{}: not available: {}\n'.format(day, traceback.format_exc().splitlines()[-1]))
+
+    workers = [multiprocessing.Pool(1) for _ in range(workers or multiprocessing.cpu_count())]
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    if not os.path.isdir(os.path.dirname(socket_path)):
+        os.makedirs(os.path.dirname(socket_path))
+
+    server = SolverServer(socket_path, RequestHandler)
+    server.days = set(days)
+    server.workers = workers
+    server.results = collections.OrderedDict()
+    server.cache_lock = threading.Lock()
+
+    sys.stderr.write('serving {} days on {}\n'.format(len(days), socket_path))
+
+    # Shut down cleanly, removing the socket, when terminated as well as
+    # when interrupted.
+
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        for worker in workers:
+            worker.terminate()
+        os.remove(socket_path)
+
+########################################################################
+#
+# Client: send requests to a running daemon, yielding each response.
+
+def send_requests(requests, socket_path=default_socket):
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    connection.connect(socket_path)
+
+    try:
+        stream = connection.makefile('rwb')
+        for request in requests:
+            stream.write((json.dumps(request) + '\n').encode('utf-8'))
+            stream.flush()
+            yield json.loads(stream.readline())
+    finally:
+        connection.close()
+
+########################################################################
+#
+# Command line: `daemon.py serve` starts the daemon; `daemon.py request`
+# reads JSON request lines from stdin and writes the responses to stdout.
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Serve the day_NN solvers over a Unix domain socket.')
+    parser.add_argument('command', choices=('serve', 'request'))
+    parser.add_argument('--socket', default=default_socket,
+                        help='socket path (default: %(default)s)')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='number of worker processes (default: number of cores)')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        serve(args.socket, args.workers)
+    else:
+        def requests():
+            for line_num, line in enumerate(sys.stdin, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    parser.error('line {} of the requests is not valid JSON'.format(line_num))
+        for response in send_requests(requests(), args.socket):
+            sys.stdout.write(json.dumps(response, sort_keys=True) + '\n')
+            sys.stdout.flush()
+
+if __name__ == '__main__':
+
+    main()
@@ -0,0 +1,129 @@
+
+import sys
+import array
+import argparse
+
+import support
+import integers
+import day_01
+
+########################################################################
+#
+# The `fast` engine for day 1 (see the runner's `engines`).
+#
+# `day_01.py` finds part 2's first repeated frequency by going round the
+# adjustments, remembering every frequency reached, until one comes up
+# twice.  When the drift (the total of the adjustments) is small next to
+# the spread of the frequencies, that takes thousands of passes and
+# keeps millions of frequencies.  This engine works it out from a
+# single pass instead, in time O(n log n) for n adjustments.
+#
+# The adjustments are parsed straight from a memory-mapped buffer, a
+# chunk at a time, into an array of 64-bit integers (see `integers`),
+# rather than split into a list of strings.
+
+mapped_input = True
+
+def process_input_data(input_data):
+    return integers.from_buffer(input_data)
+
+def part_1(input_data):
+    return sum(input_data)
+
+########################################################################
+#
+# Part 2.
+#
+# Let `p[i]` be the frequency after the first `i` adjustments (for `i`
+# from 1 to n, so `p[n]` is the drift `D`).  Pass `m` reaches `p[i] + m*D`
+# after `m*n + i` adjustments.
+#
+# A repeat within the first pass comes before any other, so look for
+# one first.  Otherwise (and with `D` non-zero), `p[i] + m*D` comes back
+# to an earlier frequency only as some `p[j] = p[i] + t*D`, `t >= 1`
+# passes later, which takes `p[j]` in the same residue modulo `D` as
+# `p[i]`, and further along in the direction of the drift.  So group the
+# first pass's frequencies by residue, sort each group in the direction
+# of the drift, and pair each frequency with the next one in its group:
+# the pair `(p[i], p[j])` repeats `p[j]` after `t*n + i` adjustments,
+# and the first repeat is the pair with the fewest.
+#
+# A drift of 0 repeats within two passes, which is left to `day_01`
+# (the reference engine); with no pair at all, no frequency ever repeats
+# and the answer is `None`.
+
+def first_pass_repeat(frequencies):
+    seen = set()
+    for frequency in frequencies:
+        if frequency in seen:
+            return frequency
+        seen.add(frequency)
+    return None
+
+def prefix_sums(adjustments):
+    frequencies = array.array(integers.typecode)
+    frequency = 0
+    for adjustment in adjustments:
+        frequency += adjustment
+        frequencies.append(frequency)
+    return frequencies
+
+def part_2(input_data):
+
+    frequencies = prefix_sums(input_data)
+    drift = frequencies[-1]
+
+    repeat = first_pass_repeat(frequencies)
+    if repeat is not None:
+        return repeat
+
+    if drift == 0:
+        return day_01.part_2(input_data)
+
+    # with a negative drift, work with the frequencies negated, so the
+    # drift is positive and frequencies come back to larger ones
+    sign = 1 if drift > 0 else -1
+    drift *= sign
+
+    ordered = sorted(
+                ((sign * frequency) % drift, sign * frequency, index)
+                for (index, frequency) in enumerate(frequencies, 1)
+            )
+
+    repeats = [
+                ((later - frequency) // drift * len(frequencies) + index, sign * later)
+                for ((residue, frequency, index), (later_residue, later, _)) in zip(ordered, ordered[1:])
+                if residue == later_residue
+            ]
+
+    return min(repeats)[1] if repeats else None
+
+########################################################################
+#
+# Streaming mode, for frequency logs too large to read whole: given
+# files, part 1 sums each one a chunk at a time, in bounded memory, and
+# part 2 loads its adjustments through the binary cache, so solving it
+# again skips the parsing.
+
+def stream_main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Solve day 1 for large frequency logs.')
+    parser.add_argument('files', metavar='FILE', nargs='+',
+                        help='frequency logs')
+    parser.add_argument('--part', dest='parts', type=int, choices=(1, 2), action='append',
+                        help='part to solve; may be repeated (default: both)')
+    parser.add_argument('--cache-dir', metavar='DIR', default=integers.default_directory,
+                        help='binary cache directory (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    for filename in args.files:
+        for part in sorted(set(args.parts or (1, 2))):
+            result = integers.total(filename) if part == 1 else part_2(integers.load(filename, args.cache_dir))
+            sys.stdout.write('{}: part {} = {}\n'.format(filename, part, result))
+
+if __name__ == '__main__':
+
+    if len(sys.argv) > 1:
+        stream_main()
+    else:
+        support.main(__file__, process_input_data, part_1, part_2, mapped=mapped_input)
@@ -1,6 +1,7 @@
 
-import sys
-import itertools
+import support
+
+from support import reduce
 
 # process the input data into a list of words (box ids)
 
@@ -13,7 +14,7 @@ def count_letters_in_word(word):
     return reduce(
                 lambda lettercounts, letter:
                     dict(
-                        lettercounts.items()
+                        list(lettercounts.items())
                         + [ (letter, lettercounts.get(letter, 0) + 1) ]
                     ),
                 word,
@@ -56,25 +57,43 @@ def part_1(input_data):
 def identical_letters(word1, word2):
     return ''.join(letter1 for (letter1, letter2) in zip(word1, word2) if letter1 == letter2)
 
-def part_2(input_data):
-    box_id_identical_part = [
-            identical_part
-            for (word1, word2) in itertools.combinations(input_data, 2)
-            for identical_part in [identical_letters(word1, word2)]
-            if len(identical_part) + 1 == len(word1)
-                and len(identical_part) + 1 == len(word2)
-        ][0]
-    return box_id_identical_part
+# Find every pair of words which differ in exactly one position, in the
+# order `itertools.combinations` would give them.
+#
+# Comparing every pair of words costs O(n^2 * L) for n words of length
+# L.  Instead, for each position, index the words by the word with that
+# position's letter masked out: two words land in the same bucket just
+# when they agree everywhere but (at most) that position, so any bucket
+# holding two different words gives a match.  Each of the n * L masked
+# words takes O(L) to build and hash, so that is O(n * L^2) overall,
+# far less than comparing pairs when there are many more words than
+# letters in each (box ids have 26).  One position is indexed at a time,
+# so the index holds n words at once, not n * L.
 
-if __name__ == '__main__':
+def matching_pairs(input_data):
+    pairs = []
+    for position in range(max(len(word) for word in input_data) if input_data else 0):
+        buckets = {}
+        for (index, word) in enumerate(input_data):
+            if position < len(word):
+                buckets.setdefault(word[:position] + word[position + 1:], []).append(index)
+        pairs.extend(
+                    (index1, index2)
+                    for bucket in buckets.values()
+                    if len(bucket) > 1
+                    for (number, index1) in enumerate(bucket)
+                    for index2 in bucket[number + 1:]
+                    if input_data[index1] != input_data[index2]
+                )
+    return [(input_data[index1], input_data[index2]) for (index1, index2) in sorted(pairs)]
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-    sample_data_2 = process_input_data(open(__file__.rsplit('.')[0] + '.sample.2').read())
+# Return the letters the first matching pair of words has in common,
+# or with `all_pairs`, every matching pair of words.
 
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data_2))
+def part_2(input_data, all_pairs=False):
+    pairs = matching_pairs(input_data)
+    return pairs if all_pairs else identical_letters(*pairs[0])
 
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
+if __name__ == '__main__':
 
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2)
@@ -1,26 +1,34 @@
 
 import re
-import sys
-import itertools
+import support
+
+from support import reduce
+
+# parse the input straight from a memory-mapped buffer (see `support`)
+
+mapped_input = True
+
+# process the input data into a list of claims (see `claims` below)
 
 def process_input_data(input_data):
-    return input_data
+    return list(claims(input_data))
 
 def claims(input_data):
 
     # input format is single multi-line string with claims of the form:
     #   <id> @ <x>,<y>: <w>x<h>
 
-    re_id_format = re.compile(r'''#(?P<id>[0-9]+) *@ *(?P<x>[0-9]+) *, *(?P<y>[0-9]+) *: *(?P<w>[0-9]+) *x *(?P<h>[0-9]+)''')
+    re_id_format = re.compile(br'''#(?P<id>[0-9]+) *@ *(?P<x>[0-9]+) *, *(?P<y>[0-9]+) *: *(?P<w>[0-9]+) *x *(?P<h>[0-9]+)''')
 
     # return a generator that returns each rectangle as a dictionary,
-    # mapping values to integers for every field except the id.
+    # mapping values to integers for every field except the id, which is
+    # decoded from the buffer's bytes to a string.
 
     return (
                 dict(
                     (key,int(val))
                     if key != 'id'
-                    else (key,val)
+                    else (key,str(val.decode('ascii')))
                     for (key,val) in match.groupdict().items()
                 )
                 for match in re_id_format.finditer(input_data)
@@ -36,7 +44,7 @@ def claims(input_data):
 # to find the total space occupied by more than one claim.
 
 def part_1(input_data):
-    occupancy_data = claims_to_occupancy_data(claims(input_data))
+    occupancy_data = claims_to_occupancy_data(input_data)
     return sum(sum(0 if len(occupancy[3]) == 1 else 1 + (occupancy[2] - occupancy[1]) for occupancy in row) for row in occupancy_data)
 
 # Use `claims_to_occupancy_data` to transform the list of claims rectangles
@@ -49,12 +57,12 @@ def part_1(input_data):
 # reduction, and return the first (should be only) claim id.
 
 def part_2(input_data):
-    all_ids = set(claim['id'] for claim in claims(input_data))
+    all_ids = set(claim['id'] for claim in input_data)
     overlapping_ids = reduce(
                 set.union,
                 (
                     set(occupancy[3])
-                    for row in claims_to_occupancy_data(claims(input_data))
+                    for row in claims_to_occupancy_data(input_data)
                     for occupancy in row
                     if len(occupancy[3]) > 1
                 )
@@ -128,10 +136,10 @@ def claims_to_occupancy_data(claims):
                 # same as the current span's row; otherwise, append
                 # the span to the last row of the list of rows.
 
-                lambda rows, (row, start, end, ids):
-                    rows + [ [(row, start, end, ids)] ]
-                    if not rows or rows[-1][0][0] != row
-                    else rows[:-1] + [ rows[-1] + [(row, start, end, ids)] ]
+                lambda rows, span:
+                    rows + [ [span] ]
+                    if not rows or rows[-1][0][0] != span[0]
+                    else rows[:-1] + [ rows[-1] + [span] ]
                 ,
 
                 # start by transforming the list of claims into a list
@@ -212,12 +220,4 @@ def row_to_unique_occupancies(row):
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2, mapped=mapped_input)
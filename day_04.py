@@ -1,7 +1,13 @@
 
 import re
-import sys
 import itertools
+import support
+
+from support import reduce
+
+# parse the input straight from a memory-mapped buffer (see `support`)
+
+mapped_input = True
 
 def process_input_data(input_data):
 
@@ -24,7 +30,7 @@ def process_input_data(input_data):
     # of (asleep,awake) pairs.
 
     # long regular expression to identify the parts of each record
-    re_input_data = re.compile(r'''\[(?P<year>[0-9]+)-(?P<month>[0-9]+)-(?P<date>[0-9]+) (?P<hour>[0-5]?[0-9]):(?P<minute>[0-5]?[0-9])\] (?:Guard #(?P<id>[0-9]+) begins shift|(?P<asleep>falls asleep)|(?P<awake>wakes up))''')
+    re_input_data = re.compile(br'''\[(?P<year>[0-9]+)-(?P<month>[0-9]+)-(?P<date>[0-9]+) (?P<hour>[0-5]?[0-9]):(?P<minute>[0-5]?[0-9])\] (?:Guard #(?P<id>[0-9]+) begins shift|(?P<asleep>falls asleep)|(?P<awake>wakes up))''')
 
     return reduce(
 
@@ -47,16 +53,16 @@ def process_input_data(input_data):
                 #   the new sleep time from the last time the guard
                 #   fell asleep and the current record time).
 
-                lambda (asleep_times, guard_id, fell_asleep), record:
+                lambda state, record: next(
                     (asleep_times, int(record['id']), None)
                     if record['id']
                     else
                         (asleep_times, guard_id, int(record['minute']))
-                        if record['hour'] == '00' and record['asleep']
+                        if record['hour'] == b'00' and record['asleep']
                         else
                             (
                                 dict(
-                                    asleep_times.items()
+                                    list(asleep_times.items())
                                     + [(
                                         guard_id,
                                         asleep_times.get(guard_id, [])
@@ -65,10 +71,11 @@ def process_input_data(input_data):
                                 ),
                                 guard_id,
                                 None
-                            ) if record['hour'] == '00' and record['awake']
+                            ) if record['hour'] == b'00' and record['awake']
                             else
                                 (asleep_times, guard_id, fell_asleep)
-                ,
+                    for (asleep_times, guard_id, fell_asleep) in [state]
+                ),
 
                 # the input to the reduction is a sorted list of guard
                 # records, where a single guard record is a dictionary
@@ -125,7 +132,7 @@ def part_1(input_data):
     # values to counts, and finally uses `max` on the items in that
     # dictionary to identify the minute which occurred most often.
 
-    return (
+    return next(
                 # the return expression
                 (guard * maxminute)
 
@@ -139,9 +146,9 @@ def part_1(input_data):
                     # during which the guard in question was asleep.
 
                     max(
-                        input_data.iteritems(),
-                        key=lambda (key,value):
-                            sum(awake-asleep for (asleep,awake) in value)
+                        input_data.items(),
+                        key=lambda item:
+                            sum(awake-asleep for (asleep,awake) in item[1])
                     )
 
                 ]
@@ -158,19 +165,19 @@ def part_1(input_data):
                     max(
                         reduce(
                             lambda timecounts, minute:
-                                dict(timecounts.items() + [(minute, timecounts.get(minute,0) + 1)])
+                                dict(list(timecounts.items()) + [(minute, timecounts.get(minute,0) + 1)])
                             ,
-                            itertools.chain(*[xrange(*sleeptime) for sleeptime in sleeptimes])
+                            itertools.chain(*[range(*sleeptime) for sleeptime in sleeptimes])
                             ,
                             {}
-                        ).iteritems()
+                        ).items()
                         ,
-                        key = lambda (minute,count):count
+                        key = lambda item:item[1]
                     )
 
                 ]
 
-            ).next()
+            )
 
 def part_2(input_data):
     # identify the guard who has slept most often during any particular
@@ -197,27 +204,19 @@ def part_2(input_data):
                                     for (minute,count) in
                                         reduce(
                                             lambda timecounts, minute:
-                                                dict(timecounts.items() + [(minute, timecounts.get(minute,0) + 1)])
+                                                dict(list(timecounts.items()) + [(minute, timecounts.get(minute,0) + 1)])
                                             ,
-                                            sorted(itertools.chain(*[xrange(*sleeptime) for sleeptime in sleeptimes]))
+                                            sorted(itertools.chain(*[range(*sleeptime) for sleeptime in sleeptimes]))
                                             ,
                                             {}
-                                        ).iteritems()
+                                        ).items()
                                 )
                             )
-                            for (guard, sleeptimes) in input_data.iteritems()
+                            for (guard, sleeptimes) in input_data.items()
                         )
                 )
             )[1]
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2, mapped=mapped_input)
@@ -1,7 +1,7 @@
 
-import re
-import sys
-import itertools
+import support
+
+from support import reduce
 
 def process_input_data(input_data):
     return input_data.strip()
@@ -50,12 +50,4 @@ def part_2(input_data):
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2)
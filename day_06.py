@@ -1,7 +1,9 @@
 
 import re
-import sys
 import itertools
+import support
+
+from support import range, reduce
 
 # Transform the input string into a list of (x,y) tuples
 
@@ -27,10 +29,10 @@ def find_closest_coord(point, coords):
                 #   distance, return the previous distance and None
                 #   as the coordinate (to mark a duplicate).
 
-                lambda (closest_dist, closest_coord), (dist, coord):
-                    (closest_dist, closest_coord) if dist > closest_dist
-                    else (dist, coord) if dist < closest_dist
-                    else (closest_dist, None)
+                lambda closest, current:
+                    closest if current[0] > closest[0]
+                    else current if current[0] < closest[0]
+                    else (closest[0], None)
                 ,
 
                 # for each coordinate, generate the manhattan distance
@@ -99,8 +101,8 @@ def part_1(input_data):
                                         for closest_coord in
                                             (
                                                 (find_closest_coord((x,y), input_data), (x,y))
-                                                for x in xrange(bounds[0][1], bounds[1][0]+1)
-                                                for y in xrange(bounds[0][1], bounds[1][1]+1)
+                                                for x in range(bounds[0][1], bounds[1][0]+1)
+                                                for y in range(bounds[0][1], bounds[1][1]+1)
                                             )
                                         if closest_coord[0][1] is not None
                                     ]
@@ -117,10 +119,10 @@ def part_1(input_data):
                                 if closest_coord[0][1] not in infinite_coords
                             )
                             ,
-                            key = lambda ((dist, coord), point): coord
+                            key = lambda closest_coord: closest_coord[0][1]
                         )
                         ,
-                        key = lambda ((dist, coord), point): coord
+                        key = lambda closest_coord: closest_coord[0][1]
                     )
             )
 
@@ -156,8 +158,8 @@ def part_2(input_data, safe_dist):
                         abs(x-coord[0]) + abs(y-coord[1])
                         for coord in input_data
                     )
-                    for x in xrange(bounds[0][1], bounds[1][0]+1)
-                    for y in xrange(bounds[0][1], bounds[1][1]+1)
+                    for x in range(bounds[0][1], bounds[1][0]+1)
+                    for y in range(bounds[0][1], bounds[1][1]+1)
                 )
                 ,
                 0
@@ -165,12 +167,4 @@ def part_2(input_data, safe_dist):
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data, 32))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data, 10000))
+    support.main(__file__, process_input_data, part_1, part_2, arguments={ 2: { 'sample': (32,), 'input': (10000,) } })
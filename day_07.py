@@ -1,7 +1,8 @@
 
 import re
-import sys
-import itertools
+import support
+
+from support import range, reduce
 
 # Transform the input string into a list of (x,y) tuples
 
@@ -58,10 +59,10 @@ full_predecessors_list = lambda predecessor_list: (
 #       it; for example, `{'B': set(['A', 'C'])}`.  This is a two phase
 #       process:
 
-                        lambda predecessors,(predecessor,successor):
+                        lambda predecessors, step:
                             # use a generator as a trick to be able to create
                             # and reference variables within the expression
-                            (
+                            next(
 
 #   5.  The second phase adds one additional mapping for the current
 #       step's `successor` and the set of the already-known predecessors
@@ -71,7 +72,7 @@ full_predecessors_list = lambda predecessor_list: (
 #       the current step's `predecessor` has a mapping as well.
 
                                 dict(
-                                    new_predecessors.items()
+                                    list(new_predecessors.items())
                                     + [
                                         (
                                             successor,
@@ -86,6 +87,7 @@ full_predecessors_list = lambda predecessor_list: (
                                         )
                                     ]
                                 )
+                                for (predecessor, successor) in [step]
                                 # trick to be able to reference the new dictionary
                                 for new_predecessors in [
 
@@ -107,7 +109,7 @@ full_predecessors_list = lambda predecessor_list: (
                                         predecessors.items()
                                     )
                                 ]
-                            ).next()
+                            )
                         ,
 
 #   2.  Run the reduction across the list of (predecessor, successor)
@@ -119,7 +121,7 @@ full_predecessors_list = lambda predecessor_list: (
 #   1.  The initial state for the reduction is an empty dictionary.
 
                         {}
-                    ).iteritems()
+                    ).items()
             )
         )
 
@@ -161,11 +163,11 @@ def part_1(input_data):
                 ''.join(
                     # use a generator as a trick to be able to create
                     # and reference variables within the expression
-                    (
+                    next(
                         reduce(
-                            lambda (ordered_steps, remaining_steps), _:
+                            lambda state, _:
                                 # same generator trick
-                                (
+                                next(
 
 #   4.  At each reduction step, return a new state that has the first
 #       step from the _sorted_ list of steps added to the ordered list
@@ -182,10 +184,11 @@ def part_1(input_data):
                                             if successor != new_step
                                         ]
                                     )
+                                    for (ordered_steps, remaining_steps) in [state]
                                     for new_step in [
                                         sorted(remaining_steps)[0][1]
                                     ]
-                                ).next()
+                                )
                             ,
 
 #   3.  We know we have to run the reduction once for every step,
@@ -208,7 +211,7 @@ def part_1(input_data):
                             full_predecessors_list(input_data)
 
                         ]
-                    ).next()[0]
+                    )[0]
                 )
             )
 
@@ -244,7 +247,7 @@ def part_1(input_data):
 #
 #   6.  Run the reduction over the `range` of one plus the maximum
 #       number of seconds that the process would take if only one step
-#       could be performed at a time:  `xrange(1 + 60 * num_steps +
+#       could be performed at a time:  `range(1 + 60 * num_steps +
 #       sum(ordinal_step_values))`.  The value of this is called the
 #       `clock`.
 #
@@ -315,7 +318,7 @@ def part_2(input_data, num_workers, step_base_time):
 
     return (
                 # generator trick again
-                (
+                next(
 
 #   2.  Use the following reduction algorithm to generate the steps
 #       taken in time sequence.
@@ -335,7 +338,7 @@ def part_2(input_data, num_workers, step_base_time):
 
 #   7.  At each reduction step, return a new state as follows:
 
-                        lambda (final_time, workers, remaining_steps), clock:
+                        lambda state, clock: next(
 
 #       8.  If the final time is not None, return (final_time, None, [])
 
@@ -346,7 +349,7 @@ def part_2(input_data, num_workers, step_base_time):
 #       9.  Otherwise:
 
                                 # generator trick again
-                                (
+                                next(
 
 #           13. If the list of remaining steps in the interim state
 #               is empty _and_ no workers are working, then the next
@@ -366,7 +369,7 @@ def part_2(input_data, num_workers, step_base_time):
 #               interim state:
 
                                         reduce(
-                                            lambda (next_final_time, next_workers, next_steps), (worker_step, worker_time):
+                                            lambda next_state, worker: next(
 
 #                   17. If the worker's current step is None, the interim
 #                       remaining steps list is not empty, and the first
@@ -404,7 +407,9 @@ def part_2(input_data, num_workers, step_base_time):
                                                     next_workers + [(worker_step, worker_time)],
                                                     next_steps
                                                 )
-                                            ,
+                                                for (next_final_time, next_workers, next_steps) in [next_state]
+                                                for (worker_step, worker_time) in [worker]
+                                            ),
 
 #               16. Run the reduction across the interim state's
 #                   workers list.
@@ -461,17 +466,18 @@ def part_2(input_data, num_workers, step_base_time):
                                             )
                                         ]
                                     ]
-                                ).next()
+                                )
                             )
-                        ,
+                            for (final_time, workers, remaining_steps) in [state]
+                        ),
 
 #   6.  Run the reduction over the `range` of one plus the maximum
 #       number of seconds that the process would take if only one step
-#       could be performed at a time:  `xrange(1 + 60 * num_steps +
+#       could be performed at a time:  `range(1 + 60 * num_steps +
 #       sum(ordinal_step_values))`.  The value of this is called the
 #       `clock`.
 
-                        xrange(
+                        range(
                             1
                             + sum(
                                 step_base_time + step[1]
@@ -507,7 +513,7 @@ def part_2(input_data, num_workers, step_base_time):
                         ]
                     ]
 
-                ).next()
+                )
 
 #   19. When the full reduction is complete, just return the final time
 #       from the reduction state.
@@ -516,12 +522,4 @@ def part_2(input_data, num_workers, step_base_time):
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data, 2, 0))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data, 5, 60))
+    support.main(__file__, process_input_data, part_1, part_2, arguments={ 2: { 'sample': (2, 0), 'input': (5, 60) } })
@@ -1,24 +1,23 @@
 
 import re
-import sys
-import itertools
+import support
+
+from support import range, reduce
+
+DEBUGGING = False
 
-DEBUGGING=False
 if DEBUGGING:
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
+
+    from support import debug_reduce as reduce
+
+# parse the input straight from a memory-mapped buffer (see `support`)
+
+mapped_input = True
 
 # Transform the input string into a list of ints.
 
 def process_input_data(input_data):
-    return list(int(x) for x in input_data.split())
+    return list(int(x) for x in re.findall(br'[0-9]+', input_data))
 
 
 ########################################################################
@@ -146,11 +145,11 @@ build_flat_tree = lambda input_data: (
 
 #   3.  At each step of the reduction:
 
-                lambda (nodelist, nodestack), number:
+                lambda state, number:
 
                     # use the generator trick to allow me to reference
                     # the interim step through a variable name.
-                    (
+                    next(
 
 #   3.  At each step of the reduction:
 
@@ -205,6 +204,7 @@ build_flat_tree = lambda input_data: (
 #           interim stack, the "last node" is the node that is indexed
 #           by the last item in the node stack.
 
+                        for (nodelist, nodestack) in [state]
                         for (interim_nodelist, interim_nodestack) in [
 
 #           5.  If the metadata list of the last node is empty, return
@@ -266,7 +266,7 @@ build_flat_tree = lambda input_data: (
                             )
 
                         ]
-                    ).next()
+                    )
 
                 ,
 
@@ -340,7 +340,7 @@ part_1 = lambda input_data: (
 #   1.  The initial state of the reduction is the node list.
 #
 #   2.  The reduction runs over the list of node indices from last
-#       to first:  `xrange(len(nodelist)-1, -1, -1)`
+#       to first:  `range(len(nodelist)-1, -1, -1)`
 #
 #   3.  At each step of the reduction:
 #
@@ -371,7 +371,7 @@ part_1 = lambda input_data: (
 part_2 = lambda input_data: (
             # use the generator trick to allow me to reference the
             # "flat tree" node list twice:
-            (
+            next(
 
                 reduce(
 
@@ -396,7 +396,7 @@ part_2 = lambda input_data: (
                     # generator trick again, this time just to put the complex
                     # reduction at the end of the expression rather
                     # than in the middle.
-                    (
+                    next(
                         (
                             nodelist[:index]
                             + [ sum_of_children_values ]
@@ -439,13 +439,13 @@ part_2 = lambda input_data: (
                             )
 
                         ]
-                    ).next()
+                    )
 
 #   2.  The reduction runs over the list of node indices from last
-#       to first:  `xrange(len(nodelist)-1, -1, -1)`
+#       to first:  `range(len(nodelist)-1, -1, -1)`
 
                     ,
-                    xrange(len(nodelist)-1, -1, -1)
+                    range(len(nodelist)-1, -1, -1)
 
 #   1.  The initial state of the reduction is the node list.
 
@@ -457,7 +457,7 @@ part_2 = lambda input_data: (
                 for nodelist in [
                     build_flat_tree(input_data)
                 ]
-            ).next()
+            )
 
 #   11. At the end of the reduction, return the first value in the
 #       node list.
@@ -466,14 +466,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    print "sample data: part 2 = {}".format(part_2(sample_data))
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING, mapped=mapped_input)
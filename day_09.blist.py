@@ -1,21 +1,23 @@
 
 import re
-import sys
-import itertools
+import support
 
-from blist import blist
+# `blist` (lists with O(log n) slicing and concatenation) does not build
+# on Python 3.10 and later; without it, this engine runs on plain lists,
+# with the same answers as the reference engine.
+
+try:
+    from blist import blist
+except ImportError:
+    blist = list
+
+from support import reduce
+
+DEBUGGING = False
 
-DEBUGGING=False
 if DEBUGGING:
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
+
+    from support import debug_reduce as reduce
 
 # extract the number of players and highest numbered marble from the input data
 
@@ -74,12 +76,12 @@ process_input_data = lambda input_data: (
 #               (again, wrapping around _one more than_ the length
 #               of the _original_ marble circle).
 
-game_results = lambda (num_players, max_marble): (
+game_results = lambda game: next(
             reduce(
 
 # The reduction state is a tuple of `(scores, circle, index)`, where...
 
-                lambda (scores, circle, index), marble:
+                lambda state, marble: next(
 
 #   3.  The next state depends on the marble number:
 
@@ -144,6 +146,9 @@ game_results = lambda (num_players, max_marble): (
 
                     )
 
+                    for (scores, circle, index) in [state]
+                )
+
 #   1.  The reduction runs across the range of numbers from 1 to
 #       `max_marble`.
 
@@ -164,6 +169,7 @@ game_results = lambda (num_players, max_marble): (
                 )
 
             )
+            for (num_players, max_marble) in [game]
         )
 
 ########################################################################
@@ -185,17 +191,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    for sample_data_set in open(__file__.rsplit('.')[0] + '.sample').readlines():
-        sample_data = process_input_data(sample_data_set)
-
-        print "sample data: part 1 = {}".format(part_1(sample_data))
-        print "sample data: part 2 = {}".format(part_2(sample_data))
-
-        if not DEBUGGING: break
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
-    print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
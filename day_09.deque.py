@@ -0,0 +1,142 @@
+
+import re
+import operator
+import collections
+import support
+
+from support import range, reduce
+
+DEBUGGING = False
+
+if DEBUGGING:
+
+    from support import debug_reduce as reduce
+
+########################################################################
+#
+# The `fast` engine for day 9 (see the runner's `engines`).
+#
+# `day_09.py` keeps the marble circle in a list and rebuilds the list
+# around every marble placed or removed, so a game costs time quadratic
+# in the number of marbles, and part 2's game (a hundred times longer)
+# never finishes.  This engine keeps the circle in a `deque` rotated so
+# that the current marble is always at its right-hand end; placing or
+# removing a marble is then a short rotation and an `append` or `pop`,
+# and a game costs time linear in the number of marbles.
+
+# extract the number of players and highest numbered marble from the input data
+
+process_input_data = lambda input_data: (
+            tuple(int(x) for x in re.match('([0-9]+) players; last marble is worth ([0-9]+) points', input_data).groups())
+        )
+
+########################################################################
+#
+# Generate the game results using a reduction, based on the inputs
+# `num_players` and `max_marble`.
+#
+# The reduction state is a tuple of `(scores, circle)`, where...
+#
+#   *   `scores` is a list containing the score for each player, indexed
+#       from 0 to `num_players - 1`;
+#
+#   *   and `circle` is a `deque` containing the current marble circle,
+#       with subsequent marbles progressing clockwise around the circle,
+#       and the current marble at the right-hand end.
+#
+# Both are updated in place, and the same state is returned from each
+# step.
+#
+#   1.  The reduction runs across the range of numbers from 1 to
+#       `max_marble`.
+#
+#   2.  The initial state of the reduction consists of 0 scores for each
+#       player and the initial marble circle containing only marble 0.
+#
+#   3.  If the marble number is a multiple of 23:
+#
+#       4.  Rotate the circle clockwise by 7, bringing the marble 7
+#           counter-clockwise of the current one to the end;
+#
+#       5.  Remove that marble, adding it and the marble number to the
+#           current player's score (the current player is
+#           `(marble - 1) % num_players`);
+#
+#       6.  And rotate the circle counter-clockwise by 1, making the
+#           marble clockwise of the removed one the current marble.
+#
+#   7.  Otherwise, rotate the circle counter-clockwise by 1, and add the
+#       new marble at the end, making it the current marble.
+
+game_results = lambda game: next(
+            reduce(
+                lambda state, marble: next(
+                    state
+                    for (scores, circle) in [state]
+                    for _ in [
+
+#   3.  If the marble number is a multiple of 23:
+
+                        (
+                            circle.rotate(7),
+                            operator.setitem(
+                                scores,
+                                (marble - 1) % num_players,
+                                scores[(marble - 1) % num_players] + marble + circle.pop()
+                            ),
+                            circle.rotate(-1),
+                        )
+                        if marble % 23 == 0
+
+#   7.  Otherwise, rotate the circle counter-clockwise by 1, and add the
+#       new marble at the end, making it the current marble.
+
+                        else
+                        (
+                            circle.rotate(-1),
+                            circle.append(marble),
+                        )
+
+                    ]
+                )
+
+#   1.  The reduction runs across the range of numbers from 1 to
+#       `max_marble`.
+
+                ,
+                range(1, max_marble + 1)
+
+#   2.  The initial state of the reduction consists of 0 scores for each
+#       player and the initial marble circle containing only marble 0.
+
+                ,
+                (
+                    [0] * num_players
+                    ,
+                    collections.deque([0])
+                )
+
+            )
+            for (num_players, max_marble) in [game]
+        )
+
+########################################################################
+#
+# Part 1:   Return the highest score from the game results.
+
+part_1 = lambda input_data: (
+            max(game_results(input_data)[0])
+        )
+
+########################################################################
+#
+# Part 2:   Return the highest score from the game results with the
+#           maximum marble value multiplied by 100.
+
+part_2 = lambda input_data: (
+            max(game_results( (input_data[0], input_data[1] * 100) )[0])
+        )
+
+if __name__ == '__main__':
+
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
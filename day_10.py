@@ -1,29 +1,19 @@
 
 import re
-import sys
 import itertools
-import operator
-
-# pull in python-native version of `accumulate` from python 3
-def accumulate(iterable, func=operator.add):
-    'Return running totals'
-    # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-    # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-    it = iter(iterable)
-    try:
-        total = next(it)
-    except StopIteration:
-        return
-    yield total
-    for element in it:
-        total = func(total, element)
-        yield total
+import support
+
+from support import accumulate
+
+# parse the input straight from a memory-mapped buffer (see `support`)
+
+mapped_input = True
 
 ########################################################################
 #
 # Process input data to return the appropriate records or data format.
 
-re_input=re.compile(r'''position=< *(?P<x>-?[0-9]+) *, *(?P<y>-?[0-9]+) *> velocity=< *(?P<dx>-?[0-9]+) *, *(?P<dy>-?[0-9]+) *>''')
+re_input=re.compile(br'''position=< *(?P<x>-?[0-9]+) *, *(?P<y>-?[0-9]+) *> velocity=< *(?P<dx>-?[0-9]+) *, *(?P<dy>-?[0-9]+) *>''')
 process_input_data = lambda input_data: list(
             dict(
                 (key,int(value))
@@ -108,7 +98,7 @@ solo_lights = lambda lights: [
 # Then take the next iteration and process that through `show_lights`.
 
 part_1 = lambda input_data: show_lights(
-            itertools.dropwhile(
+            next(itertools.dropwhile(
                 lambda lights:
                     len(solo_lights(lights)) > 0
                 ,
@@ -126,7 +116,7 @@ part_1 = lambda input_data: show_lights(
                             for light in lights
                         )
                 )
-            ).next()
+            ))
         )
 
 ########################################################################
@@ -139,14 +129,5 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    print "sample data: part 1 = {}".format(part_1(sample_data))
-    # part 1 includes the output for part 2
-    # print "sample data: part 2 = {}".format(part_2(sample_data))
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    print "real input: part 1 = {}".format(part_1(input_data))
     # part 1 includes the output for part 2
-    # print "real input: part 2 = {}".format(part_2(input_data))
+    support.main(__file__, process_input_data, part_1, part_2, parts=(1,), mapped=mapped_input)
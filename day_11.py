@@ -1,20 +1,13 @@
 
-import re
-import sys
-import itertools
-import time
+import support
+
+from support import reduce
+
+DEBUGGING = False
 
-DEBUGGING=False
 if DEBUGGING:
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
+
+    from support import debug_reduce as reduce
 
 ########################################################################
 #
@@ -69,7 +62,7 @@ initial_grid = lambda serial: tuple(
             for y in range(1,301)
         )
 
-part_2 = lambda serial: (
+part_2 = lambda serial: next(
             max(
                 (
                     sum(
@@ -90,26 +83,8 @@ part_2 = lambda serial: (
                 for y in range(1,302-size)
             )
             for power_grid in [initial_grid(serial)]
-        ).next()
+        )
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    t0 = time.time()
-    part_1_answer = part_1(sample_data)
-    print "{}: sample data: part 1 = {}".format(time.time() - t0, part_1_answer)
-    t0 = time.time()
-    part_2_answer = part_2(sample_data)
-    print "{}: sample data: part 2 = {}".format(time.time() - t0, part_2_answer)
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    t0 = time.time()
-    part_1_answer = part_1(input_data)
-    print "{}: input data: part 1 = {}".format(time.time() - t0, part_1_answer)
-    t0 = time.time()
-    part_2_answer = part_2(input_data)
-    print "{}: input data: part 2 = {}".format(time.time() - t0, part_2_answer)
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
@@ -1,57 +1,15 @@
 
 import re
-import sys
-import itertools
-import time
-import operator
+import cycles
+import support
 
-DEBUGGING=False
+from support import reduce
 
-if DEBUGGING:
-
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
+DEBUGGING = False
 
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        print >> sys.stderr, ">>accumulate<< initial state={0!r}".format(total)
-        yield total
-        for element in it:
-            total = func(total, element)
-            print >> sys.stderr, ">>accumulate<< state={0!r}".format(total)
-            yield total
-
-else:
+if DEBUGGING:
 
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        yield total
-        for element in it:
-            total = func(total, element)
-            yield total
+    from support import debug_reduce as reduce
 
 ########################################################################
 #
@@ -83,7 +41,7 @@ else:
 re_initial = re.compile(r'''initial state: ([.#]+)''', re.I)
 re_pattern = re.compile(r'''([.#]{5}) => ([.#])''')
 
-process_input_data = lambda input_data: (
+process_input_data = lambda input_data: next(
             # use the generator trick to be able to reference
             # the split of the input data in two places
             (
@@ -104,7 +62,7 @@ process_input_data = lambda input_data: (
             for input_parts in [
                 input_data.split('\n',1)
             ]
-        ).next()
+        )
 
 ########################################################################
 # Strip unoccupied cells (`.`) from the beginning and end of a cell
@@ -113,12 +71,15 @@ process_input_data = lambda input_data: (
 #
 # If there are no occupied cells, return an empty string and the index `0`.
 
-strip_unoccupied_cells = lambda (cells, index): (
-            cells.strip('.')
-            ,
-            index + len(cells) - len(cells.lstrip('.'))
-            if '#' in cells
-            else 0
+strip_unoccupied_cells = lambda state: next(
+            (
+                cells.strip('.')
+                ,
+                index + len(cells) - len(cells.lstrip('.'))
+                if '#' in cells
+                else 0
+            )
+            for (cells, index) in [state]
         )
 
 ########################################################################
@@ -157,7 +118,7 @@ strip_unoccupied_cells = lambda (cells, index): (
 #     5)  Pass the joined string through `strip_unoccupied_cells` with
 #         a starting index of the original index - 2.
 
-process_one_generation = lambda (current_cells, current_index, patterns): (
+process_one_generation = lambda state: next(
             strip_unoccupied_cells(
                 (
                     ''.join(
@@ -176,6 +137,7 @@ process_one_generation = lambda (current_cells, current_index, patterns): (
                 )
             )
             + (patterns,)
+            for (current_cells, current_index, patterns) in [state]
         )
 
 ########################################################################
@@ -204,77 +166,61 @@ part_1 = lambda input_data, N=20: (
 
 ########################################################################
 #
-# Part 2:   Process at most `N` (defaulting to 50 billion) generations
-#           of input data, but stop when a subsequent generation is
-#           equal to the previous generation; calculate what the final
-#           generation will look like based on the that; and return the
+# Part 2:   Process `N` (defaulting to 50 billion) generations of input
+#           data, which settle into a pattern that repeats (shifting
+#           along the pots as it does); calculate what the final
+#           generation will look like based on that; and return the
 #           sum of the location of the occupied cells.
 #
-# Do this through a generator expression that counts up generations and
-# produces the current generation _and_ the previous generation.  Run
-# that through `itertools.dropwhile` to drop the generations that are
-# changing (not counting the starting index).  Then take the next
-# generation, figure out what the final starting index will be for
-# generation 'N' based on the next generation's generation number and
-# on how next generation's index varied from the previous generation's,
-# and sum the pots based on that.
+# Do this by finding the cycle of the generations with `cycles`, keyed
+# by the cells alone so that a pattern which has moved along the pots
+# still counts as a repeat.  Then take the generation in the cycle that
+# generation `N` matches, work out how far the pattern shifts in one
+# period of the cycle, and move the generation's starting index on by
+# that shift for each period between it and generation `N`.
+#
+# (If no cycle appears within `N` generations, generation `N` is simply
+# run out.)
 
-part_2 = lambda input_data, N = 50000000000: (
+part_2 = lambda input_data, N = 50000000000: next(
             sum(
                 index + final_index
-                for (next_gen, gen_num, prev_gen) in [
-                    itertools.dropwhile(
-                        lambda (cur_gen, gen_num, prev_gen): (
-                            gen_num < N
-                            and cur_gen[0] != prev_gen[0]
-                        )
-                        ,
-                        accumulate(
-                            itertools.chain(
-                                [(input_data, 0, [None])]
-                                ,
-                                itertools.count(1)
-                            )
-                            ,
-                            lambda (cur_gen, gen_num, prev_gen), next_gen_num: (
-                                (process_one_generation(cur_gen), next_gen_num, cur_gen)
-                            )
-                        )
-                    ).next()
-                ]
-                for final_index in [
-                    next_gen[1] + (next_gen[1] - prev_gen[1]) * (N - gen_num)
-                ]
-                for index in range(len(next_gen[0]))
-                if next_gen[0][index] == '#'
+                for index in range(len(cells))
+                if cells[index] == '#'
             )
+            for cycle in [
+                cycles.find_cycle(
+                    input_data,
+                    process_one_generation,
+                    key = lambda generation: generation[0],
+                    limit = N
+                )
+                or (N + 1, 1)
+            ]
+            for period in [cycle[1]]
+            for gen_num in [cycles.equivalent_step(N, cycle)]
+            for (cells, first_index, _) in [
+                cycles.state_at(input_data, process_one_generation, gen_num, cycle = cycle)
+            ]
+            for periods in [(N - gen_num) // period]
+            for shift in [
+                reduce(
+                    lambda generation, _: process_one_generation(generation),
+                    range(period),
+                    (cells, first_index, input_data[2])
+                )[1] - first_index
+                if periods
+                else 0
+            ]
+            for final_index in [
+                first_index + shift * periods
+            ]
         )
 
-if __name__ == '__main__':
-
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    t = time.time()
-    result = part_1(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 1 = {}".format(t, result)
-
-    t = time.time()
-    result = part_2(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 2 = {}".format(t, result)
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    t = time.time()
-    result = part_1(input_data)
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
+########################################################################
+#
+# Main controller
 
-    t = time.time()
-    result = part_2(input_data)
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
+if __name__ == '__main__':
 
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
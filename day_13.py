@@ -1,70 +1,28 @@
 
 import re
-import sys
 import itertools
-import time
-import operator
+import grid
+import support
+
+from support import accumulate, reduce
 
 DEBUGGING = False
 
 if DEBUGGING:
 
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={!r} value={!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={!r}".format(initial)
-        return initial
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        print >> sys.stderr, ">>accumulate<< initial state={!r}".format(total)
-        yield total
-        for element in it:
-            print >> sys.stderr, ">>accumulate<< element={!r}".format(element)
-            total = func(total, element)
-            print >> sys.stderr, ">>accumulate<< state={!r}".format(total)
-            yield total
-
-else:
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        yield total
-        for element in it:
-            total = func(total, element)
-            yield total
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
 # Process input data to return the appropriate records or data format.
 #
-# For this puzzle, the input data will be a 4-item tuple:
+# For this puzzle, the input data will be a 5-item tuple:
 #     `(tracks, carts, next_turns, width, height)`
-# - `tracks` holds the tracks of the puzzle as a single string (with the
-#   first `width` characters holding the first row of the puzzle, etc).
-#   Any place in the original puzzle input which held a cart is replaced
-#   by the track that underlies it.
-# - `carts` holds the carts from the puzzle in a string the same size as
+# - `tracks` holds the tracks of the puzzle as the cells of a `grid`
+#   (with the first `width` cells holding the first row of the puzzle,
+#   etc).  Any place in the original puzzle input which held a cart is
+#   replaced by the track that underlies it.
+# - `carts` holds the carts from the puzzle in cells the same size as
 #   `tracks`.  Each location of the original puzzle that has a cart will
 #   have a track in `tracks` and a cart direction (^/v/>/<) in `carts`;
 #   all other locations will have the original puzzle content in `tracks`
@@ -74,45 +32,60 @@ else:
 #   `carts` which does not hold a cart will have a space in `next_turns`.
 # - `width` and `height` are the number of columns and number of rows,
 #   respectively, in the input data.
+#
+# Carts never leave the tracks, so the grids need no border.
 
-process_input_data = lambda input_data: (
-            input_data
-                .replace('\n', '')
-                .replace('<', '-')
-                .replace('>', '-')
-                .replace('^', '|')
-                .replace('v', '|')
-            ,
-            input_data
-                .replace('\n', '')
-                .replace('-', ' ')
-                .replace('|', ' ')
-                .replace('+', ' ')
-                .replace('\\', ' ')
-                .replace('/', ' ')
-            ,
-            input_data
-                .replace('\n', '')
-                .replace('-', ' ')
-                .replace('|', ' ')
-                .replace('+', ' ')
-                .replace('\\', ' ')
-                .replace('/', ' ')
-                .replace('<', '1')
-                .replace('>', '1')
-                .replace('^', '1')
-                .replace('v', '1')
-            ,
-            len(input_data.split('\n')[0]),
-            len(input_data.split('\n'))
+process_input_data = lambda input_data: next(
+            (
+                tracks['cells'],
+                carts['cells'],
+                next_turns['cells'],
+                tracks['width'],
+                tracks['height']
+            )
+            for tracks in [
+                grid.from_text(
+                    input_data
+                        .replace('<', '-')
+                        .replace('>', '-')
+                        .replace('^', '|')
+                        .replace('v', '|')
+                )
+            ]
+            for carts in [
+                grid.from_text(
+                    input_data
+                        .replace('-', ' ')
+                        .replace('|', ' ')
+                        .replace('+', ' ')
+                        .replace('\\', ' ')
+                        .replace('/', ' ')
+                )
+            ]
+            for next_turns in [
+                grid.from_text(
+                    input_data
+                        .replace('-', ' ')
+                        .replace('|', ' ')
+                        .replace('+', ' ')
+                        .replace('\\', ' ')
+                        .replace('/', ' ')
+                        .replace('<', '1')
+                        .replace('>', '1')
+                        .replace('^', '1')
+                        .replace('v', '1')
+                )
+            ]
         )
 
 ########################################################################
 #
 # Iterate the carts through one tick.
 #
-# Do this by looping through the length of the carts/tracks strings,
-# processing each cart found (where `carts[index] in '<>^v'`).
+# Do this by finding the index of each cart (where `carts[index]` is one
+# of `<>^v`) at the start of the tick, and processing each of them in
+# turn against copies of the `carts` and `next_turns` cells, which are
+# then updated in place; the state passed in is left as it is.
 #
 # Use the generator trick to assign a dictionary to `directions` with
 # the following key-value pairs:
@@ -136,7 +109,7 @@ process_input_data = lambda input_data: (
 # In addition, the _track_ symbols `/` and `\\` are represented with a
 # mapping of current direction to new direction,
 #
-# Acucmulate over each index which holds a cart:
+# Reduce over each index which held a cart:
 #
 #     use the generator trick to assign `cart` to `carts[index]`,
 #     `next_turn` to `next_turns[index]`,
@@ -159,79 +132,41 @@ process_input_data = lambda input_data: (
 #
 #     If `next_index` is the same as `index`, return the current state
 #     unchanged.
-#     Otherwise, return the `carts` string with `carts[next_index]`
-#     replaced by `new_cart` and `carts[index]` replaced by a space, and
-#     return the `next_turns` string with `next_turns[next_index]`
-#     replaced by `new_next_turn` and `next_turns[index] replaced by a
-#     space.
-#     (This is slightly complicated by having to do two different
-#     replacement expressions based on if `next_index` comes before
-#     or after `index`)
+#     Otherwise, put `new_cart` in `carts[next_index]` and a space in
+#     `carts[index]`, and put `new_next_turn` in `next_turns[next_index]`
+#     and a space in `next_turns[index]`.
+
+re_cart = re.compile(br'[<>^v]')
 
 cart_tick = lambda current_state, collision_marker = 'X': (
             # use generator trick to bind `directions`
             # for the scope of the rest of the function
-            (
+            next(
 
-# Acucmulate over each index which holds a cart:
+# Reduce over each index which held a cart:
 
                 reduce(
 
                     lambda current_state, index: (
                         # use generator trick to bind values to names
                         # for the scope of the expression
-                        (
+                        next(
 
 #     If `next_index` is the same as `index`, return the current state
 #     unchanged.
 
-                            (tracks, carts, next_turns, width, height)
+                            current_state
                             if next_index == index
                             else
 
-#     Otherwise, return the `carts` string with `carts[next_index]`
-#     replaced by `new_cart` and `carts[index]` replaced by a space, and
-#     return the `next_turns` string with `next_turns[next_index]`
-#     replaced by `new_next_turn` and `next_turns[index] replaced by a
-#     space.
-#     (This is slightly complicated by having to do two different
-#     replacement expressions based on if `next_index` comes before
-#     or after `index`)
+#     Otherwise, put `new_cart` in `carts[next_index]` and a space in
+#     `carts[index]`, and put `new_next_turn` in `next_turns[next_index]`
+#     and a space in `next_turns[index]`.
 
                                 (
                                     tracks,
-                                    (
-                                        carts[:next_index]
-                                        + new_cart
-                                        + carts[next_index + 1:index]
-                                        + ' '
-                                        + carts[index + 1:]
-                                    )
-                                    if next_index < index
-                                    else (
-                                        carts[:index]
-                                        + ' '
-                                        + carts[index + 1:next_index]
-                                        + new_cart
-                                        + carts[next_index + 1:]
-                                    )
-                                    ,
-                                    (
-                                        next_turns[:next_index]
-                                        + new_next_turn
-                                        + next_turns[next_index + 1:index]
-                                        + ' '
-                                        + next_turns[index + 1:]
-                                    )
-                                    if next_index < index
-                                    else (
-                                        next_turns[:index]
-                                        + ' '
-                                        + next_turns[index + 1:next_index]
-                                        + new_next_turn
-                                        + next_turns[next_index + 1:]
-                                    )
-                                    ,
+                                    grid.put_all(carts, ((index, ' '), (next_index, new_cart))),
+                                    grid.put_all(next_turns, ((index, ' '), (next_index, new_next_turn))),
                                     width,
                                     height
                                 )
@@ -242,10 +177,11 @@ cart_tick = lambda current_state, collision_marker = 'X': (
 #     and `next_index` to `index + cart_turn[0]`.
 
                             for (tracks, carts, next_turns, width, height) in [current_state]
-                            for cart in [carts[index]]
-                            for next_turn in [next_turns[index]]
+                            for cart in [chr(carts[index])]
+                            for next_turn in [chr(next_turns[index])]
                             for cart_turn in [directions[cart]]
                             for next_index in [index + cart_turn[0]]
+                            for next_track in [chr(tracks[next_index])]
 
 #     Use the generator trick to assign `new_cart` and `new_next_turn`
 #     based on `carts[next_index]` and `tracks[next_index]`:
@@ -263,41 +199,41 @@ cart_tick = lambda current_state, collision_marker = 'X': (
 
                             for new_cart in [
                                 collision_marker
-                                if cart == collision_marker or carts[next_index] != ' '
+                                if cart == collision_marker or carts[next_index] != ord(' ')
                                 else
                                     cart_turn[int(next_turn)]
-                                    if tracks[next_index] == '+'
+                                    if next_track == '+'
                                     else
-                                        directions[tracks[next_index]][cart]
-                                        if tracks[next_index] in directions
+                                        directions[next_track][cart]
+                                        if next_track in directions
                                         else
                                             cart
                             ]
                             for new_next_turn in [
                                 ' '
-                                if cart == collision_marker or carts[next_index] != ' '
+                                if cart == collision_marker or carts[next_index] != ord(' ')
                                 else
                                     str(int(next_turn) % 3 + 1)
-                                    if tracks[next_index] == '+'
+                                    if next_track == '+'
                                     else
                                         next_turn
                             ]
 
-                        ).next()
+                        )
                     )
 
                     ,
 
-                    itertools.chain(
-                        (current_state,),
-                        itertools.ifilter(
-                            lambda index: (
-                                current_state[1][index] in '<>^v'
-                            )
-                            ,
-                            xrange(len(current_state[0]))
-                        )
-                    )
+                    [
+                        match.start()
+                        for match in re_cart.finditer(current_state[1])
+                    ]
+
+                    ,
+
+                    current_state[:1]
+                    + (bytearray(current_state[1]), bytearray(current_state[2]))
+                    + current_state[3:]
 
                 )
 
@@ -316,7 +252,7 @@ cart_tick = lambda current_state, collision_marker = 'X': (
                     }
                 ]
 
-            ).next()
+            )
         )
 
 ########################################################################
@@ -325,12 +261,12 @@ cart_tick = lambda current_state, collision_marker = 'X': (
 #           location of the collision.
 
 part_1 = lambda input_data: (
-            (
+            next(
                 (collision % width, collision // width)
                 for (tracks, carts, next_turns, width, height) in [
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda current_state: (
-                            'X' not in current_state[1]
+                            b'X' not in current_state[1]
                         )
                         ,
                         accumulate(
@@ -344,12 +280,12 @@ part_1 = lambda input_data: (
                                 cart_tick(current_state)
                             )
                         )
-                    ).next()
+                    ))
                 ]
                 for collision in [
-                    carts.index('X')
+                    carts.index(b'X')
                 ]
-            ).next()
+            )
         )
 
 ########################################################################
@@ -358,10 +294,10 @@ part_1 = lambda input_data: (
 #           location of that cart.
 
 part_2 = lambda input_data: (
-            (
+            next(
                 (cart_location % width, cart_location // width)
                 for (tracks, carts, next_turns, width, height) in [
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda current_state: (
                             len(current_state[1].strip()) > 1
                         )
@@ -377,12 +313,12 @@ part_2 = lambda input_data: (
                                 cart_tick(current_state, collision_marker = ' ')
                             )
                         )
-                    ).next()
+                    ))
                 ]
                 for cart_location in [
                     len(carts.rstrip()) - 1
                 ]
-            ).next()
+            )
         )
 
 ########################################################################
@@ -391,31 +327,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    t = time.time()
-    result = part_1(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 1 = {}".format(t, result)
-
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample.2').read())
-
-    t = time.time()
-    result = part_2(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 2 = {}".format(t, result)
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    t = time.time()
-    result = part_1(input_data)
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
-
-    t = time.time()
-    result = part_2(input_data)
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
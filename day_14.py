@@ -1,60 +1,23 @@
 
-import re
-import sys
 import itertools
-import time
-import operator
+import support
 
-from blist import blist
+from support import accumulate, reduce
 
 DEBUGGING = False
 
 if DEBUGGING:
 
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={!r} value={!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={!r}".format(initial)
-        return initial
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        print >> sys.stderr, ">>accumulate<< initial state={!r}".format(total)
-        yield total
-        for element in it:
-            print >> sys.stderr, ">>accumulate<< element={!r}".format(element)
-            total = func(total, element)
-            print >> sys.stderr, ">>accumulate<< state={!r}".format(total)
-            yield total
-
-else:
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        yield total
-        for element in it:
-            total = func(total, element)
-            yield total
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
+
+    # the recipes are extended in place (see `extend_recipes`), so trace
+    # each state by the number of recipes, the last few of them and the
+    # elves' positions, as they were at its step
+
+    import tracing
+    tracing.freeze = lambda state: (
+                len(state[0]), ''.join(str(recipe) for recipe in state[0][-10:]), state[1], state[2]
+            )
 
 ########################################################################
 #
@@ -62,11 +25,14 @@ else:
 #
 # For this puzzle, the input data is the number of recipes after which
 # the 10-digit number will appear, plus the starting state: two recipes
-# with scores `[3,7]` and the two elves starting positions at `0` and
+# with scores `(3,7)` and the two elves starting positions at `0` and
 # `1`.
+#
+# The starting recipes are a tuple, which is never changed, so the
+# parsed input can be shared between parts (see `extend_recipes`).
 
 process_input_data = lambda input_data: (
-            (int(input_data), (blist([3,7]), 0, 1))
+            (int(input_data), ((3,7), 0, 1))
         )
 
 ########################################################################
@@ -88,7 +54,7 @@ new_recipes = lambda recipes, pos1, pos2: (
 # If the two current recipes sum to less than 10, returns a list of a
 # single number which is the sum of the two current recipes.
 
-            blist([ recipes[pos1] + recipes[pos2] ])
+            [ recipes[pos1] + recipes[pos2] ]
             if recipes[pos1] + recipes[pos2] < 10
             else
 
@@ -96,10 +62,37 @@ new_recipes = lambda recipes, pos1, pos2: (
 # sum of the two current recipes (integrally) divided by 10, and the
 # second of which is the sum of the two recipes mod 10.
 
-                blist([
+                [
                     (recipes[pos1] + recipes[pos2]) // 10 ,
                     (recipes[pos1] + recipes[pos2]) % 10
-                ])
+                ]
+        )
+
+########################################################################
+#
+# Add the new recipes to the recipes list.
+#
+# The recipes list is a `bytearray`, one score per byte, extended in
+# place: building a new list every cycle would copy all of the recipes
+# every cycle.  The starting recipes (a tuple) are copied into a new
+# `bytearray` by the first cycle, and the same `bytearray` is extended
+# from then on, so each state's recipes are only valid until the next
+# cycle runs (which suits `dropwhile`, looking at one state at a time).
+#
+# Unlike the other solvers' states, then, these states change after
+# their step.  Whatever keeps states past their step must copy or
+# summarise them at the step: the debugging tracer keeps a summary (see
+# `tracing.freeze`, set above), and snapshots pickle the state when they
+# save it and key the stream by its start state, which is never changed.
+
+extend_recipes = lambda recipes, new: (
+            # use the generator trick to extend the recipes and return them
+            next(
+                recipes.extend(new) or recipes
+                for recipes in [
+                    recipes if isinstance(recipes, bytearray) else bytearray(recipes)
+                ]
+            )
         )
 
 ########################################################################
@@ -123,16 +116,16 @@ next_position = lambda recipes, position: (
 
 next_cooking_cycle = lambda state, _: (
             # use the generator trick to store the new recipes
-            (
+            next(
                 (
                     recipes,
                     next_position(recipes, state[1]),
                     next_position(recipes, state[2])
                 )
                 for recipes in [
-                    state[0] + new_recipes(state[0], state[1], state[2])
+                    extend_recipes(state[0], new_recipes(state[0], state[1], state[2]))
                 ]
-            ).next()
+            )
         )
 
 ########################################################################
@@ -146,7 +139,7 @@ part_1 = lambda input_data: (
             ''.join(
                 str(digit)
                 for state in [
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda state: (
                             len(state[0]) < (input_data[0] + 10)
                         )
@@ -160,7 +153,7 @@ part_1 = lambda input_data: (
                             ,
                             next_cooking_cycle
                         )
-                    ).next()
+                    ))
                 ]
                 for digit in state[0][input_data[0]:input_data[0]+10]
             )
@@ -175,7 +168,7 @@ part_1 = lambda input_data: (
 
 part_2 = lambda input_data: (
             # generator trick to bind values to names
-            (
+            next(
 
 #           Return the number of recipes before the `input_data` list.
 
@@ -187,7 +180,7 @@ part_2 = lambda input_data: (
 #           Split `input_data` into a list of integers.
 
                 for input_data_list in [
-                    blist(
+                    bytearray(
                         int(digit)
                         for digit in str(input_data[0])
                     )
@@ -197,7 +190,7 @@ part_2 = lambda input_data: (
 #                                ... until the `input_data` list appears
 #           either at the end or 1 back from the end of the recipes list.
 
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda state: (
                             state[0][-len(input_data_list):] != input_data_list
                             and state[0][-len(input_data_list)-1:-1] != input_data_list
@@ -215,9 +208,9 @@ part_2 = lambda input_data: (
                             ,
                             next_cooking_cycle
                         )
-                    ).next()
+                    ))
                 ]
-            ).next()
+            )
         )
 
 ########################################################################
@@ -226,31 +219,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample').read())
-
-    t = time.time()
-    result = part_1(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 1 = {}".format(t, result)
-
-    sample_data = process_input_data(open(__file__.rsplit('.')[0] + '.sample.2').read())
-
-    t = time.time()
-    result = part_2(sample_data)
-    t = time.time() - t
-    print "{}: sample data: part 2 = {}".format(t, result)
-
-    if DEBUGGING: sys.exit(0)
-
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    t = time.time()
-    result = part_1(input_data)
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
-
-    t = time.time()
-    result = part_2(input_data)
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
@@ -1,72 +1,29 @@
 
 import re
-import sys
 import itertools
-import time
-import operator
-import os.path
+import grid
+import support
+
+from support import accumulate, reduce
 
 DEBUGGING = False
 
 if DEBUGGING:
 
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        print >> sys.stderr, ">>reduce<< initial state={0!r}".format(initial)
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        print >> sys.stderr, ">>accumulate<< initial state={0!r}".format(total)
-        yield total
-        for element in it:
-            print >> sys.stderr, ">>accumulate<< element={0!r}".format(element)
-            total = func(total, element)
-            print >> sys.stderr, ">>accumulate<< state={0!r}".format(total)
-            yield total
-
-else:
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        yield total
-        for element in it:
-            total = func(total, element)
-            yield total
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
 # Process input data to return the appropriate records or data format.
 #
-# Convert a combat map into a single-string map, the map's width, and
+# Convert a combat map into the cells of a `grid`, the map's width, and
 # plus dictionary mapping map-index locations to
 # `{'type': type, 'enemy': enemytype, 'attack': attack, 'hp': hitpoints}`.
 #
 # Generate the map by first splitting the input, recording the map width,
 # and joining the split map back together into a single string with
-# no newlines.
+# no newlines, which is used to find the units and then made into grid
+# cells, as the map is updated in place during combat.
 #
 # Generate the positions list for the dictionary by using a regex of
 # `([GE])` to split the single-string combat map.
@@ -95,12 +52,12 @@ else:
 
 process_input_data = lambda input_data: (
             # generator trick to bind values to names...
-            (
+            next(
 
 # Return the map, the map width, and the dictionary formed from the
 # position list.
                 (
-                    map, map_width, dict(positions)
+                    grid.from_lines(map_lines)['cells'], map_width, dict(positions)
                 )
 
 # Generate the map by first splitting the input, ...
@@ -196,7 +153,7 @@ process_input_data = lambda input_data: (
 
                     )[:-1]
                 ]
-            ).next()
+            )
         )
 
 ########################################################################
@@ -219,8 +176,8 @@ process_input_data = lambda input_data: (
 #     A list of the positions being worked on, with each entry in the
 #     list consisting of the map_index itself and the path to take to
 #     reach that position (_including_ the starting map_index);
-#     And the map, which will have each position that appears in the
-#     list above replaced by an 'X'.
+#     And a copy of the map, which will have each position that appears
+#     in the list above replaced by an 'X', in place.
 #
 # When the accumulator finds an enemy, it will replace the state with
 # the map_index of the next step to take.
@@ -238,7 +195,7 @@ process_input_data = lambda input_data: (
 #
 # The initial state of the accumulator is:
 #     The list `[ (starting_map_index, [starting_map_index]) ]`
-#     and the map.
+#     and a copy of the map, which is the only copy the search makes.
 #
 # The iterable for the accumulator consists of a `chain` of:
 #     A list containing the initial state,
@@ -257,7 +214,7 @@ process_input_data = lambda input_data: (
 # The reduction runs against the `product` of the list of positions
 # from the current state of the accumulator, and the static list
 # of map index deltas to check: `( -map_width, -1, 1, map_width )`;
-# this is further processed through an `imap` to add the positions
+# this is further processed through a `starmap` to add the positions
 # and delta positions together and add the new position to the
 # position's path list ( generating tuples of the form `(new_index,
 # [list_of_positions_including_new_index])`), and is then sorted.
@@ -297,7 +254,7 @@ process_input_data = lambda input_data: (
 
 path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
             # generator trick to bind values to names
-            (
+            next(
 
 # The main lambda will take one result from the accumulator's `dropwhile`
 # and either:
@@ -315,7 +272,7 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 #     any state that consists of a tuple whose first item is a non-empty
 #     list.
 
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda state: (
                             isinstance(state, tuple) and state[0]
                         )
@@ -329,7 +286,7 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 #
 # The initial state of the accumulator is:
 #     The list `[ (starting_map_index, [starting_map_index]) ]`
-#     and the map.
+#     and a copy of the map, which is the only copy the search makes.
 #
 # The iterable for the accumulator consists of a `chain` of:
 #     A list containing the initial state,
@@ -338,7 +295,7 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
                             itertools.chain(
                                 # the initial state, inside a list
                                 [
-                                  ( [ (unit_position, [unit_position]) ], map )
+                                  ( [ (unit_position, [unit_position]) ], bytearray(map) )
                                 ]
                                 ,
                                 itertools.count(1)
@@ -375,14 +332,12 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 
 #         And the map location of the new position replaced by an `X`.
 
-                                            working_state[1][:next_position[0]]
-                                            + 'X'
-                                            + working_state[1][next_position[0]+1:]
+                                            grid.put(working_state[1], next_position[0], 'X')
                                         )
 
 #     If the map location at the next position is empty (`.`)
 
-                                        if working_state[1][next_position[0]] == '.'
+                                        if working_state[1][next_position[0]] == ord('.')
                                         else
 
 #     strip the returned state down to the next step to take towards
@@ -399,7 +354,7 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 
 #     If the map location at the next position is an enemy,
 
-                                        if working_state[1][next_position[0]] == enemy
+                                        if working_state[1][next_position[0]] == ord(enemy)
                                         else
 
 #     Otherwise, return the input reduction state without adding any
@@ -413,14 +368,14 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 # The reduction runs against the `product` of the list of positions
 # from the current state of the accumulator, and the static list
 # of map index deltas to check: `( -map_width, -1, 1, map_width )`;
-# this is further processed through an `imap` to add the positions
+# this is further processed through a `starmap` to add the positions
 # and delta positions together and add the new position to the
 # position's path list ( generating tuples of the form `(new_index,
 # [list_of_positions_including_new_index])`), and is then sorted.
 
                                     sorted(
-                                        itertools.imap(
-                                            lambda (position, delta): (
+                                        itertools.starmap(
+                                            lambda position, delta: (
                                                 (
                                                     position[0] + delta
                                                     ,
@@ -449,10 +404,10 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 
                         ) # end of accumulate
 
-                    ).next() # end of dropwhile; return the next item
+                    )) # end of dropwhile; return the next item
 
                 ] # end of `for next_position in` trick
-            ).next() # end of main generator trick; take the item produced
+            ) # end of main generator trick; take the item produced
         ) # end of path_to_enemy lambda
 
 ########################################################################
@@ -465,19 +420,20 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 #     The dictionary of combatants.
 #
 # The return from the lambda is a tuple of:
-#     The new map, or an empty string if the combat round does not happen,
-#     or a string of spaces if the combat round ends part way through.
+#     The new map, or empty cells if the combat round does not happen,
+#     or cells of spaces if the combat round ends part way through.
 #     The map's width.
 #     The updated dictionary of combatants, with dead combatants removed.
 #
 # 1.  If the map does not contain any goblins or does not contain any
-#     elves, return an empty string for the map.
+#     elves, return empty cells for the map.
 #
 # 2.  Otherwise, process the round using a reduction that returns
 #     the next accumulator state.
 #
 # 3.  The initial reduction state is the tuple of inputs to the round:
-#     `(map, map_width, combatants)`
+#     `(map, map_width, combatants)`, with a copy of the map which the
+#     round then updates in place (earlier rounds' maps are kept).
 #
 # 4.  The reduction runs across the combatants' positions and status,
 #     sorted by their `y` and `x` coordinates.
@@ -505,7 +461,7 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 #     10. Otherwise, return a new interim state after moving the combatant to
 #         the next step:
 #
-#         11. Generate a new map with the combatant's position replaced
+#         11. Update the map with the combatant's position replaced
 #             with a '.' and the next step position replaced with the
 #             combatant's type.
 #
@@ -540,13 +496,13 @@ path_to_closest_enemy = lambda map, map_width, unit_position, enemy: (
 #     21. If there are no adjacent enemies, return the interim state
 #         unchanged.
 
-process_combat_round = lambda (map, map_width, combatants): (
+process_combat_round = lambda round_state: next(
 
 # 1.  If the map does not contain any goblins or does not contain any
-#     elves, return an empty string for the map.
+#     elves, return empty cells for the map.
 
-            ('', map_width, combatants)
-            if 'G' not in map and 'E' not in map
+            (bytearray(), map_width, combatants)
+            if b'G' not in map and b'E' not in map
             else
 
 # 2.  Otherwise, process the round using a reduction that returns
@@ -563,7 +519,7 @@ process_combat_round = lambda (map, map_width, combatants): (
 #     space).
 
                     state
-                    if state[0][combatant[0]] != combatant[1]['type']
+                    if state[0][combatant[0]] != ord(combatant[1]['type'])
                     else
 
 # 6.  If the current state's map contains no enemies for the combatant,
@@ -571,28 +527,26 @@ process_combat_round = lambda (map, map_width, combatants): (
 #     indicate the round is a partial combat round.
 
                     (
-                        ' ' * len(state[0])
+                        bytearray(b' ' * len(state[0]))
                         ,
                         state[1]
                         ,
                         state[2]
                     )
-                    if combatant[1]['enemy'] not in state[0]
+                    if ord(combatant[1]['enemy']) not in state[0]
                     else
 
 # 13. Generate the return state based on any combat happening:
 
                     # generator trick la la la
-                    (
+                    next(
 
                         ( # start of step 15 'If there is an adjacent...'
                             ( # start of step 16 'If the enemy has...'
 
 #             17. Replace the enemy's position on the map with a `.`
 
-                                interim_state[0][:adjacent_enemy]
-                                + '.'
-                                + interim_state[0][adjacent_enemy+1:]
+                                grid.put(interim_state[0], adjacent_enemy, '.')
                                 ,
 
 # (undocumented step) keep the map width unchanged
@@ -605,7 +559,7 @@ process_combat_round = lambda (map, map_width, combatants): (
 
                                 dict(
                                     item
-                                    for item in interim_state[2].iteritems()
+                                    for item in interim_state[2].items()
                                     if item[0] != adjacent_enemy
                                 )
 
@@ -649,7 +603,7 @@ process_combat_round = lambda (map, map_width, combatants): (
                                             for attr in item[1].items()
                                         )
                                     )
-                                    for item in interim_state[2].iteritems()
+                                    for item in interim_state[2].items()
                                 )
 
                             ) # end of step 20 'Replace the enemy...'
@@ -696,27 +650,16 @@ process_combat_round = lambda (map, map_width, combatants): (
 
                                 ( # start of tuple containing steps 11 and 12
 
-#         11. Generate a new map with the combatant's position replaced
+#         11. Update the map with the combatant's position replaced
 #             with a '.' and the next step position replaced with the
 #             combatant's type.
 
-# (this is complicated by needing to do the slicing in the correct order
-# based on whether `next_step` is before or after the combatant's current
-# position)
-
-                                    (
-                                        state[0][:combatant[0]]
-                                        + '.'
-                                        + state[0][combatant[0]+1:next_step]
-                                        + combatant[1]['type']
-                                        + state[0][next_step+1:]
-                                    ) if combatant[0] < next_step
-                                    else (
-                                        state[0][:next_step]
-                                        + combatant[1]['type']
-                                        + state[0][next_step+1:combatant[0]]
-                                        + '.'
-                                        + state[0][combatant[0]+1:]
+                                    grid.put_all(
+                                        state[0],
+                                        (
+                                            (combatant[0], '.'),
+                                            (next_step, combatant[1]['type'])
+                                        )
                                     )
                                     ,
 
@@ -737,7 +680,7 @@ process_combat_round = lambda (map, map_width, combatants): (
                                             ,
                                             item[1]
                                         )
-                                        for item in state[2].iteritems()
+                                        for item in state[2].items()
                                     )
 
                                 ) # end of tuple containing steps 11 and 12
@@ -782,7 +725,7 @@ process_combat_round = lambda (map, map_width, combatants): (
                                                 map_width
                                             )
                                         )
-                                        if interim_state[0][adjacent_index] == interim_combatant[1]['enemy']
+                                        if interim_state[0][adjacent_index] == ord(interim_combatant[1]['enemy'])
                                     ]
                                     ,
                                     key = lambda index:interim_state[2][index]['hp']
@@ -791,7 +734,7 @@ process_combat_round = lambda (map, map_width, combatants): (
                             )[0]
                         ]
 
-                    ).next() # end of step 13 'Generate the return state...'
+                    ) # end of step 13 'Generate the return state...'
 
                 ) # end of the reduction lambda for step 2
                 ,
@@ -805,10 +748,12 @@ process_combat_round = lambda (map, map_width, combatants): (
 # 3.  The initial reduction state is the tuple of inputs to the round:
 #     `(map, map_width, combatants)`
 
-                (map, map_width, combatants)
+                (bytearray(map), map_width, combatants)
 
             ) # end of step 2
 
+            for (map, map_width, combatants) in [round_state]
+
         ) # end of `process_combat_round`
 
 ########################################################################
@@ -822,34 +767,37 @@ process_combat_round = lambda (map, map_width, combatants): (
 #     map will be replaced by all spaces, to mark the round as an
 #     incomplete combat round.  At the beginning of any combat round,
 #     if there are no goblins _or_ no elves, the map will be replaced
-#     by an empty string, to mark the end of combat.
+#     by empty cells, to mark the end of combat.
 #     Therefore, filter the accumulator through a `takewhile` that
-#     stops when it finds the empty string.
+#     stops when it finds the empty cells.
 #
 # 3.  At the end, return the product of the number of rounds (filtered
 #     to remove a possible last round whose map is all spaces) and the
-#     sum of the hitpoints in the last round.
+#     sum of the hitpoints in the last round.  Each round is paired with
+#     its number, so the number of rounds is the last full round's
+#     number, however many rounds were kept (a run resumed from a
+#     snapshot starts partway through; see `snapshots`).
 #
 # 3a. To support Part 2, if the optional `return_combatants` parameter
 #     is passed as True, the return value is a tuple of the result as
 #     described above and the final combatants list.
 #
-# Process each round using the `process_combat_round` helper.
-# (ignoring the round counter).
+# Process each round using the `process_combat_round` helper, pairing
+# it with the round counter.
 
 part_1 = lambda input_data, return_combatants = False: (
             # generator expression cheating la la la
-            (
+            next(
 
 # 3.  At the end, return the product of the number of rounds (filtered
 #     to remove a possible last round whose map is all spaces) and the
 #     sum of the hitpoints in the last round.
 
-                (len([round for round in combat_rounds if round[0][0] != ' ']) - 1)
+                max(round_number for (round_number, round) in combat_rounds if round[0][0] != ord(' '))
                 * sum(
                     unit_stats['hp']
                     for unit_stats in
-                    combat_rounds[-1][2].itervalues()
+                    combat_rounds[-1][1][2].values()
                 )
 
 # 3a. To support Part 2, if the optional `return_combatants` parameter
@@ -859,14 +807,14 @@ part_1 = lambda input_data, return_combatants = False: (
                 if not return_combatants
                 else
                 (
-                    (len([round for round in combat_rounds if round[0][0] != ' ']) - 1)
+                    max(round_number for (round_number, round) in combat_rounds if round[0][0] != ord(' '))
                     * sum(
                         unit_stats['hp']
                         for unit_stats in
-                        combat_rounds[-1][2].itervalues()
+                        combat_rounds[-1][1][2].values()
                     )
                     ,
-                    combat_rounds[-1][2]
+                    combat_rounds[-1][1][2]
                 )
 
 # (undocumented sub-steps) bind the input data to names
@@ -882,13 +830,13 @@ part_1 = lambda input_data, return_combatants = False: (
 #     map will be replaced by all spaces, to mark the round as an
 #     incomplete combat round.  At the beginning of any combat round,
 #     if there are no goblins _or_ no elves, the map will be replaced
-#     by an empty string, to mark the end of combat.
+#     by empty cells, to mark the end of combat.
 #     Therefore, filter the accumulator through a `takewhile` that
-#     stops when it finds the empty string.
+#     stops when it finds the empty cells.
 
                     itertools.takewhile(
-                        lambda map_data: (
-                            map_data[0]
+                        lambda numbered_round: (
+                            numbered_round[1][0]
                         )
                         ,
 
@@ -897,23 +845,23 @@ part_1 = lambda input_data, return_combatants = False: (
 
                         accumulate(
                             itertools.chain(
-                                [ input_data ],
+                                [ (0, input_data) ],
                                 itertools.count(1)
                             )
                             ,
 
-# Process each round using the `process_combat_round` helper.
-# (ignoring the round counter).
+# Process each round using the `process_combat_round` helper, pairing
+# it with the round counter.
 
-                            lambda current_state, _: (
-                                process_combat_round(current_state)
+                            lambda current_state, round_number: (
+                                (round_number, process_combat_round(current_state[1]))
                             )
 
                         ) # end of step '1.  Run an `accumulate`...'
                     ) # end of step '2.  ... filter the `accumulate` through a `takewhile` ...'
                 )]# end of 'bind the list of combat rounds to a name'.
 
-            ).next()
+            )
         )
 
 ########################################################################
@@ -955,7 +903,7 @@ part_2 = lambda input_data: (
 #     states in which the count of elves in the returned results is less
 #     than the count of elves in the input data.
 
-            itertools.dropwhile(
+            next(itertools.dropwhile(
                 lambda results: (
                     len([elf for elf in results[1] if results[1][elf]['type'] == 'E'])
                     !=
@@ -986,7 +934,7 @@ part_2 = lambda input_data: (
                     lambda state, new_attack: (
 
                         # use the generator trick...
-                        (
+                        next(
 
 #     4.  Return the results of part 1 (with `return_combatants` set to
 #         True).
@@ -1021,14 +969,14 @@ part_2 = lambda input_data: (
 
                             for results in [ part_1(new_input_data, return_combatants=True) ]
 
-                        ).next()
+                        )
                     )
 
 # 6.  Return the first element (`[0]`) of the `next()` result of the
 #     accumulator.
 
                 )
-            ).next()[0]
+            ))[0]
         )
 
 ########################################################################
@@ -1037,42 +985,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    input_data = process_input_data(open(__file__.rsplit('.')[0] + '.input').read())
-
-    file_base = __file__.rsplit('.')[0]
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(file_base, num)), itertools.count(1)):
-
-        sample_data = process_input_data(open('{}.sample.{}'.format(__file__.rsplit('.')[0], sample_num)).read())
-
-        expected = int(open('{}.sample.results.part1.{}'.format(__file__.rsplit('.')[0], sample_num)).read().strip())
-
-        t = time.time()
-        result = part_1(sample_data)
-        t = time.time() - t
-        print "{}: sample {}: part 1 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-        if DEBUGGING: sys.exit(0)
-
-    t = time.time()
-    result = part_1(input_data)
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
-
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(file_base, num)), itertools.count(1)):
-
-        sample_data = process_input_data(open('{}.sample.{}'.format(__file__.rsplit('.')[0], sample_num)).read())
-
-        expected = int(open('{}.sample.results.part2.{}'.format(__file__.rsplit('.')[0], sample_num)).read().strip())
-
-        t = time.time()
-        result = part_2(sample_data)
-        t = time.time() - t
-        print "{}: sample {}: part 2 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-        if DEBUGGING: sys.exit(0)
-
-    t = time.time()
-    result = part_2(input_data)
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
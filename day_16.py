@@ -1,59 +1,16 @@
 
 import re
-import sys
 import itertools
-import time
-import operator
-import os.path
+import vm
+import support
+
+from support import accumulate, reduce
 
 DEBUGGING = False
 
 if DEBUGGING:
 
-    def reduce(func, iterable, initial=None):
-        iterable = iter(iterable)
-        if initial is None:
-            initial = iterable.next()
-        for value in iterable:
-            print >> sys.stderr, ">>reduce<< state={0!r} value={1!r}".format(initial, value)
-            initial = func(initial, value)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(initial)
-        return initial
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        print >> sys.stderr, ">>accumulate<< initial state={0!r}".format(total)
-        yield total
-        for element in it:
-            print >> sys.stderr, ">>accumulate<< element={0!r}".format(element)
-            total = func(total, element)
-            print >> sys.stderr, ">>accumulate<< state={0!r}".format(total)
-            yield total
-
-else:
-
-    # pull in python-native version of `accumulate` from python 3
-    def accumulate(iterable, func=operator.add):
-        'Return running totals'
-        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-        it = iter(iterable)
-        try:
-            total = next(it)
-        except StopIteration:
-            return
-        yield total
-        for element in it:
-            total = func(total, element)
-            yield total
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
@@ -111,7 +68,7 @@ else:
 
 process_input_data = lambda input_data: (
             # generator expression to bind values to names
-            (
+            next(
                 (
                     [
                         (
@@ -141,74 +98,9 @@ process_input_data = lambda input_data: (
                         input_data
                     )
                 ]
-            ).next()
+            )
         )
 
-########################################################################
-#
-# The dictionary of lambdas that process the instructions
-#
-# Each instruction lambda accepts a list of registers and a list of 4
-# integers representing the instruction.  The first instruction is the
-# opcode, and is ignored; the other three are used to process the 
-# instruction.  The lambda returns the new list of registers.
-#
-# These make use of a helper lambda called `replace_reg`, which replaces
-# a register in a list of registers with a new value.
-
-replace_reg = lambda regs,reg,val: regs[:reg] + [val] + regs[reg+1:]
-
-instructions = {
-    'addr': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] + regs[inst[2]])
-        ),
-    'addi': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] + inst[2])
-        ),
-    'mulr': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] * regs[inst[2]])
-        ),
-    'muli': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] * inst[2])
-        ),
-    'banr': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] & regs[inst[2]])
-        ),
-    'bani': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] & inst[2])
-        ),
-    'borr': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] | regs[inst[2]])
-        ),
-    'bori': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]] | inst[2])
-        ),
-    'setr': lambda regs,inst: (
-            replace_reg(regs, inst[3], regs[inst[1]])
-        ),
-    'seti': lambda regs,inst: (
-            replace_reg(regs, inst[3], inst[1])
-        ),
-    'gtir': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if inst[1] > regs[inst[2]] else 0)
-        ),
-    'gtri': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if regs[inst[1]] > inst[2] else 0)
-        ),
-    'gtrr': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if regs[inst[1]] > regs[inst[2]] else 0)
-        ),
-    'eqir': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if inst[1] == regs[inst[2]] else 0)
-        ),
-    'eqri': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if regs[inst[1]] == inst[2] else 0)
-        ),
-    'eqrr': lambda regs,inst: (
-            replace_reg(regs, inst[3], 1 if regs[inst[1]] == regs[inst[2]] else 0)
-        ),
-}
-
 ########################################################################
 #
 # test_instructions:
@@ -218,17 +110,17 @@ instructions = {
 #             results based on the sample.
 #
 # This is a simple list comprehension processed over the items of the
-# `instructions` dictionary.
+# shared register machine's `instructions` dictionary (see `vm`).
 #
-# Return the instruction name if the results of running the instruction
-# lambda against the sample's instruction and "before" registers
+# Return the instruction name if the results of applying the instruction
+# to the sample's instruction and a copy of the "before" registers
 # matches the samples' "after" registers.
 
 test_instructions = lambda sample: (
             [
                 name
-                for (name, instr) in instructions.items()
-                if instr( sample[0], sample[1] ) == sample[2]
+                for (name, instr) in vm.instructions.items()
+                if vm.apply(instr, sample[0], sample[1]) == sample[2]
             ]
         )
 
@@ -305,7 +197,7 @@ identify_opcodes = lambda sample_list: (
 # The accumulator is filtered through a `dropwhile` which filters out
 # any state which contains any set of length 1.
 
-            itertools.dropwhile(
+            next(itertools.dropwhile(
                 lambda instruction_sets: (
                     max(
                         isinstance(instruction, set) and len(instruction) == 1
@@ -360,8 +252,8 @@ identify_opcodes = lambda sample_list: (
 # instruction names, one for each instruction.
 
                                 [
-                                    set(instructions.keys())
-                                    for instruction in instructions.keys()
+                                    set(vm.instructions.keys())
+                                    for instruction in vm.instructions.keys()
                                 ]
 
                             )
@@ -380,7 +272,7 @@ identify_opcodes = lambda sample_list: (
                     lambda instruction_sets, _: (
 
                     # generator expression to process the two phases
-                        (
+                        next(
 
 #                              ... then removes the contents of that set
 # from each set in the list of instruction sets.
@@ -416,11 +308,11 @@ identify_opcodes = lambda sample_list: (
                                 )
                             ]
 
-                        ).next() # end of two-phase lambda generator
+                        ) # end of two-phase lambda generator
 
                     ) # end of two-phase lambda
                 ) # end of instruction accumulator
-            ).next() # end of dropwhile
+            )) # end of dropwhile
         ) # end of `identify_opcodes`
 
 ########################################################################
@@ -429,63 +321,20 @@ identify_opcodes = lambda sample_list: (
 #           test program.
 #
 # Pass the samples into `identify_opcodes` to generate the mapping
-# between opcode and instruction.
-#
-# Process the opcode mapping to map opcodes with instruction lambdas.
-#
-# Bind the opcode mapping to `opcodes` through a generator expression.
-#
-# Then process the test program using a reduction.
-#
-# The state of the reduction is the register set.
-#
-# The initial state of the reduction is `[0,0,0,0]`
-#
-# Process each instruction of the test program by calling the instruction
-# lambda in the opcodes mapping for the first opcode in the instruction
-# and passing in the current registers and the instruction.
+# between opcode and instruction, which the shared register machine
+# uses to decode the test program, and run it on four registers
+# starting at `[0,0,0,0]`.
 #
-# Return the first register of the result of the generator expression.
+# Return the first register.
 
 part_2 = lambda input_data: (
-
-# Bind the opcode mapping to `opcodes` through a generator expression.
-            (
-
-# Then process the test program using a reduction.
-# The state of the reduction is the register set.
-
-                reduce(
-
-# Process each instruction of the test program by calling the instruction
-# lambda in the opcodes mapping for the first opcode in the instruction
-# and passing in the current registers and the instruction.
-
-                    lambda registers, instruction: (
-                        opcodes[instruction[0]](registers, instruction)
-                    )
-                    ,
-
-                    input_data[1]
-                    ,
-
-# The initial state of the reduction is `[0,0,0,0]`
-
-                    [0,0,0,0]
-
+            vm.run(
+                vm.new_machine(
+                    input_data[1],
+                    4,
+                    identify_opcodes(input_data[0])
                 )
-
-# Bind the opcode mapping to `opcodes` through a generator expression.
-                for opcodes in [
-                    [
-                        instructions[instruction]
-                        for instruction in identify_opcodes(input_data[0])
-                    ]
-                ]
-
-# Return the first register of the result of the generator expression.
-            ).next()[0]
-
+            )['registers'][0]
         )
 
 ########################################################################
@@ -494,56 +343,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    base_filename = __file__.rsplit('.')[0]
-
-    input_filename = '{}.input'.format(base_filename)
-    input_data = process_input_data(open(input_filename).read())
-
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-        sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-        sample_data = process_input_data(open(sample_filename).read())
-
-        results_filename = '{}.sample.results.part1.{}'.format(base_filename, sample_num)
-        expected = (
-                    int(open(results_filename).read().strip())
-                    if os.path.exists(results_filename)
-                    else None
-                )
-
-        t = time.time()
-        result = part_1(sample_data)
-        t = time.time() - t
-        print "{}: sample {}: part 1 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-        if DEBUGGING: sys.exit(0)
-
-    t = time.time()
-    result = part_1(input_data)
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
-
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-        sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-        sample_data = process_input_data(open(sample_filename).read())
-
-        results_filename = '{}.sample.results.part2.{}'.format(base_filename, sample_num)
-        expected = (
-                    int(open(results_filename).read().strip())
-                    if os.path.exists(results_filename)
-                    else None
-                )
-
-        t = time.time()
-        result = part_2(sample_data)
-        t = time.time() - t
-        print "{}: sample {}: part 2 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-        if DEBUGGING: sys.exit(0)
-
-    t = time.time()
-    result = part_2(input_data)
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING)
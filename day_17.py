@@ -1,54 +1,18 @@
 
 import re
-import sys
 import itertools
-import time
 import operator
-import os.path
 import collections
+import grid
+import support
 
-DEBUGGING = False
-
-# pull in python-native version of `accumulate` from python 3
-def accumulate(iterable, func=operator.add):
-    'Return running totals'
-    # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-    # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-    it = iter(iterable)
-    try:
-        total = next(it)
-    except StopIteration:
-        return
-    yield total
-    for element in it:
-        total = func(total, element)
-        yield total
-
-if DEBUGGING:
-
-    print >> sys.stderr, "Debugging version of `reduce` enabled"
+from support import accumulate, reduce
 
-    real_reduce = reduce
-    def reduce(func, *args):
-        def debug(state, value):
-            print >> sys.stderr, ">>reduce<< state={!r} value={!r}".format(state, value)
-            return func(state, value)
-        final = real_reduce(debug, *args)
-        print >> sys.stderr, ">>reduce<< final state={0!r}".format(final)
-        return final
+DEBUGGING = False
 
 if DEBUGGING:
 
-    print >> sys.stderr, "Debugging version of `accumulate` enabled"
-
-    real_accumulate = accumulate
-    def accumulate(iterable, func = operator.add):
-        def debug(state, value):
-            return func(state, value)
-        for value in real_accumulate(iterable, debug):
-            print >> sys.stderr, ">>accumulate<< yield state={!r}".format(value)
-            yield value
-        print >> sys.stderr, ">>accumulate<< done".format(value)
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
@@ -312,7 +276,7 @@ stratify = lambda clay_veins: (
 
 # For each span:
 
-                        lambda strata, (stratum,(start,end)): (
+                        lambda strata, vein: next(
 
 #     If the `stratum` value is not the same as that of the last strata
 #     in the list being built, then return the existing list with new
@@ -403,6 +367,7 @@ stratify = lambda clay_veins: (
                                 )
                             ]
 
+                            for (stratum, (start, end)) in [vein]
                         )
                         ,
 
@@ -441,7 +406,7 @@ extend_horizontal_strata = lambda strata: [
             (
                 stratum[0]
                 ,
-                (
+                next(
                     extended_right
                     for extended_left in [
                         [(min_x-1, min_x-1)] + stratum[1]
@@ -455,7 +420,7 @@ extend_horizontal_strata = lambda strata: [
                         else
                         extended_left[:-1] + [(extended_left[-1][0], max_x+1)]
                     ]
-                ).next()
+                )
             )
             for stratum in strata
             for min_x in [min(stratum[1][0][0] for stratum in strata if len(stratum[1]))]
@@ -469,13 +434,13 @@ extend_horizontal_strata = lambda strata: [
 #
 # Extend the vertical strata with an stratum at the beginning and end.
 
-extend_vertical_strata = lambda strata: (
+extend_vertical_strata = lambda strata: next(
             [ (strata[0][0] - 1, [ (min_y, max_y) ]) ]
             + strata
             + [ (strata[-1][0] + 1, [ (min_y, max_y) ]) ]
             for min_y in [min(stratum[1][0][0] for stratum in strata if len(stratum[1]))]
             for max_y in [max(stratum[1][-1][1] for stratum in strata if len(stratum[1]))]
-        ).next()
+        )
 
 ########################################################################
 #
@@ -505,8 +470,12 @@ process_input_data = lambda input_data: (
 # `render` the input data into a map of clay and sand.
 #
 # Used for debeaching porpoises.  er, debugging purposes.
+#
+# The map is a `grid` with one row per horizontal stratum, starting out
+# as clay, onto which the sand spans, then any flows, then any fills
+# are painted in place.
 
-render = lambda input_data: (
+render = lambda input_data: next(
             '\n'
             + '({},{}) ... ({},{})'.format(
                 input_data['vertical_strata'][0][0] ,
@@ -515,46 +484,52 @@ render = lambda input_data: (
                 input_data['horizontal_strata'][-1][0] ,
             )
             + '\n'
-            + '\n'.join(
-                reduce(
-                    lambda line, (fillrow, (start,end)): (
-                        line[:(start-min_x)]
-                        + '~' * (end-start+1)
-                        + line[(end-min_x)+1:]
-                        if fillrow == row[0]
-                        else line
+            + grid.to_text(map_grid)
+            + '\n'
+            for min_x in [input_data['vertical_strata'][0][0]]
+            for max_x in [input_data['vertical_strata'][-1][0]]
+            for rows in [
+                dict(
+                    (row[0], row_num)
+                    for (row_num, row) in enumerate(input_data['horizontal_strata'])
+                )
+            ]
+            for map_grid in [
+                grid.blank_grid(max_x - min_x + 1, len(rows), fill='#')
+            ]
+            for sand in [
+                grid.put_all(
+                    map_grid['cells'],
+                    (
+                        (grid.index(map_grid, col - min_x, rows[row[0]]), '.')
+                        for row in input_data['horizontal_strata']
+                        for (start, end) in row[1]
+                        for col in range(start, end + 1)
                     )
-                    ,
-                    input_data['fills']
-                    ,
-                    reduce(
-                        lambda line, (flowcol, (start,end)): (
-                            line[:(flowcol-min_x)]
-                            + '|'
-                            + line[(flowcol-min_x)+1:]
-                            if start <= row[0] <= end
-                            else line
+                )
+            ]
+            for water in [
+                grid.put_all(
+                    grid.put_all(
+                        map_grid['cells'],
+                        (
+                            (grid.index(map_grid, flowcol - min_x, rows[row]), '|')
+                            for (flowcol, (start, end)) in input_data['flows']
+                            if min_x <= flowcol <= max_x
+                            for row in range(start, end + 1)
+                            if row in rows
                         )
-                        ,
-                        input_data['flows']
-                        ,
-                        line
+                    ),
+                    (
+                        (grid.index(map_grid, col - min_x, rows[fillrow]), '~')
+                        for (fillrow, (start, end)) in input_data['fills']
+                        if fillrow in rows
+                        for col in range(start, end + 1)
                     )
                 )
                 if 'fills' in input_data and 'flows' in input_data
-                else line
-                for min_x in [input_data['vertical_strata'][0][0]]
-                for max_x in [input_data['vertical_strata'][-1][0]]
-                for row in input_data['horizontal_strata']
-                for line in [
-                    ''.join(
-                        '#' * (row[1][i][0] - (min_x if i == 0 else row[1][i-1][1] + 1))
-                        + '.' * (row[1][i][1] - row[1][i][0] + 1)
-                        for i in range(len(row[1]))
-                    ) + '#' * (max_x - (row[1][-1][1] if len(row[1]) else (min_x - 1)))
-                ]
-            )
-            + '\n'
+                else None
+            ]
         )
 
 ########################################################################
@@ -687,7 +662,7 @@ part_1 = lambda input_data, include_flows=True: (
 # Run the accumulator through a `dropwhile` that drops any state which
 # contains one or more spills.
 
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda fills_flows_spills_sand: (
                             len(fills_flows_spills_sand[2]) > 0
                         )
@@ -725,7 +700,7 @@ part_1 = lambda input_data, include_flows=True: (
 
 # Each step of the accumulation consists of the following logic:
 
-                            lambda state, _: (
+                            lambda state, _: next(
 
 #     2.  If the bottom of the spill is at the maximum horizontal
 #         stratum, add the span of the spill to `flows` and remove
@@ -742,7 +717,7 @@ part_1 = lambda input_data, include_flows=True: (
 
 #     3.  Otherwise:
 
-                                else (
+                                else next(
 
 #         8.  If such a gap exists [on the left], create a new spill
 #             point above the gap.
@@ -975,7 +950,7 @@ part_1 = lambda input_data, include_flows=True: (
                                         )[0]
                                     ]
 
-                                ).next()
+                                )
 
 # undocumented steps: bind names to the items in 'state'
                                 for fills in [state[0]]
@@ -1017,11 +992,11 @@ part_1 = lambda input_data, include_flows=True: (
                                         )[0]
                                     )
                                 ]
-                            ).next()
+                            )
 
                         )
 
-                    ).next()
+                    ))
 
                 )[0:(2 if include_flows else 1)]
             )
@@ -1042,62 +1017,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    base_filename = __file__.rsplit('.')[0]
-
-    input_filename = '{}.input'.format(base_filename)
-    input_data = open(input_filename).read()
-
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-        #if DEBUGGING: break
-
-        sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-        sample_data = open(sample_filename).read()
-
-        results_filename = '{}.sample.results.part1.{}'.format(base_filename, sample_num)
-        expected = (
-                    int(open(results_filename).read().strip())
-                    if os.path.exists(results_filename)
-                    else None
-                )
-
-        if DEBUGGING: print >> sys.stderr, render(process_input_data(sample_data))
-        t = time.time()
-        result = part_1(process_input_data(sample_data))
-        t = time.time() - t
-        print "{}: sample {}: part 1 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-        #if DEBUGGING: sys.exit(0)
-
-    #if DEBUGGING: sys.exit(0)
-
-    if DEBUGGING: print >> sys.stderr, render(process_input_data(input_data))
-
-    t = time.time()
-    result = part_1(process_input_data(input_data))
-    t = time.time() - t
-    print "{}: input data: part 1 = {}".format(t, result)
-
-    if DEBUGGING: sys.exit(0)
-
-    for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-        sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-        sample_data = open(sample_filename).read()
-
-        results_filename = '{}.sample.results.part2.{}'.format(base_filename, sample_num)
-        expected = (
-                    int(open(results_filename).read().strip())
-                    if os.path.exists(results_filename)
-                    else None
-                )
-
-        t = time.time()
-        result = part_2(process_input_data(sample_data))
-        t = time.time() - t
-        print "{}: sample {}: part 2 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-    t = time.time()
-    result = part_2(process_input_data(input_data))
-    t = time.time() - t
-    print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, debugging=DEBUGGING, render=render)
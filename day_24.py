@@ -1,68 +1,25 @@
 
 import re
-import sys
 import itertools
-import time
-import operator
-import os.path
-import pprint
+import support
+
+from support import accumulate, reduce
+
+# parse the input straight from a memory-mapped buffer (see `support`)
+
+mapped_input = True
 
 run_part_1 = True
 run_part_2 = True
+
 run_samples = True
 run_data = True
 
 DEBUGGING = False
 
-# pull in python-native version of `accumulate` from python 3
-def accumulate(iterable, func=operator.add):
-    'Return running totals'
-    # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-    # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-    it = iter(iterable)
-    try:
-        total = next(it)
-    except StopIteration:
-        return
-    yield total
-    for element in it:
-        total = func(total, element)
-        yield total
-
-real_accumulate = accumulate
-def debug_accumulate(iterable, func = operator.add):
-    def debug(state, value):
-        print >> sys.stderr, ">>accumulate<< element={!r}".format(value)
-        return func(state, value)
-    for state in real_accumulate(iterable, debug):
-        print >> sys.stderr, ">>accumulate<< state={!r}".format(state)
-        yield state
-    print >> sys.stderr, ">>accumulate<< done"
-
-real_reduce = reduce
-def debug_reduce(func, *args):
-    def debug(state, value):
-        print >> sys.stderr, ">>reduce<< state={!r} value={!r}".format(state, value)
-        return func(state, value)
-    final = real_reduce(debug, *args)
-    print >> sys.stderr, ">>reduce<< final state={0!r}".format(final)
-    return final
-
-if DEBUGGING:
-
-    print >> sys.stderr, "Debugging version of `reduce` enabled"
-
-    reduce = debug_reduce
-
 if DEBUGGING:
 
-    print >> sys.stderr, "Debugging version of `accumulate` enabled"
-
-    accumulate = debug_accumulate
-
-def debug_value(prefix, value):
-    print >> sys.stderr, '{}{}'.format(prefix, value)
-    return value
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
@@ -94,11 +51,12 @@ def debug_value(prefix, value):
 # and the dictionary maps a damage type to a multiplier,
 # either `0` (for immunities) or `2` (for weaknesses).
 #
-# Begin by splitting the input around `Infection:`.
-# Each section is then parsed by a regular expression `findall`
-# for this expression (unfortunately, named groups don't have
-# special meaning in findall, so they're just normal groups
-# that we will have to reference by number later).
+# Begin by finding `Infection:`, which divides the input into its two
+# sections.
+# Each section is then scanned in place (the input may be a memory-mapped
+# buffer) by `finditer` over just that section, with this expression
+# (its groups are numbered rather than named, and are referenced by
+# number later; a group which doesn't match is returned as empty).
 # This matches the numbers within the pattern, plus optionally
 # the () phrase with either `immune to` or `weak to` parts,
 # or both with a `;` between.
@@ -131,11 +89,11 @@ def debug_value(prefix, value):
 #     dict(
 #         [
 #             (immunity.strip(), 0)
-#             for immunity in m[2].split(',')
+#             for immunity in m[2].split(b',')
 #             if immunity.strip()
 #         ] + [
 #             (weakness.strip(), 2)
-#             for weakness in m[3].split(',')
+#             for weakness in m[3].split(b',')
 #             if weakness.strip()
 #         ]
 #     )
@@ -144,6 +102,23 @@ def debug_value(prefix, value):
 #
 # The two sections of groups are then returned in a tuple.
 
+re_unit_group = re.compile(
+            br'(\d+)\s+units\s+each\s+with\s+(\d+)\s+hit\s+points\s+'
+            + br'(?:\(\s*'
+                + br'(?:'
+                    + br'(?:'
+                        + br'(?:immune\s+to\s+(\w+(?:\s*,\s*\w+)*)\s*)'
+                        + br'|'
+                        + br'(?:weak\s+to\s+(\w+(?:\s*,\s*\w+)*)\s*)'
+                    + br')'
+                    + br';?\s*'
+                + br')+'
+            + br'\)\s+)?'
+            + br'with\s+an\s+attack\s+that\s+does\s+'
+            + br'(\d+)\s+(\w+)\s+damage\s+'
+            + br'at\s+initiative\s+(\d+)'
+        )
+
 process_input_data = lambda input_data: (
             tuple(
                 list(
@@ -164,36 +139,25 @@ process_input_data = lambda input_data: (
                         dict(
                             [
                                 (immunity.strip(), 0)
-                                for immunity in m[2].split(',')
+                                for immunity in m[2].split(b',')
                                 if immunity.strip()
                             ] + [
                                 (weakness.strip(), 2)
-                                for weakness in m[3].split(',')
+                                for weakness in m[3].split(b',')
                                 if weakness.strip()
                             ]
                         )
                     )
-                    for m in re.findall(
-                        r'(\d+)\s+units\s+each\s+with\s+(\d+)\s+hit\s+points\s+'
-                        + r'(?:\(\s*'
-                            + r'(?:'
-                                + r'(?:'
-                                    + r'(?:immune\s+to\s+(\w+(?:\s*,\s*\w+)*)\s*)'
-                                    + r'|'
-                                    + r'(?:weak\s+to\s+(\w+(?:\s*,\s*\w+)*)\s*)'
-                                + r')'
-                                + r';?\s*'
-                            + r')+'
-                        + r'\)\s+)?'
-                        + r'with\s+an\s+attack\s+that\s+does\s+'
-                        + r'(\d+)\s+(\w+)\s+damage\s+'
-                        + r'at\s+initiative\s+(\d+)'
-                        ,
-                        section
+                    for m in (
+                        match.groups(b'')
+                        for match in re_unit_group.finditer(input_data, section_start, section_end)
                     )
                 )
-                for section in
-                input_data.split('Infection:')
+                for infection_start in [input_data.find(b'Infection:')]
+                for (section_start, section_end) in (
+                    (0, infection_start),
+                    (infection_start, len(input_data)),
+                )
             )
         )
 
@@ -315,7 +279,7 @@ process_input_data = lambda input_data: (
 
 process_one_round = lambda combat_data: (
             # generator expression to bind names to values
-            (
+            next(
 
 # The second reduction, run against `attacker_order`,
 # performs the actual attacks.
@@ -324,7 +288,7 @@ process_one_round = lambda combat_data: (
 
 # For each step of the reduction,
 
-                    lambda combat_data, attacker: ( # generator expression
+                    lambda combat_data, attacker: next( # generator expression
 
 #     Return the new state with the modified defender.
 #     The defender's side is `1-unit[0]`, and the
@@ -432,7 +396,7 @@ process_one_round = lambda combat_data: (
                             )
                         ]
 
-                    ).next() # generator expression
+                    ) # generator expression
 
                     ,
 
@@ -487,7 +451,7 @@ process_one_round = lambda combat_data: (
 
 # At each step of the reduction,
 
-                        lambda unit_targets, attacker: ( # generator expression
+                        lambda unit_targets, attacker: next( # generator expression
 
 #         return the unchanged list of units and targets.
 
@@ -570,7 +534,7 @@ process_one_round = lambda combat_data: (
                                 )
                             ]
 
-                        ).next() # generator expression
+                        ) # generator expression
                         ,
 
 # The first reduction, against the ordered list of units...
@@ -601,7 +565,7 @@ process_one_round = lambda combat_data: (
                     )
                 ]
 
-            ).next()
+            )
         )
 
 ########################################################################
@@ -649,7 +613,7 @@ combat_results = lambda combat_data: (
                     for unit in groups
                 )
                 for groups in (
-                    itertools.dropwhile(
+                    next(itertools.dropwhile(
                         lambda new_and_old_combat_data: (
                             (
                                 new_and_old_combat_data[0]
@@ -677,7 +641,7 @@ combat_results = lambda combat_data: (
                                 )
                             )
                         )
-                    ).next()
+                    ))
                 )[0]
             )
         )
@@ -761,7 +725,7 @@ part_2 = lambda input_data: (
 # Filter the accumulator through a `dropwhile` that drops any state
 # in which the lower bound and upper bound are not equal.
 
-            itertools.dropwhile(
+            next(itertools.dropwhile(
                 lambda bounds: (bounds[0] != bounds[1])
                 ,
 
@@ -786,7 +750,7 @@ part_2 = lambda input_data: (
 
                     lambda bounds, _: (
                         # generator expression to bind names to values
-                        (
+                        next(
                             (
 
 #     If the combat results show the infection dead ([1] == 0)
@@ -818,14 +782,14 @@ part_2 = lambda input_data: (
                                     bounds[1]
                                 )
                             ]
-                        ).next()
+                        )
                     )
                 )
 
 # The minimal boost is one higher than the bounds returned by the
 # next iteration of the dropwhile.
 
-            ).next()[2]
+            ))[2]
         )
 
 ########################################################################
@@ -834,68 +798,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    base_filename = __file__.rsplit('.')[0]
-
-    input_filename = '{}.input'.format(base_filename)
-    input_data = open(input_filename).read()
-
-    if run_part_1 and run_samples:
-
-        for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-            sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-            sample_data = open(sample_filename).read()
-
-            results_filename = '{}.sample.results.part1.{}'.format(base_filename, sample_num)
-            expected = (
-                        int(open(results_filename).read().strip())
-                        if os.path.exists(results_filename)
-                        else None
-                    )
-
-            t = time.time()
-            if DEBUGGING: print >> sys.stderr, "\nprocessing {} with expected results {}".format(sample_filename, expected)
-            result = part_1(process_input_data(sample_data))
-            if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-            t = time.time() - t
-            print "{}: sample {}: part 1 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-    if run_part_1 and run_data:
-
-        t = time.time()
-        if DEBUGGING: print >> sys.stderr, "\nprocessing {}".format(sample_filename)
-        result = part_1(process_input_data(input_data))
-        if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-        t = time.time() - t
-        print "{}: input data: part 1 = {}".format(t, result)
-
-    if run_part_2 and run_samples:
-
-        for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-            sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-            sample_data = open(sample_filename).read()
-
-            results_filename = '{}.sample.results.part2.{}'.format(base_filename, sample_num)
-            expected = (
-                        int(open(results_filename).read().strip())
-                        if os.path.exists(results_filename)
-                        else None
-                    )
-
-            t = time.time()
-            if DEBUGGING: print >> sys.stderr, "\nprocessing {} with expected results {}".format(sample_filename, expected)
-            result = part_2(process_input_data(sample_data))
-            if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-            t = time.time() - t
-            print "{}: sample {}: part 2 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-    if run_part_2 and run_data:
-
-        t = time.time()
-        if DEBUGGING: print >> sys.stderr, "\nprocessing {}".format(sample_filename)
-        result = part_2(process_input_data(input_data))
-        if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-        t = time.time() - t
-        print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, parts=[part for (part, run_part) in ((1, run_part_1), (2, run_part_2)) if run_part], samples=run_samples, data=run_data, debugging=DEBUGGING, mapped=mapped_input)
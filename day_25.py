@@ -1,11 +1,8 @@
 
-import re
-import sys
 import itertools
-import time
-import operator
-import os.path
-import pprint
+import support
+
+from support import accumulate, reduce
 
 run_part_1 = True
 run_part_2 = False
@@ -15,55 +12,9 @@ run_data = True
 
 DEBUGGING = False
 
-# pull in python-native version of `accumulate` from python 3
-def accumulate(iterable, func=operator.add):
-    'Return running totals'
-    # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
-    # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
-    it = iter(iterable)
-    try:
-        total = next(it)
-    except StopIteration:
-        return
-    yield total
-    for element in it:
-        total = func(total, element)
-        yield total
-
-real_accumulate = accumulate
-def debug_accumulate(iterable, func = operator.add):
-    def debug(state, value):
-        print >> sys.stderr, ">>accumulate<< element={!r}".format(value)
-        return func(state, value)
-    for state in real_accumulate(iterable, debug):
-        print >> sys.stderr, ">>accumulate<< state={!r}".format(state)
-        yield state
-    print >> sys.stderr, ">>accumulate<< done"
-
-real_reduce = reduce
-def debug_reduce(func, *args):
-    def debug(state, value):
-        print >> sys.stderr, ">>reduce<< state={!r} value={!r}".format(state, value)
-        return func(state, value)
-    final = real_reduce(debug, *args)
-    print >> sys.stderr, ">>reduce<< final state={0!r}".format(final)
-    return final
-
-if DEBUGGING:
-
-    print >> sys.stderr, "Debugging version of `reduce` enabled"
-
-    reduce = debug_reduce
-
 if DEBUGGING:
 
-    print >> sys.stderr, "Debugging version of `accumulate` enabled"
-
-    accumulate = debug_accumulate
-
-def debug_value(prefix, value):
-    print >> sys.stderr, '{}{}'.format(prefix, value)
-    return value
+    from support import debug_accumulate as accumulate, debug_reduce as reduce
 
 ########################################################################
 #
@@ -104,7 +55,7 @@ distance = lambda p1,p2: (
 
 is_part_of_constellation = lambda point, constellation: (
             isinstance(
-                itertools.dropwhile(
+                next(itertools.dropwhile(
                     lambda constellation_point: (
                         constellation_point
                         and
@@ -116,7 +67,7 @@ is_part_of_constellation = lambda point, constellation: (
                         ,
                         [False]
                     )
-                ).next()
+                ))
                 ,
                 tuple
             )
@@ -155,7 +106,7 @@ is_part_of_constellation = lambda point, constellation: (
 
 constellations = lambda points: (
             reduce(
-                lambda constellations, point: (
+                lambda constellations, point: next(
                     (
                         constellations
                         - set(joinable) 
@@ -175,7 +126,7 @@ constellations = lambda points: (
                             if is_part_of_constellation(point, constellation)
                         ]
                     ]
-                ).next()
+                )
                 ,
                 points
                 ,
@@ -205,68 +156,4 @@ part_2 = lambda input_data: (
 
 if __name__ == '__main__':
 
-    base_filename = __file__.rsplit('.')[0]
-
-    input_filename = '{}.input'.format(base_filename)
-    input_data = open(input_filename).read()
-
-    if run_part_1 and run_samples:
-
-        for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-            sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-            sample_data = open(sample_filename).read()
-
-            results_filename = '{}.sample.results.part1.{}'.format(base_filename, sample_num)
-            expected = (
-                        int(open(results_filename).read().strip())
-                        if os.path.exists(results_filename)
-                        else None
-                    )
-
-            t = time.time()
-            if DEBUGGING: print >> sys.stderr, "\nprocessing {} with expected results {}".format(sample_filename, expected)
-            result = part_1(process_input_data(sample_data))
-            if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-            t = time.time() - t
-            print "{}: sample {}: part 1 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-    if run_part_1 and run_data:
-
-        t = time.time()
-        if DEBUGGING: print >> sys.stderr, "\nprocessing {}".format(sample_filename)
-        result = part_1(process_input_data(input_data))
-        if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-        t = time.time() - t
-        print "{}: input data: part 1 = {}".format(t, result)
-
-    if run_part_2 and run_samples:
-
-        for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1)):
-
-            sample_filename = '{}.sample.{}'.format(base_filename, sample_num)
-            sample_data = open(sample_filename).read()
-
-            results_filename = '{}.sample.results.part2.{}'.format(base_filename, sample_num)
-            expected = (
-                        int(open(results_filename).read().strip())
-                        if os.path.exists(results_filename)
-                        else None
-                    )
-
-            t = time.time()
-            if DEBUGGING: print >> sys.stderr, "\nprocessing {} with expected results {}".format(sample_filename, expected)
-            result = part_2(process_input_data(sample_data))
-            if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-            t = time.time() - t
-            print "{}: sample {}: part 2 = {}{}".format(t, sample_num, result, " (expected {})".format(expected) if result != expected else "")
-
-    if run_part_2 and run_data:
-
-        t = time.time()
-        if DEBUGGING: print >> sys.stderr, "\nprocessing {}".format(sample_filename)
-        result = part_2(process_input_data(input_data))
-        if DEBUGGING: result = '\n' + pprint.pformat(result) + '\n'
-        t = time.time() - t
-        print "{}: input data: part 2 = {}".format(t, result)
-
+    support.main(__file__, process_input_data, part_1, part_2, parts=[part for (part, run_part) in ((1, run_part_1), (2, run_part_2)) if run_part], samples=run_samples, data=run_data, debugging=DEBUGGING)
@@ -0,0 +1,106 @@
+
+import os
+import os.path
+import pickle
+import hashlib
+import tempfile
+
+########################################################################
+#
+# Persistent, content-addressed on-disk cache.
+#
+# Each entry is a pickle stored under `<directory>/<key[:2]>/<key>`,
+# where the key is a SHA-256 hex digest built by `cache_key` from
+# whatever identifies the cached value (typically file digests from
+# `file_digest`).
+#
+# Reading an entry touches its modification time, so the modification
+# times order the entries from least to most recently used; `cache_evict`
+# removes the least recently used entries until the cache fits within a
+# size bound.
+
+base_directory = os.path.dirname(os.path.abspath(__file__))
+
+default_directory = os.path.join(base_directory, '.cache')
+
+default_max_bytes = 64 * 1024 * 1024
+
+pickle_protocol = 2
+
+########################################################################
+#
+# Key helpers.
+
+def file_digest(filename, block_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as source:
+        for block in iter(lambda: source.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def cache_key(*components):
+    return hashlib.sha256(
+                '\0'.join(str(component) for component in components).encode('utf-8')
+            ).hexdigest()
+
+def entry_filename(directory, key):
+    return os.path.join(directory, key[:2], key)
+
+########################################################################
+#
+# Fetch an entry, returning `default` if it is missing or unreadable.
+
+def cache_get(directory, key, default=None):
+    filename = entry_filename(directory, key)
+    try:
+        with open(filename, 'rb') as entry:
+            value = pickle.load(entry)
+        os.utime(filename, None)
+        return value
+    except Exception:
+        return default
+
+########################################################################
+#
+# Store an entry.
+#
+# The entry is written to a temporary file and renamed into place, so a
+# concurrent reader never sees a partial entry.
+
+def cache_put(directory, key, value):
+    filename = entry_filename(directory, key)
+    if not os.path.isdir(os.path.dirname(filename)):
+        os.makedirs(os.path.dirname(filename))
+    descriptor, temporary_filename = tempfile.mkstemp(dir=os.path.dirname(filename))
+    with os.fdopen(descriptor, 'wb') as entry:
+        pickle.dump(value, entry, pickle_protocol)
+    os.rename(temporary_filename, filename)
+
+########################################################################
+#
+# Evict least recently used entries until the cache holds no more than
+# `max_bytes`.  Returns the number of entries evicted.
+
+def cache_evict(directory, max_bytes=default_max_bytes):
+
+    if not os.path.isdir(directory):
+        return 0
+
+    entries = sorted(
+                (status.st_mtime, status.st_size, filename)
+                for subdirectory, _, filenames in os.walk(directory)
+                for filename in (os.path.join(subdirectory, name) for name in filenames)
+                for status in [os.stat(filename)]
+            )
+
+    total_bytes = sum(size for (_, size, _) in entries)
+
+    evicted = 0
+    for (_, size, filename) in entries:
+        if total_bytes <= max_bytes:
+            break
+        os.remove(filename)
+        total_bytes -= size
+        evicted += 1
+
+    return evicted
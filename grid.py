@@ -0,0 +1,142 @@
+
+########################################################################
+#
+# Compact 2D grids.
+#
+# The grid simulations (the carts of day 13, the combat of day 15, the
+# lumber of day 18, and the rendering of day 17) used to keep their maps
+# as flat strings or lists and rebuild them with slicing, as in
+# `map[:i] + 'X' + map[i+1:]`, so every cell they changed copied the
+# whole map.  A grid here keeps its cells in a flat `bytearray`, one
+# byte per cell, row after row, which is updated in place.
+#
+# A grid is a dictionary:
+# ```
+#   {
+#       'cells': <bytearray>,
+#       'width': <columns>, 'height': <rows>, 'pad': <border width>,
+#       'neighbors4': <offsets of the 4 orthogonal neighbors>,
+#       'neighbors8': <offsets of all 8 neighbors>
+#   }
+# ```
+# where `width` and `height` include a border of `pad` cells on every
+# side.  A border wide enough for the neighbors a simulation looks at
+# means it never has to check whether a neighbor is off the map: moving
+# from cell `index` to cell `index + offset` for any of the neighbor
+# offsets always lands on the grid.  The offsets are in reading order
+# (top to bottom, then left to right), which is the order most puzzles
+# break ties in.
+#
+# Indexing a `bytearray` gives an integer in both Python 2 and Python 3,
+# so cells are compared against `ord(...)` values (or sliced, which
+# gives a `bytearray`).  `put` and `put_all` update cells in place and
+# return the cells, so they can be used inside the solvers' expressions:
+# ```
+#   put(cells, index, '.')
+#   put_all(cells, ((old_index, '.'), (new_index, 'G')))
+# ```
+#
+# Simulations whose states must not change under them (states kept by
+# `accumulate`, or compared with earlier states) copy the cells once
+# per step with `bytearray(cells)` and then update the copy in place,
+# so a step costs one copy rather than one copy per cell changed.
+
+########################################################################
+#
+# Create a grid, either blank or from the lines of a map.
+#
+# A map's lines are padded on the right with `fill` to the width of its
+# longest line.
+
+def neighbor_offsets(width):
+    return (
+                (-width, -1, 1, width),
+                (-width - 1, -width, -width + 1, -1, 1, width - 1, width, width + 1),
+            )
+
+def new_grid(cells, width, height, pad):
+    neighbors4, neighbors8 = neighbor_offsets(width)
+    return {
+                'cells': cells,
+                'width': width,
+                'height': height,
+                'pad': pad,
+                'neighbors4': neighbors4,
+                'neighbors8': neighbors8,
+            }
+
+def blank_grid(width, height, fill=' ', pad=0, border=' '):
+    return from_lines([fill * width] * height, pad, border, fill)
+
+def from_lines(lines, pad=0, border=' ', fill=' '):
+    width = max(len(line) for line in lines) if lines else 0
+    padded_width = width + 2 * pad
+    rows = (
+                [border * padded_width] * pad
+                + [
+                    border * pad + line + fill * (width - len(line)) + border * pad
+                    for line in lines
+                ]
+                + [border * padded_width] * pad
+            )
+    return new_grid(bytearray(''.join(rows).encode('ascii')), padded_width, len(rows), pad)
+
+def from_text(text, pad=0, border=' ', fill=' '):
+    return from_lines(text.rstrip('\n').split('\n') if text.strip('\n') else [], pad, border, fill)
+
+########################################################################
+#
+# Convert between indexes and `(x, y)` positions, which leave out the
+# border.
+
+def index(grid, x, y):
+    return (y + grid['pad']) * grid['width'] + x + grid['pad']
+
+def position(grid, index):
+    return (index % grid['width'] - grid['pad'], index // grid['width'] - grid['pad'])
+
+# The indexes of the cells inside the border, in reading order.
+
+def interior(grid):
+    return [
+                row * grid['width'] + column
+                for row in range(grid['pad'], grid['height'] - grid['pad'])
+                for column in range(grid['pad'], grid['width'] - grid['pad'])
+            ]
+
+########################################################################
+#
+# Update cells in place, returning the cells.  Values are one-character
+# strings or byte values.
+
+def put(cells, index, value):
+    cells[index] = ord(value) if not isinstance(value, int) else value
+    return cells
+
+def put_all(cells, updates):
+    for (index, value) in updates:
+        cells[index] = ord(value) if not isinstance(value, int) else value
+    return cells
+
+########################################################################
+#
+# Copy a grid, with new cells if given (e.g. the next generation of a
+# cellular automaton) or a copy of its own.
+
+def copy_grid(grid, cells=None):
+    return new_grid(
+                cells if cells is not None else bytearray(grid['cells']),
+                grid['width'],
+                grid['height'],
+                grid['pad'],
+            )
+
+########################################################################
+#
+# Render a grid's cells as text, without the border.
+
+def to_text(grid):
+    return '\n'.join(
+                grid['cells'][row * grid['width'] + grid['pad']:(row + 1) * grid['width'] - grid['pad']].decode('ascii')
+                for row in range(grid['pad'], grid['height'] - grid['pad'])
+            )
@@ -0,0 +1,747 @@
+
+import os
+import os.path
+import sys
+import math
+import random
+import argparse
+import datetime
+
+########################################################################
+#
+# Synthetic input generators.
+#
+# The bundled `.input` files are all small, so scaling problems in the
+# solvers never show up on them.  Each `generate_day_NN(scale, rng)`
+# below writes a valid puzzle input for its day at a requested scale,
+# drawing every random choice from `rng` (a seeded `random.Random`) so
+# that the same day, scale and seed always produce the same input.
+#
+# "Valid" means the solvers terminate with a well-defined answer, which
+# for several days takes some care (a guaranteed repeat for day 1,
+# exactly one intact claim for day 3, a single surviving cart for day
+# 13, a connected cave for day 15, and so on); each generator documents
+# what it guarantees and what `scale` means for its day.
+#
+# `write_input(day, scale, seed)` writes the generated input to
+# `.generated/<day>.scale<scale>.seed<seed>.input` (once) and returns
+# the filename; the runner's `--generate` option uses it.
+#
+# Python 2 and Python 3 seed and draw from `random.Random` differently,
+# so the two generate different inputs for the same seed.  An input is
+# only generated once, though, so runs under either interpreter (see the
+# runner's `--python` option) share the file and solve the same input.
+
+base_directory = os.path.dirname(os.path.abspath(__file__))
+
+default_directory = os.path.join(base_directory, '.generated')
+
+########################################################################
+#
+# Day 1: `scale` frequency adjustments.
+#
+# The adjustments are adjusted so their total drift is zero, or between
+# 1 and `scale / 4` either way, each a third of the time.  With no
+# drift, the second pass repeats the first pass's frequencies; otherwise,
+# with more prefix sums than residues modulo the drift, two prefix sums
+# must share a residue.  Either way part 2 finds a repeated frequency.
+
+def generate_day_01(scale, rng):
+
+    deltas = [rng.choice((-1, 1)) * rng.randint(1, 20) for _ in range(max(scale, 4))]
+
+    drift = rng.choice((-1, 0, 1)) * rng.randint(1, max(1, len(deltas) // 4))
+    difference = drift - sum(deltas)
+    while difference:
+        step = max(-5, min(5, difference))
+        deltas[rng.randrange(len(deltas))] += step
+        difference -= step
+
+    return ''.join('{:+d}\n'.format(delta) for delta in deltas)
+
+########################################################################
+#
+# Day 2: `scale` 26-letter box ids.
+#
+# The ids are random, plus one planted pair differing in exactly one
+# position; random ids differing in a single position are vanishingly
+# unlikely.
+
+def generate_day_02(scale, rng):
+
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    box_ids = [
+                ''.join(rng.choice(letters) for _ in range(26))
+                for _ in range(max(scale, 2) - 1)
+            ]
+
+    original = rng.choice(box_ids)
+    position = rng.randrange(26)
+    box_ids.insert(
+                rng.randrange(len(box_ids) + 1),
+                original[:position] + rng.choice(letters.replace(original[position], '')) + original[position+1:]
+            )
+
+    return ''.join('{}\n'.format(box_id) for box_id in box_ids)
+
+########################################################################
+#
+# Day 3: `scale` fabric claims.
+#
+# The fabric grows with the number of claims to keep the density of
+# the real input.  Claims are generated in overlapping pairs, plus one
+# claim in a strip of fabric beyond all the others, so that exactly one
+# claim is intact.
+
+def generate_day_03(scale, rng):
+
+    size = max(1000, int(1000 * math.sqrt(scale / 1300.0)))
+
+    def random_claim():
+        width, height = rng.randint(10, 29), rng.randint(10, 29)
+        return (rng.randint(0, size - width), rng.randint(0, size - height), width, height)
+
+    def overlapping_claim(claim):
+        x, y, width, height = claim
+        other_width, other_height = rng.randint(10, 29), rng.randint(10, 29)
+        return (
+                    min(size - other_width, max(0, rng.randint(x - other_width + 1, x + width - 1))),
+                    min(size - other_height, max(0, rng.randint(y - other_height + 1, y + height - 1))),
+                    other_width,
+                    other_height,
+                )
+
+    claims = []
+    while len(claims) < max(scale, 3) - 1:
+        claims.append(
+                    overlapping_claim(claims[-1])
+                    if len(claims) % 2
+                    else overlapping_claim(rng.choice(claims))
+                    if len(claims) == max(scale, 3) - 2
+                    else random_claim()
+                )
+
+    claims.append((size + 1, rng.randint(0, size - 29), rng.randint(10, 29), rng.randint(10, 29)))
+    rng.shuffle(claims)
+
+    return ''.join(
+                '#{} @ {},{}: {}x{}\n'.format(claim_id, x, y, width, height)
+                for claim_id, (x, y, width, height) in enumerate(claims, 1)
+            )
+
+########################################################################
+#
+# Day 4: `scale` guard shifts.
+#
+# Each shift starts shortly before or after midnight and has up to three
+# naps between 00:06 and 00:59; the first shift always has a nap.  The
+# records are shuffled, as in the real input.
+
+def generate_day_04(scale, rng):
+
+    guard_ids = rng.sample(range(10, 3500), max(2, scale // 20))
+
+    records = []
+    for day in range(max(scale, 1)):
+
+        date = datetime.date(1518, 1, 1) + datetime.timedelta(days=day)
+        if rng.random() < 0.5:
+            start = (date - datetime.timedelta(days=1), 23, rng.randint(45, 59))
+        else:
+            start = (date, 0, rng.randint(0, 5))
+        records.append((start, 'Guard #{} begins shift'.format(rng.choice(guard_ids))))
+
+        naps = rng.randint(1 if day == 0 else 0, 3)
+        minutes = sorted(rng.sample(range(6, 60), 2 * naps))
+        for asleep, awake in zip(minutes[0::2], minutes[1::2]):
+            records.append(((date, 0, asleep), 'falls asleep'))
+            records.append(((date, 0, awake), 'wakes up'))
+
+    rng.shuffle(records)
+
+    return ''.join(
+                '[{:04d}-{:02d}-{:02d} {:02d}:{:02d}] {}\n'.format(date.year, date.month, date.day, hour, minute, text)
+                for ((date, hour, minute), text) in records
+            )
+
+########################################################################
+#
+# Day 5: a polymer of `scale` units.
+#
+# About a third of the units are the opposite polarity of the unit
+# before them, so there are plenty of reactions, as in the real input.
+
+def generate_day_05(scale, rng):
+
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+
+    units = []
+    for _ in range(max(scale, 1)):
+        if units and rng.random() < 0.35:
+            units.append(units[-1].swapcase())
+        else:
+            unit = rng.choice(letters)
+            units.append(unit if rng.random() < 0.5 else unit.upper())
+
+    return ''.join(units) + '\n'
+
+########################################################################
+#
+# Day 6: `scale` distinct coordinates.
+#
+# The bounding box grows with the square root of the number of points,
+# keeping the density of the real input.
+
+def generate_day_06(scale, rng):
+
+    side = int(50 * math.sqrt(max(scale, 5)))
+
+    points = []
+    seen = set()
+    while len(points) < max(scale, 5):
+        point = (rng.randrange(40, 40 + side), rng.randrange(40, 40 + side))
+        if point not in seen:
+            seen.add(point)
+            points.append(point)
+
+    return ''.join('{}, {}\n'.format(x, y) for (x, y) in points)
+
+########################################################################
+#
+# Day 7: `scale` steps.
+#
+# Step names must be single letters (part 2 derives each step's duration
+# from its letter), so the scale is capped at the 52 letters `A-Za-z`.
+# Every step but the first depends on one to three earlier steps in a
+# random order, which keeps the graph acyclic.
+
+def generate_day_07(scale, rng):
+
+    steps = list('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')[:max(2, min(scale, 52))]
+    rng.shuffle(steps)
+
+    orders = [
+                (before, after)
+                for index, after in enumerate(steps)
+                if index
+                for before in rng.sample(steps[:index], min(index, rng.randint(1, 3)))
+            ]
+    rng.shuffle(orders)
+
+    return ''.join(
+                'Step {} must be finished before step {} can begin.\n'.format(before, after)
+                for (before, after) in orders
+            )
+
+########################################################################
+#
+# Day 8: a license tree of `scale` nodes.
+#
+# Each node after the root is attached to a random earlier node (so the
+# tree is about log(scale) deep) and has one to five metadata entries;
+# a node with children has metadata that mostly indexes its children.
+
+def generate_day_08(scale, rng):
+
+    children = [[] for _ in range(max(scale, 1))]
+    for node in range(1, len(children)):
+        children[rng.randrange(node)].append(node)
+
+    metadata_counts = [rng.randint(1, 5) for _ in children]
+
+    numbers = []
+    stack = [(0, False)]
+    while stack:
+        node, finished = stack.pop()
+        if finished:
+            numbers.extend(
+                        rng.randint(1, len(children[node]) + 1) if children[node] else rng.randint(1, 9)
+                        for _ in range(metadata_counts[node])
+                    )
+        else:
+            numbers.extend((len(children[node]), metadata_counts[node]))
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children[node]))
+
+    return ' '.join(str(number) for number in numbers) + '\n'
+
+########################################################################
+#
+# Day 9: a game ending with marble `scale` (part 2 plays 100 times as
+# many marbles).
+#
+# The players grow with the marbles, each playing 20 to 200 of them (the
+# real input has about 160 apiece), so the scores are never more than a
+# small part of the state, whatever the scale.
+
+def generate_day_09(scale, rng):
+    marbles = max(scale, 25)
+    return '{} players; last marble is worth {} points\n'.format(
+                rng.randint(max(2, marbles // 200), max(2, marbles // 20)),
+                marbles,
+            )
+
+########################################################################
+#
+# Day 10: `scale` lights.
+#
+# The lights are laid out as horizontal dominoes in a 10-row message,
+# given random velocities, and run backwards 8000 to 12000 seconds; at
+# the message time every light has a neighbor, which is what part 1
+# waits for.
+
+def generate_day_10(scale, rng):
+
+    count = max(scale, 2)
+    width = max(10, count // 4)
+    seconds = rng.randint(8000, 12000)
+
+    lit = set()
+    while len(lit) < count - count % 2:
+        x, y = rng.randrange(width), rng.randrange(10)
+        if (x, y) not in lit and (x + 1, y) not in lit:
+            lit.update([(x, y), (x + 1, y)])
+    if count % 2:
+        x, y = rng.choice(sorted(lit))
+        lit.add((x, y + 1) if (x, y + 1) not in lit else (x, y - 1))
+
+    velocities = [
+                (dx, dy)
+                for dx in range(-5, 6)
+                for dy in range(-5, 6)
+                if dx or dy
+            ]
+
+    lights = [
+                ((x - dx * seconds, y - dy * seconds), (dx, dy))
+                for (x, y) in sorted(lit)
+                for (dx, dy) in [rng.choice(velocities)]
+            ]
+    rng.shuffle(lights)
+
+    return ''.join(
+                'position=<{:6d}, {:6d}> velocity=<{:2d}, {:2d}>\n'.format(x, y, dx, dy)
+                for ((x, y), (dx, dy)) in lights
+            )
+
+########################################################################
+#
+# Day 11: a grid serial number.  The grid is fixed at 300x300 by the
+# puzzle, so `scale` is ignored.
+
+def generate_day_11(scale, rng):
+    return '{}\n'.format(rng.randint(1000, 9999))
+
+########################################################################
+#
+# Day 12: an initial state of `scale` pots.
+#
+# The rules make each pot take the state of the pot to its left, so the
+# pattern translates by one pot per generation; that is the steady state
+# part 2 waits for, and it is reached after the first generation.
+
+def generate_day_12(scale, rng):
+
+    initial = '#' + ''.join(rng.choice('.#') for _ in range(max(scale, 3) - 2)) + '#'
+
+    patterns = [
+                ''.join('#' if pattern & (1 << bit) else '.' for bit in range(4, -1, -1))
+                for pattern in range(32)
+            ]
+    rng.shuffle(patterns)
+
+    return 'initial state: {}\n\n{}'.format(
+                initial,
+                ''.join('{} => {}\n'.format(pattern, pattern[1]) for pattern in patterns)
+            )
+
+########################################################################
+#
+# Day 13: about `scale` carts on separate rectangular loops.
+#
+# On each loop half the carts run clockwise and half anticlockwise,
+# except that one loop has an extra clockwise cart.  Carts running in
+# opposite directions on a loop always collide, and carts running in the
+# same direction never do as long as they start at least one track cell
+# apart, so there is always a first crash (part 1) and exactly one cart
+# is left at the end (part 2).
+
+def generate_day_13(scale, rng):
+
+    count = max(scale, 3)
+    loops = max(1, count // 8)
+    loop_carts = [count // loops + (1 if loop < count % loops else 0) for loop in range(loops)]
+
+    loops_per_row = int(math.ceil(math.sqrt(loops)))
+    loop_width = max(8, 2 * max(loop_carts) + 4)
+    loop_height = max(6, loop_width // 2)
+
+    width = loops_per_row * (loop_width + 1) + 1
+    height = int(math.ceil(float(loops) / loops_per_row)) * (loop_height + 1) + 1
+    grid = [[' '] * width for _ in range(height)]
+
+    odd_loop = rng.randrange(loops)
+
+    for loop, carts in enumerate(loop_carts):
+
+        left = 1 + (loop % loops_per_row) * (loop_width + 1)
+        top = 1 + (loop // loops_per_row) * (loop_height + 1)
+        right = left + loop_width - 1
+        bottom = top + loop_height - 1
+
+        # The track cells in clockwise order, each with the clockwise
+        # direction of travel there (`None` for the corners).
+
+        track = (
+                    [(x, top, '>' if x != left else None) for x in range(left, right)]
+                    + [(right, y, 'v' if y != top else None) for y in range(top, bottom)]
+                    + [(x, bottom, '<' if x != right else None) for x in range(right, left, -1)]
+                    + [(left, y, '^' if y != bottom else None) for y in range(bottom, top, -1)]
+                )
+
+        for (x, y, direction) in track:
+            grid[y][x] = '-' if direction in ('<', '>') else '|'
+        grid[top][left] = grid[bottom][right] = '/'
+        grid[top][right] = grid[bottom][left] = '\\'
+
+        clockwise_carts = carts // 2 + (1 if loop == odd_loop else 0)
+        cells = [cell for cell in track[::2] if cell[2] is not None]
+
+        for index, (x, y, direction) in enumerate(rng.sample(cells, clockwise_carts + carts // 2)):
+            grid[y][x] = direction if index < clockwise_carts else { '>': '<', '<': '>', '^': 'v', 'v': '^' }[direction]
+
+    return ''.join(''.join(row) + '\n' for row in grid)
+
+########################################################################
+#
+# Day 14: the number of recipes, `scale` itself.
+
+def generate_day_14(scale, rng):
+    return '{}\n'.format(max(scale, 10))
+
+########################################################################
+#
+# Day 15: a cave with `scale` units.
+#
+# The cave grows with the square root of the number of units.  A quarter
+# of the interior is wall, and any open cell not connected to the rest
+# is walled in, so every unit can eventually reach an enemy and combat
+# always ends.  Units are split evenly between goblins and elves.
+
+def generate_day_15(scale, rng):
+
+    count = max(scale, 2)
+    side = max(7, int(6 * math.sqrt(count)))
+
+    while True:
+
+        grid = [
+                    [
+                        '#' if x in (0, side - 1) or y in (0, side - 1) or rng.random() < 0.25 else '.'
+                        for x in range(side)
+                    ]
+                    for y in range(side)
+                ]
+
+        open_cells = [(x, y) for y in range(side) for x in range(side) if grid[y][x] == '.']
+        if not open_cells:
+            continue
+
+        reached = set([rng.choice(open_cells)])
+        frontier = list(reached)
+        while frontier:
+            x, y = frontier.pop()
+            for neighbor in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+                if grid[neighbor[1]][neighbor[0]] == '.' and neighbor not in reached:
+                    reached.add(neighbor)
+                    frontier.append(neighbor)
+
+        if len(reached) >= 2 * count:
+            break
+
+    for (x, y) in open_cells:
+        if (x, y) not in reached:
+            grid[y][x] = '#'
+
+    for index, (x, y) in enumerate(rng.sample(sorted(reached), count)):
+        grid[y][x] = 'GE'[index % 2]
+
+    return ''.join(''.join(row) + '\n' for row in grid)
+
+########################################################################
+#
+# Day 16: `scale` instruction samples and a `scale`-instruction program.
+#
+# Opcode numbers are a random permutation.  More samples are added
+# until eliminating candidates identifies every opcode, which part 2
+# relies on.
+
+instructions = {
+            'addr': lambda regs, a, b: regs[a] + regs[b],
+            'addi': lambda regs, a, b: regs[a] + b,
+            'mulr': lambda regs, a, b: regs[a] * regs[b],
+            'muli': lambda regs, a, b: regs[a] * b,
+            'banr': lambda regs, a, b: regs[a] & regs[b],
+            'bani': lambda regs, a, b: regs[a] & b,
+            'borr': lambda regs, a, b: regs[a] | regs[b],
+            'bori': lambda regs, a, b: regs[a] | b,
+            'setr': lambda regs, a, b: regs[a],
+            'seti': lambda regs, a, b: a,
+            'gtir': lambda regs, a, b: 1 if a > regs[b] else 0,
+            'gtri': lambda regs, a, b: 1 if regs[a] > b else 0,
+            'gtrr': lambda regs, a, b: 1 if regs[a] > regs[b] else 0,
+            'eqir': lambda regs, a, b: 1 if a == regs[b] else 0,
+            'eqri': lambda regs, a, b: 1 if regs[a] == b else 0,
+            'eqrr': lambda regs, a, b: 1 if regs[a] == regs[b] else 0,
+        }
+
+def execute(regs, name, a, b, c):
+    return regs[:c] + [instructions[name](regs, a, b)] + regs[c+1:]
+
+def opcodes_identifiable(samples, names):
+
+    candidates = dict((opcode, set(instructions)) for opcode in range(len(names)))
+    for (before, (opcode, a, b, c), after) in samples:
+        candidates[opcode] &= set(
+                    name
+                    for name in instructions
+                    if execute(before, name, a, b, c) == after
+                )
+
+    known = set()
+    while len(known) < len(names):
+        newly_known = set(
+                    name
+                    for names_left in candidates.values()
+                    if len(names_left - known) == 1
+                    for name in names_left - known
+                )
+        if not newly_known:
+            return False
+        known |= newly_known
+
+    return True
+
+def generate_day_16(scale, rng):
+
+    names = sorted(instructions)
+    rng.shuffle(names)
+
+    def random_sample():
+        opcode = rng.randrange(len(names))
+        operands = [rng.randrange(4) for _ in range(3)]
+        before = [rng.randrange(4) for _ in range(4)]
+        return (before, tuple([opcode] + operands), execute(before, names[opcode], *operands))
+
+    samples = [random_sample() for _ in range(max(scale, 1))]
+    while not opcodes_identifiable(samples, names):
+        samples.extend(random_sample() for _ in range(16))
+
+    program = [
+                (rng.randrange(len(names)), rng.randrange(4), rng.randrange(4), rng.randrange(4))
+                for _ in range(max(scale, 1))
+            ]
+
+    return '{}\n\n{}'.format(
+                ''.join(
+                    'Before: {}\n{} {} {} {}\nAfter:  {}\n\n'.format(before, *(instruction + (after,)))
+                    for (before, instruction, after) in samples
+                ),
+                ''.join('{} {} {} {}\n'.format(*instruction) for instruction in program)
+            )
+
+########################################################################
+#
+# Day 17: `scale` clay veins.
+#
+# Veins are generated as buckets (two walls and a floor, three veins
+# each) laid out in a grid of cells around the spring, so no two
+# buckets overlap; any remaining veins are short horizontal shelves.
+
+def generate_day_17(scale, rng):
+
+    count = max(scale, 3)
+    buckets = count // 3
+    columns = int(math.ceil(math.sqrt(buckets + count % 3)))
+    cell_width, cell_height = 20, 16
+
+    cells = [
+                (500 - columns * cell_width // 2 + column * cell_width, 1 + row * cell_height)
+                for row in range(columns)
+                for column in range(columns)
+            ]
+    rng.shuffle(cells)
+
+    veins = []
+    for (cell_x, cell_y) in cells[:buckets]:
+        width, height = rng.randint(4, 16), rng.randint(3, 12)
+        left = cell_x + rng.randint(1, cell_width - width - 2)
+        top = cell_y + rng.randint(1, cell_height - height - 2)
+        veins.extend([
+                    'x={}, y={}..{}'.format(left, top, top + height),
+                    'x={}, y={}..{}'.format(left + width, rng.randint(top, top + height - 1), top + height),
+                    'y={}, x={}..{}'.format(top + height, left, left + width),
+                ])
+    for (cell_x, cell_y) in cells[buckets:buckets + count % 3]:
+        left = cell_x + rng.randint(1, cell_width // 2)
+        veins.append('y={}, x={}..{}'.format(cell_y + rng.randint(1, cell_height - 2), left, left + rng.randint(1, cell_width // 2 - 1)))
+
+    rng.shuffle(veins)
+
+    return ''.join('{}\n'.format(vein) for vein in veins)
+
+########################################################################
+#
+# Day 18: a `scale` x `scale` lumber collection area, with roughly the
+# mix of open ground, trees and lumberyards of the real input.
+
+def generate_day_18(scale, rng):
+    side = max(scale, 3)
+    return ''.join(
+                ''.join(
+                    '.' if choice < 0.45 else '|' if choice < 0.8 else '#'
+                    for choice in (rng.random() for _ in range(side))
+                ) + '\n'
+                for _ in range(side)
+            )
+
+########################################################################
+#
+# Day 19: a sum-of-divisors program for the number `scale`.
+#
+# Like the real input, the program sums the divisors of a target number
+# with a doubly nested loop (so part 1 runs about 7 * scale**2
+# instructions), and part 2's `1` in register 0 makes the target larger:
+# about 10 * scale, so part 2 runs about 100 times as many instructions
+# as part 1, and grows with the scale like it.  The answer is left in
+# register 0; the other registers, including the one bound to the
+# instruction pointer, are shuffled.
+
+def generate_day_19(scale, rng):
+
+    target, ip, i, j, temp = rng.sample(range(1, 6), 5)
+    larger_target = 10 * max(scale, 1) + rng.randint(0, 9)
+
+    program = [
+                ('seti', max(scale, 1), 0, target),
+                ('eqri', 0, 1, temp),
+                ('addr', temp, ip, ip),
+                ('seti', 5, 0, ip),
+                ('seti', larger_target, 0, target),
+                ('seti', 0, 0, 0),
+                ('seti', 1, 0, i),
+                ('seti', 1, 0, j),
+                ('mulr', i, j, temp),
+                ('eqrr', temp, target, temp),
+                ('addr', temp, ip, ip),
+                ('addi', ip, 1, ip),
+                ('addr', i, 0, 0),
+                ('addi', j, 1, j),
+                ('gtrr', j, target, temp),
+                ('addr', ip, temp, ip),
+                ('seti', 7, 0, ip),
+                ('addi', i, 1, i),
+                ('gtrr', i, target, temp),
+                ('addr', temp, ip, ip),
+                ('seti', 6, 0, ip),
+                ('mulr', ip, ip, ip),
+            ]
+
+    return '#ip {}\n{}'.format(
+                ip,
+                ''.join('{} {} {} {}\n'.format(*instruction) for instruction in program)
+            )
+
+########################################################################
+#
+# Day 24: `scale` groups in each army.
+#
+# Initiatives are a permutation of 1 to 2 * `scale`.  No infection group
+# is immune to the first immune system group's attack type, so a large
+# enough boost always lets the immune system win, which part 2's search
+# relies on.
+
+def generate_day_24(scale, rng):
+
+    damage_types = ['bludgeoning', 'cold', 'fire', 'radiation', 'slashing']
+    groups = max(scale, 1)
+    initiatives = rng.sample(range(1, 2 * groups + 1), 2 * groups)
+
+    def group_line(initiative, attack_type, immune_exclude):
+        immunities = rng.sample([t for t in damage_types if t != immune_exclude], rng.randint(0, 2))
+        weaknesses = rng.sample([t for t in damage_types if t not in immunities], rng.randint(0, 2))
+        traits = '; '.join(
+                    '{} to {}'.format(trait, ', '.join(types))
+                    for (trait, types) in (('immune', immunities), ('weak', weaknesses))
+                    if types
+                )
+        return '{} units each with {} hit points {}with an attack that does {} {} damage at initiative {}\n'.format(
+                    rng.randint(100, 5000),
+                    rng.randint(1000, 10000),
+                    '({}) '.format(traits) if traits else '',
+                    rng.randint(5, 100),
+                    attack_type,
+                    initiative,
+                )
+
+    immune_attack_types = [rng.choice(damage_types) for _ in range(groups)]
+
+    return 'Immune System:\n{}\nInfection:\n{}'.format(
+                ''.join(
+                    group_line(initiatives[index], immune_attack_types[index], None)
+                    for index in range(groups)
+                ),
+                ''.join(
+                    group_line(initiatives[groups + index], rng.choice(damage_types), immune_attack_types[0])
+                    for index in range(groups)
+                ),
+            )
+
+########################################################################
+#
+# Day 25: `scale` points in four-dimensional spacetime, in the same
+# -8..8 range as the real input.
+
+def generate_day_25(scale, rng):
+    return ''.join(
+                '{},{},{},{}\n'.format(*[rng.randint(-8, 8) for _ in range(4)])
+                for _ in range(max(scale, 1))
+            )
+
+########################################################################
+#
+# Registry and file output.
+
+generators = dict(
+            (name[len('generate_'):], function)
+            for (name, function) in list(globals().items())
+            if name.startswith('generate_day_')
+        )
+
+def generate_input(day, scale, seed=0):
+    return generators[day](scale, random.Random('{}:{}:{}'.format(day, scale, seed)))
+
+def write_input(day, scale, seed=0, directory=default_directory):
+    filename = os.path.join(directory, '{}.scale{}.seed{}.input'.format(day, scale, seed))
+    if not os.path.exists(filename):
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open('{}.tmp'.format(filename), 'w') as output:
+            output.write(generate_input(day, scale, seed))
+        os.rename('{}.tmp'.format(filename), filename)
+    return filename
+
+########################################################################
+#
+# Command line: write one generated input to stdout.
+
+if __name__ == '__main__':
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic puzzle input.')
+    parser.add_argument('day', choices=sorted(generators))
+    parser.add_argument('scale', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    sys.stdout.write(generate_input(args.day, args.scale, args.seed))
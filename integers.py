@@ -0,0 +1,153 @@
+
+import os
+import os.path
+import sys
+import array
+import argparse
+import tempfile
+
+import disk_cache
+
+########################################################################
+#
+# Streaming, chunked parsing of whitespace-separated integers.
+#
+# Day 1's input is one signed integer per line, and its solvers used to
+# split the whole input into a list of strings and convert each one with
+# `int`, which for a log of hundreds of millions of lines holds the
+# whole text, a list of strings and a list of integers at once.  Here
+# the input is read a fixed-size chunk at a time, each chunk is split
+# and converted in bulk, and the integers go into an `array` of 64-bit
+# values (typecode 'q', or 'l' on Python 2, where it is 64 bits on the
+# platforms the solvers run on), at eight bytes apiece.
+#
+# A chunk ends at its last whitespace, and the rest of it (the start of
+# a number cut in two) is carried over to the next chunk, so any
+# `chunk_size` gives the same integers.  `chunks` yields one array per
+# chunk, so `total` sums an input of any size in memory bounded by
+# `chunk_size`; `from_buffer` collects the arrays into one, from a
+# buffer such as a memory-mapped input (see `support.mapped_file`).
+#
+# `load` keeps the integers of an input file in a binary cache, the
+# array's raw bytes stored as a `disk_cache` entry keyed by the file's
+# digest, so the file is only parsed once; later loads read the array
+# straight back in.  The cache has a directory of its own, as its entries
+# can be far larger than the runner's result cache is allowed to grow;
+# `disk_cache.cache_evict` bounds it like any other.
+
+chunk_size = 1024 * 1024
+
+default_directory = os.path.join(disk_cache.base_directory, '.integers')
+
+try:
+    array.array('q')
+    typecode = 'q'
+except ValueError:
+    typecode = 'l'
+
+whitespace = (b' ', b'\t', b'\r', b'\n')
+
+def parse(text):
+    return array.array(typecode, map(int, text.split()))
+
+# Split a chunk, carried over part included, into the part which ends
+# at its last whitespace and the rest.
+
+def split_chunk(chunk):
+    cut = max(chunk.rfind(space) for space in whitespace) + 1
+    return chunk[:cut], chunk[cut:]
+
+########################################################################
+#
+# Parse an open (binary) file or a buffer a chunk at a time.
+
+def read_chunks(source, size):
+    if hasattr(source, 'read'):
+        return iter(lambda: source.read(size), b'')
+    return (source[start:start + size] for start in range(0, len(source), size))
+
+def chunks(source, size=None):
+
+    size = size or chunk_size
+
+    carried = b''
+    for chunk in read_chunks(source, size):
+        complete, carried = split_chunk(carried + chunk)
+        if complete:
+            yield parse(complete)
+
+    if carried:
+        yield parse(carried)
+
+def from_buffer(buffer, size=None):
+    values = array.array(typecode)
+    for chunk_values in chunks(buffer, size):
+        values.extend(chunk_values)
+    return values
+
+def total(filename, size=None):
+    with open(filename, 'rb') as input_file:
+        return sum(sum(values) for values in chunks(input_file, size))
+
+########################################################################
+#
+# The binary cache.
+
+def cache_key(filename):
+    return disk_cache.cache_key('integers', disk_cache.file_digest(filename), typecode, array.array(typecode).itemsize, sys.byteorder)
+
+def load(filename, directory=default_directory, size=None):
+
+    entry = disk_cache.entry_filename(directory, cache_key(filename))
+
+    try:
+        with open(entry, 'rb') as cached:
+            values = array.array(typecode)
+            values.fromfile(cached, os.fstat(cached.fileno()).st_size // values.itemsize)
+        os.utime(entry, None)
+        return values
+    except (IOError, OSError, EOFError):
+        pass
+
+    with open(filename, 'rb') as input_file:
+        values = from_buffer(input_file, size)
+
+    try:
+        if not os.path.isdir(os.path.dirname(entry)):
+            os.makedirs(os.path.dirname(entry))
+        descriptor, temporary_filename = tempfile.mkstemp(dir=os.path.dirname(entry))
+        with os.fdopen(descriptor, 'wb') as cached:
+            values.tofile(cached)
+        os.rename(temporary_filename, entry)
+    except (IOError, OSError):
+        pass
+
+    return values
+
+########################################################################
+#
+# Sum files of integers, or load them into the binary cache.
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Sum files of whitespace-separated integers a chunk at a time.')
+    parser.add_argument('files', metavar='FILE', nargs='+',
+                        help='files of integers')
+    parser.add_argument('--chunk-size', type=int, default=chunk_size, metavar='BYTES',
+                        help='bytes read at a time (default: %(default)s)')
+    parser.add_argument('--cache', action='store_true',
+                        help='also load each file into the binary cache')
+    parser.add_argument('--cache-dir', metavar='DIR', default=default_directory,
+                        help='binary cache directory (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    for filename in args.files:
+        if args.cache:
+            values = load(filename, args.cache_dir, args.chunk_size)
+            sys.stdout.write('{}: {} integers, total {}\n'.format(filename, len(values), sum(values)))
+        else:
+            sys.stdout.write('{}: total {}\n'.format(filename, total(filename, args.chunk_size)))
+
+if __name__ == '__main__':
+
+    main()
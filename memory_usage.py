@@ -0,0 +1,129 @@
+
+import sys
+import threading
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+########################################################################
+#
+# Peak memory instrumentation.
+#
+# `runcall(func, *args)` calls `func(*args)` and returns a tuple of
+# `(result, peak_bytes, sites)`, where `sites` lists the top allocation
+# sites as `{'location': 'file:line', 'size': bytes, 'count': blocks}`.
+#
+# With `tracemalloc` (Python 3.4+), `peak_bytes` is the peak traced
+# memory during the call.  `tracemalloc` snapshots only show memory that
+# is still allocated, and by the time a solver returns its large
+# intermediate structures are usually gone, so a monitor thread takes a
+# fresh snapshot each time traced memory grows by `snapshot_growth`; the
+# sites are taken from the largest snapshot, i.e. the one nearest the
+# peak.
+#
+# Without `tracemalloc` (Python 2), `peak_bytes` is how far the call
+# raised the process's peak resident set size, and no sites are
+# reported.  That is only a true per-call peak in a fresh process, such
+# as a parallel-mode worker; in a long-lived process it under-reports
+# any call which peaks below an earlier high-water mark.
+
+trace_frames = 1
+
+snapshot_interval = 0.05
+
+snapshot_growth = 1.25
+
+top_sites = 10
+
+########################################################################
+#
+# Peak resident set size of this process, in bytes.
+
+def peak_rss():
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+########################################################################
+#
+# Summarize a `tracemalloc` snapshot into its top allocation sites.
+
+def snapshot_sites(snapshot, limit=top_sites):
+    return [
+                {
+                    'location': '{}:{}'.format(statistic.traceback[0].filename, statistic.traceback[0].lineno),
+                    'size': statistic.size,
+                    'count': statistic.count,
+                }
+                for statistic in snapshot.statistics('lineno')[:limit]
+            ]
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, threading.__file__),
+            ))
+
+def snapshot_size(snapshot):
+    return sum(statistic.size for statistic in snapshot.statistics('filename'))
+
+########################################################################
+#
+# Run `func(*args)` under `tracemalloc`.
+
+def traced_runcall(func, *args):
+
+    snapshots = []
+    finished = threading.Event()
+
+    def monitor():
+        snapshot_at = 0
+        while not finished.wait(snapshot_interval):
+            current = tracemalloc.get_traced_memory()[0]
+            if current > snapshot_at * snapshot_growth:
+                snapshots[:] = [max(snapshots + [take_snapshot()], key=snapshot_size)]
+                snapshot_at = current
+
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(trace_frames)
+    tracemalloc.clear_traces()
+
+    monitor_thread = threading.Thread(target=monitor)
+    monitor_thread.daemon = True
+    monitor_thread.start()
+
+    try:
+        result = func(*args)
+        finished.set()
+        monitor_thread.join()
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        snapshots.append(take_snapshot())
+    finally:
+        finished.set()
+        monitor_thread.join()
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return result, peak_bytes, snapshot_sites(max(snapshots, key=snapshot_size))
+
+########################################################################
+#
+# Run `func(*args)`, measuring the growth of the peak resident set size.
+
+def rss_runcall(func, *args):
+    peak_before = peak_rss()
+    result = func(*args)
+    return result, peak_rss() - peak_before, []
+
+runcall = (
+            traced_runcall
+            if tracemalloc is not None
+            else rss_runcall
+        )
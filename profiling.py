@@ -0,0 +1,135 @@
+
+import os.path
+import ast
+import pstats
+
+########################################################################
+#
+# Profile reports with names for anonymous functions.
+#
+# Nearly every hot path in the solvers is a `lambda` (or generator
+# expression) nested inside `reduce` or `accumulate`, so a stock
+# `pstats` listing is mostly rows of `<lambda>` and `<genexpr>`.
+#
+# `anonymous_function_names` parses a solver's source and maps the line
+# number of each anonymous function to the name of its enclosing
+# assignment or `def`, e.g. `process_combat_round` or `part_2`; the
+# line numbers line up with the `co_firstlineno` of the code objects the
+# profiler reports.  `profile_report` uses those names to render a
+# readable hotspot table from a `.pstats` file.
+
+anonymous_node_names = dict(
+            (getattr(ast, node_type), function_name)
+            for (node_type, function_name) in (
+                ('Lambda', '<lambda>'),
+                ('GeneratorExp', '<genexpr>'),
+                ('ListComp', '<listcomp>'),
+                ('SetComp', '<setcomp>'),
+                ('DictComp', '<dictcomp>'),
+            )
+        )
+
+named_node_types = tuple(
+            getattr(ast, node_type)
+            for node_type in ('FunctionDef', 'AsyncFunctionDef', 'ClassDef')
+            if hasattr(ast, node_type)
+        )
+
+########################################################################
+#
+# Return a dictionary mapping `(line, '<lambda>')` (or `'<genexpr>'`,
+# ...) to the dotted name of the enclosing assignments and `def`s.
+#
+# When several anonymous functions of the same kind start on the same
+# line, the outermost one wins; the profiler cannot tell them apart
+# either.
+
+def anonymous_function_names(filename):
+
+    names = {}
+
+    def visit(node, enclosing):
+
+        if isinstance(node, named_node_types):
+            enclosing = enclosing + (node.name,)
+
+        elif isinstance(node, ast.Assign):
+            enclosing = enclosing + tuple(
+                        target.id
+                        for target in node.targets[:1]
+                        if isinstance(target, ast.Name)
+                    )
+
+        if type(node) in anonymous_node_names:
+            names.setdefault(
+                        (node.lineno, anonymous_node_names[type(node)]),
+                        '.'.join(enclosing) or '<module>'
+                    )
+
+        for child in ast.iter_child_nodes(node):
+            visit(child, enclosing)
+
+    visit(ast.parse(open(filename).read(), filename), ())
+
+    return names
+
+########################################################################
+#
+# Return a readable name for a `pstats` function key.
+#
+# Anonymous functions become `<enclosing name>:<lambda>`; everything
+# else keeps the function name `pstats` already has.  Parsed sources are
+# memoized in `source_names`.
+
+source_names = {}
+
+def readable_name(function_key, source_names=source_names):
+
+    filename, line, function_name = function_key
+
+    if function_name not in anonymous_node_names.values() or not os.path.exists(filename):
+        return function_name
+
+    if filename not in source_names:
+        try:
+            source_names[filename] = anonymous_function_names(filename)
+        except (SyntaxError, IOError):
+            source_names[filename] = {}
+
+    enclosing = source_names[filename].get((line, function_name))
+
+    return '{}:{}'.format(enclosing, function_name) if enclosing else function_name
+
+########################################################################
+#
+# Render the hotspot report for a `.pstats` file: the `limit` functions
+# with the most internal time, with call counts, internal and cumulative
+# time, source location and readable name.
+
+def profile_report(stats_filename, limit=40):
+
+    stats = pstats.Stats(stats_filename).stats
+
+    rows = sorted(
+                (
+                    (total_time, cumulative_time, primitive_calls, calls, function_key)
+                    for function_key, (primitive_calls, calls, total_time, cumulative_time, _) in stats.items()
+                ),
+                reverse=True
+            )[:limit]
+
+    return '\n'.join(
+                [
+                    '{:>12} {:>10} {:>10}  {:<32} {}'.format('ncalls', 'tottime', 'cumtime', 'location', 'function'),
+                ]
+                + [
+                    '{:>12} {:>10.4f} {:>10.4f}  {:<32} {}'.format(
+                        calls if calls == primitive_calls else '{}/{}'.format(calls, primitive_calls),
+                        total_time,
+                        cumulative_time,
+                        '{}:{}'.format(os.path.basename(function_key[0]), function_key[1]),
+                        readable_name(function_key),
+                    )
+                    for (total_time, cumulative_time, primitive_calls, calls, function_key) in rows
+                ]
+            ) + '\n'
@@ -0,0 +1,1331 @@
+
+import re
+import sys
+import os
+import os.path
+import csv
+import glob
+import json
+import signal
+import timeit
+import platform
+import subprocess
+import cProfile
+import argparse
+import importlib
+import traceback
+import multiprocessing
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import disk_cache
+import profiling
+import memory_usage
+import baseline
+import input_generators
+import support
+import scaling
+import snapshots
+
+########################################################################
+#
+# Unified benchmark runner.
+#
+# Discovers every `day_NN.py` solver in the repository directory,
+# imports it, and runs its `process_input_data`, `part_1` and `part_2`
+# against the day's samples and its real input.  Each run produces one
+# record of the form:
+# ```
+#   {
+#       'day': 'day_NN', 'part': 1|2, 'kind': 'sample'|'input'|'generated',
+#       'input': <input filename>, 'scale': <generator scale or None>,
+#       'python': <interpreter, e.g. 'CPython 3.11.7'>,
+#       'engine': <engine name, e.g. 'reference'>,
+#       'status': 'ok'|'error'|'timeout'|'oom'|'killed'|'crashed'|'over-budget',
+#       'import_time': <seconds>,
+#       'parse_time': <seconds>, 'solve_time': <seconds>,
+#       'result': <answer>, 'expected': <answer or None>,
+#       'correct': True|False|None, 'differential': 'match'|'mismatch'|None,
+#       'error': <traceback or None>,
+#       'cache': 'hit'|'miss'|'verified'|'mismatch'|None,
+#       'parse_cache': 'memory'|'disk'|None, 'resumed': True|False|None,
+#       'profile': <.pstats filename or None>,
+#       'peak_memory': <bytes or None>, 'memory_sites': <list or None>,
+#       'solve_times': <list or None>, 'spread': <seconds or None>,
+#       'baseline_time': <seconds or None>, 'regression': True|False|None,
+#       'steps': <count or None>, 'steps_per_second': <rate or None>,
+#       'step_p50': <seconds or None>, 'step_p99': <seconds or None>
+#   }
+# ```
+# and the records are written out as JSON, JSON lines, or CSV.
+#
+# Jobs run one after another by default, or spread across a pool of
+# worker processes in parallel mode.
+#
+# Successful results are kept in a persistent cache (see `disk_cache`)
+# keyed by the SHA-256 of the input file, the SHA-256 of the solver
+# source, the part number and any extra part arguments, and jobs whose
+# key is already cached are not run again.
+#
+# Each input is parsed once and the parsed structure is shared by both
+# parts (see `parsed_input`).
+#
+# Besides the samples and real inputs, jobs can run against synthetic
+# inputs at a chosen scale (see `input_generators`), and scaling mode
+# runs each part at increasing scales to estimate how its time and
+# memory grow (see `scaling`).
+#
+# The solvers run unchanged under Python 2.7 and Python 3; the runner
+# can run them under several interpreters in one go (see
+# `interpreter_run`).
+#
+# A day can have several implementations, or engines, and the runner
+# can run any of them, or cross-check them against each other (see
+# `engines`).
+#
+# Batch mode runs one day against many inputs, such as many accounts'
+# puzzle inputs, spread across a pool of worker processes (see
+# `run_batch`).
+#
+# Long simulations can save snapshots of their progress as they run, so
+# a job which crashes or times out picks up where it left off the next
+# time it is run (see `snapshots` and `run_job`).
+
+base_directory = os.path.dirname(os.path.abspath(__file__))
+
+re_day_module = re.compile(r'^(day_[0-9][0-9])\.py$')
+
+record_fields = (
+            'day', 'part', 'kind', 'input', 'scale', 'python', 'engine', 'status',
+            'import_time', 'parse_time', 'solve_time',
+            'result', 'expected', 'correct', 'differential',
+            'error', 'cache', 'parse_cache', 'resumed', 'profile',
+            'peak_memory', 'memory_sites',
+            'solve_times', 'spread', 'baseline_time', 'regression',
+            'steps', 'steps_per_second', 'step_p50', 'step_p99',
+        )
+
+# Some solvers take extra arguments for a part, and those arguments are
+# different for the samples than for the real input.  These used to be
+# hard-coded in each day's controller.  Generated inputs take the same
+# arguments as the real input.
+
+part_arguments = {
+            ('day_06', 2): { 'sample': (32,), 'input': (10000,), 'generated': (10000,) },
+            ('day_07', 2): { 'sample': (2, 0), 'input': (5, 60), 'generated': (5, 60) },
+        }
+
+# Engines.
+#
+# Every day's `day_NN.py` is its `reference` engine: the original
+# implementation, kept as the oracle the others are checked against.  A
+# day may also have other engines, each a solver module beside it named
+# `day_NN.<something>.py` (which shares the day's inputs; see
+# `support.base_filename`), registered here under an engine name.
+#
+# Jobs run the engine chosen with `--engine` on the days which have it,
+# and the reference engine on the rest.  Differential mode runs every
+# engine of a day on the same inputs instead (see `differential_run`).
+
+reference_engine = 'reference'
+
+engines = {
+            'day_01': { 'fast': 'day_01.analytic' },
+            'day_09': { 'fast': 'day_09.deque', 'blist': 'day_09.blist' },
+        }
+
+def engine_names():
+    return sorted(set([reference_engine]) | set(name for day in engines for name in engines[day]))
+
+def day_engines(day):
+    return [reference_engine] + sorted(engines.get(day, {}))
+
+def day_engine(day, engine):
+    return engine if engine in engines.get(day, {}) else reference_engine
+
+# The solver module of a job's engine.
+
+def engine_module(job):
+    engine = job.get('engine', reference_engine)
+    return job['day'] if engine == reference_engine else engines[job['day']][engine]
+
+# The interpreter running the jobs, reported in each record.  Results
+# and parsed inputs differ between interpreters (in their timings, and
+# in their types), so the caches are keyed by `interpreter_version` too.
+
+interpreter = '{} {}'.format(platform.python_implementation(), platform.python_version())
+
+interpreter_version = '{}-{}.{}'.format(platform.python_implementation(), *sys.version_info[:2])
+
+########################################################################
+#
+# Discover the solver modules, returning a sorted list of module names.
+
+def discover_days(directory=base_directory):
+    return sorted(
+                match.group(1)
+                for filename in os.listdir(directory)
+                for match in [re_day_module.match(filename)]
+                if match
+            )
+
+########################################################################
+#
+# Build the list of jobs for one day, from its samples (see
+# `support.sample_inputs` for the sample layouts) and its real input.
+
+def day_jobs(day, parts=(1, 2), samples=True, data=True, directory=base_directory):
+
+    base_filename = os.path.join(directory, day)
+
+    jobs = []
+
+    for part in parts:
+
+        if samples:
+
+            jobs.extend(
+                        {
+                            'day': day,
+                            'part': part,
+                            'kind': 'sample',
+                            'input': sample_filename,
+                            'expected': expected,
+                        }
+                        for (sample_filename, expected) in support.sample_inputs(base_filename, part)
+                    )
+
+        if data and os.path.exists('{}.input'.format(base_filename)):
+
+            jobs.append({
+                        'day': day,
+                        'part': part,
+                        'kind': 'input',
+                        'input': '{}.input'.format(base_filename),
+                        'expected': None,
+                    })
+
+    return jobs
+
+########################################################################
+#
+# Build the list of jobs for one day's generated inputs, one job per
+# part and scale.  The inputs are written to `input_generators`'s
+# directory the first time they are needed; days without a generator
+# have no generated jobs.
+
+def generated_jobs(day, parts=(1, 2), scales=(), seed=0):
+    if day not in input_generators.generators:
+        return []
+    return [
+                {
+                    'day': day,
+                    'part': part,
+                    'kind': 'generated',
+                    'input': input_generators.write_input(day, scale, seed),
+                    'scale': scale,
+                    'expected': None,
+                }
+                for part in parts
+                for scale in scales
+            ]
+
+########################################################################
+#
+# Import a solver module by name.
+#
+# The time each import took is kept in `import_times` and reported in
+# the `import_time` field of the day's records.  The first solver
+# imported in a process also pays for importing `support`, which later
+# solvers share.
+#
+# Engine modules (`day_NN.<something>`) cannot be imported by name, as
+# the dot would make them submodules of a package, so they are loaded
+# from their files instead, and registered under their dotted names.
+# (Python 2 would take a dotted name to mean a package's submodule even
+# then, so it loads them under an undotted name first.)
+
+import_times = {}
+
+def import_file(name, filename):
+    try:
+        import importlib.util
+    except ImportError:
+        import imp
+        module = imp.load_source(name.replace('.', '_'), filename)
+        module.__name__ = name
+        sys.modules[name] = sys.modules.pop(name.replace('.', '_'))
+        return module
+    spec = importlib.util.spec_from_file_location(name, filename)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+def load_day(day, directory=base_directory):
+    if directory not in sys.path:
+        sys.path.insert(0, directory)
+    if day not in sys.modules:
+        t = timeit.default_timer()
+        if '.' in day:
+            import_file(day, os.path.join(directory, '{}.py'.format(day)))
+        else:
+            importlib.import_module(day)
+        import_times[day] = timeit.default_timer() - t
+    return sys.modules[day]
+
+########################################################################
+#
+# A solver's source digest.
+#
+# A solver's results depend on the local modules it imports as much as
+# on its own (`support`, `grid`, `cycles`, `vm`, ...), so the caches key
+# their entries by the digests of the solver's module and of every local
+# module it imports, directly or through other local modules.  Imports
+# are found by scanning the sources, so imports inside functions count
+# too.  `digests` (filename to digest) saves digesting a file twice.
+
+re_import = re.compile(r'^[ \t]*(?:from[ \t]+([\w.]+)[ \t]+import\b|import[ \t]+([\w., \t]+))', re.MULTILINE)
+
+def local_imports(filename):
+    with open(filename, 'rb') as source:
+        text = source.read().decode('utf-8', 'replace')
+    return set(
+                name.split()[0].split('.')[0] if match.group(2) else name
+                for match in re_import.finditer(text)
+                for name in (match.group(1) or match.group(2)).split(',')
+                if name.strip()
+            )
+
+def source_filenames(name, directory=base_directory):
+    filenames = set()
+    pending = [name]
+    while pending:
+        filename = os.path.join(directory, '{}.py'.format(pending.pop()))
+        if filename not in filenames and os.path.isfile(filename):
+            filenames.add(filename)
+            pending.extend(local_imports(filename))
+    return sorted(filenames)
+
+def source_digest(name, digests=None):
+    digests = {} if digests is None else digests
+    filenames = source_filenames(name)
+    for filename in filenames:
+        if filename not in digests:
+            digests[filename] = disk_cache.file_digest(filename)
+    return disk_cache.cache_key('source', *(
+                '{}:{}'.format(os.path.basename(filename), digests[filename])
+                for filename in filenames
+            ))
+
+########################################################################
+#
+# Parse an input once and share the parsed structure between parts.
+#
+# Parsed inputs are kept in memory for the day currently being run, so
+# the samples and real input of a day are each parsed once no matter
+# how many parts use them (once per engine, as engines may parse their
+# inputs differently).  If `parse_cache_directory` is set, parsed
+# inputs are also pickled into a `disk_cache` keyed by the SHA-256 of
+# the input file and of the solver source (see `source_digest`), which lets later runs and
+# parallel workers skip parsing altogether.
+#
+# The parsed structure is shared, not copied: solvers must treat their
+# input as read-only (none of the existing solvers mutate it).
+#
+# Solvers with `mapped_input` set parse a memory-mapped buffer instead
+# of a string (see `support.mapped_file`); their parse time includes
+# mapping the file and faulting its pages in, which for the others is
+# part of reading it.
+#
+# Returns the parsed input, the time `process_input_data` took to
+# produce it, and where it came from (`None` if it was parsed just now).
+
+parse_cache_directory = None
+
+parsed_inputs = {}
+
+def parsed_input(module, day, input_filename):
+
+    input_digest = disk_cache.file_digest(input_filename)
+    memory_key = (input_filename, input_digest, module.__name__)
+
+    if any(key[0] != day for key in parsed_inputs):
+        parsed_inputs.clear()
+
+    if (day, memory_key) in parsed_inputs:
+        parsed_data, parse_time = parsed_inputs[(day, memory_key)]
+        return parsed_data, parse_time, 'memory'
+
+    if parse_cache_directory is not None:
+        disk_key = disk_cache.cache_key(
+                    'parsed',
+                    input_digest,
+                    source_digest(module.__name__),
+                    interpreter_version,
+                )
+        cached = disk_cache.cache_get(parse_cache_directory, disk_key)
+        if cached is not None:
+            parsed_inputs[(day, memory_key)] = cached
+            return cached[0], cached[1], 'disk'
+
+    if getattr(module, 'mapped_input', False):
+
+        t = timeit.default_timer()
+        parsed_data = support.parse_input(module.process_input_data, input_filename, mapped=True)
+        parse_time = timeit.default_timer() - t
+
+    else:
+
+        input_data = support.read_input(input_filename)
+
+        t = timeit.default_timer()
+        parsed_data = module.process_input_data(input_data)
+        parse_time = timeit.default_timer() - t
+
+    parsed_inputs[(day, memory_key)] = (parsed_data, parse_time)
+
+    if parse_cache_directory is not None:
+        try:
+            disk_cache.cache_put(parse_cache_directory, disk_key, (parsed_data, parse_time))
+        except Exception:
+            pass
+
+    return parsed_data, parse_time, None
+
+########################################################################
+#
+# Profiling.
+#
+# If `profile_directory` is set, each part is run under `cProfile` and
+# its statistics are written to `<input>.part<N>.pstats` in that
+# directory, together with a `<input>.part<N>.txt` hotspot report in
+# which anonymous functions are named after their enclosing assignment
+# (see `profiling`).  Profiling inflates the solve time of a single run;
+# see `repeat` below.
+
+profile_directory = None
+
+def write_profile(profiler, job):
+    if not os.path.isdir(profile_directory):
+        os.makedirs(profile_directory)
+    base_filename = os.path.join(profile_directory, '{}.part{}'.format(os.path.basename(job['input']), job['part']))
+    profiler.dump_stats('{}.pstats'.format(base_filename))
+    with open('{}.txt'.format(base_filename), 'w') as report:
+        report.write(profiling.profile_report('{}.pstats'.format(base_filename)))
+    return '{}.pstats'.format(base_filename)
+
+########################################################################
+#
+# Memory instrumentation.
+#
+# If `trace_memory` is set, each part is run through
+# `memory_usage.runcall`, recording its peak memory and top allocation
+# sites.  If `memory_budget` (bytes) is also set, a part whose peak
+# exceeds it is reported with an `over-budget` status.
+
+trace_memory = False
+
+memory_budget = None
+
+########################################################################
+#
+# Step metrics.
+#
+# If `step_metrics` is set, each part is run with the shared
+# `accumulate`'s metrics hook on (see `support`), recording how many
+# simulation steps it took, how many it took per second, and its median
+# and 99th percentile step times, to tell more steps from slower steps.
+# Timing every step inflates the solve time of a single run; see
+# `repeat` below.
+
+step_metrics = False
+
+########################################################################
+#
+# Call a solver with whatever profiling, memory and step instrumentation
+# is enabled, recording the results of that instrumentation in `record`.
+# Step metrics are recorded even if the solver fails.
+
+def instrumented_call(record, job, solver, *args):
+
+    solve = solver
+    if profile_directory is not None:
+        profiler = cProfile.Profile()
+        solve = lambda *args: profiler.runcall(solver, *args)
+
+    if step_metrics:
+        support.metrics = support.new_metrics()
+
+    try:
+        if trace_memory:
+            result, record['peak_memory'], record['memory_sites'] = memory_usage.runcall(solve, *args)
+        else:
+            result = solve(*args)
+    finally:
+        if step_metrics:
+            record.update(support.metrics_summary(support.metrics))
+            support.metrics = None
+
+    if profile_directory is not None:
+        record['profile'] = write_profile(profiler, job)
+
+    return result
+
+########################################################################
+#
+# Repeated timing.
+#
+# With `repeat` above 1 or any `warmup` runs, each part is run `warmup`
+# times untimed and then `repeat` times timed; the record's solve time
+# is the median of the timed runs, its `spread` is their median absolute
+# deviation, and `solve_times` lists every timed run.  Profiling and
+# memory instrumentation then get a separate, untimed run of their own,
+# so they never skew the timings; so do step metrics.
+#
+# If `separate_instrumentation` is set, instrumentation gets a run of
+# its own even for a single timed run.  Scaling mode sets it, as the
+# overhead of tracing memory grows with the allocations made and would
+# otherwise skew its time fits.
+#
+# Saving or comparing against a baseline (see `baseline`) defaults to
+# `baseline_repeat` timed runs after `baseline_warmup` untimed ones, so
+# that the baseline's median and spread come from a warm, repeated
+# timing rather than a single cold one.
+
+repeat = 1
+
+warmup = 0
+
+baseline_repeat = 5
+
+baseline_warmup = 1
+
+separate_instrumentation = False
+
+########################################################################
+#
+# Run a single job, returning its record.
+#
+# Parsing and solving are timed separately; the parse time is that of
+# the `process_input_data` call which produced the (possibly shared)
+# parsed input.  Any exception raised while
+# importing, parsing or solving is captured in the record rather than
+# aborting the whole run.
+#
+# With snapshots on (`snapshots.directory` set), a job's solve resumes
+# from any snapshots left by an earlier, unfinished run of the same job
+# (the same input, solver, part, arguments and interpreter; see
+# `job_key`), and `resumed` records whether it did; its snapshots are
+# removed once it succeeds.  Repeated timing runs never use snapshots,
+# so every timed run starts from scratch.
+
+def new_record(job):
+    record = dict(
+                (field, None)
+                for field in record_fields
+            )
+    record.update(job)
+    record['input'] = os.path.relpath(job['input'], base_directory)
+    record['python'] = interpreter
+    record['engine'] = job.get('engine', reference_engine)
+    return record
+
+def check_result(record):
+    if record['expected'] is not None:
+        record['correct'] = record['result'] == record['expected']
+    return record
+
+def run_job(job):
+
+    record = new_record(job)
+
+    try:
+
+        module = load_day(engine_module(job))
+        record['import_time'] = import_times.get(engine_module(job))
+        solver = getattr(module, 'part_{}'.format(job['part']))
+        arguments = part_arguments.get((job['day'], job['part']), {}).get(job['kind'], ())
+
+        parsed_data, record['parse_time'], record['parse_cache'] = parsed_input(module, job['day'], job['input'])
+
+        instrumented = profile_directory is not None or trace_memory or step_metrics
+
+        if repeat == 1 and warmup == 0 and not (instrumented and separate_instrumentation):
+
+            if snapshots.directory is not None:
+                snapshots.begin(job_key(job, {}))
+
+            t = timeit.default_timer()
+            record['result'] = instrumented_call(record, job, solver, parsed_data, *arguments)
+            record['solve_time'] = timeit.default_timer() - t
+
+            if snapshots.directory is not None:
+                record['resumed'] = snapshots.resumed > 0
+                snapshots.finish()
+
+        else:
+
+            for _ in range(warmup):
+                solver(parsed_data, *arguments)
+
+            solve_times = []
+            for _ in range(repeat):
+                t = timeit.default_timer()
+                record['result'] = solver(parsed_data, *arguments)
+                solve_times.append(timeit.default_timer() - t)
+
+            record['solve_times'] = solve_times
+            record['solve_time'] = baseline.median(solve_times)
+            record['spread'] = baseline.median_absolute_deviation(solve_times)
+
+            if instrumented:
+                instrumented_call(record, job, solver, parsed_data, *arguments)
+
+        record['status'] = 'ok'
+        check_result(record)
+
+        if memory_budget is not None and record['peak_memory'] > memory_budget:
+            record['status'] = 'over-budget'
+            record['error'] = 'peak memory {} bytes exceeds budget of {} bytes'.format(record['peak_memory'], memory_budget)
+
+    except MemoryError:
+
+        record['status'] = 'oom'
+        record['error'] = traceback.format_exc()
+
+    except Exception:
+
+        record['status'] = 'error'
+        record['error'] = traceback.format_exc()
+
+    finally:
+
+        snapshots.end()
+
+    return record
+
+########################################################################
+#
+# Run jobs one after another, yielding each record as it finishes.
+
+def run_serial(jobs):
+    for job in jobs:
+        yield run_job(job)
+
+########################################################################
+#
+# Run jobs in parallel, yielding each record as it finishes.
+#
+# Every job runs in its own worker process, with at most `workers`
+# (default: the number of cores) running at once.  A `multiprocessing`
+# pool cannot cancel a task once it has started, so the scheduling is
+# done here instead: a job still running after `timeout` seconds has
+# its process terminated and is reported with a `timeout` status, and a
+# worker which dies without reporting back is reported as `crashed`.
+#
+# The solver modules are imported before any worker is started, so that
+# each forked worker begins with every module already loaded.
+#
+# Each worker can also be held to resource limits (see `apply_limits`):
+# a worker killed for exceeding `cpu_limit` is reported as a `timeout`,
+# and a job that runs out of address space under `address_space_limit`
+# is reported as `oom`.
+#
+# The kernel kills a worker with `SIGKILL` both at the hard CPU limit
+# and when the system runs out of memory, so a worker killed by
+# `SIGKILL` is only reported as a `timeout` if it had used `cpu_limit`
+# CPU seconds.  Otherwise it is reported as `killed`.  A worker's CPU
+# time is read from `/proc` (so only on Linux) each time round the
+# scheduling loop, until it has been reaped.
+
+poll_interval = 0.1
+
+########################################################################
+#
+# Per-job resource limits, applied with `setrlimit` in each worker
+# process before it runs its job.
+#
+# `cpu_limit` is in CPU seconds.  The kernel sends `SIGXCPU` when it is
+# reached, which kills the worker, and `SIGKILL` `cpu_limit_grace`
+# seconds later in case `SIGXCPU` is being ignored.
+#
+# `address_space_limit` is in bytes, and caps the worker's whole virtual
+# address space, including the interpreter and the modules it inherits;
+# allocations beyond it raise `MemoryError` in the solver.  Only the
+# soft limit is lowered, and it is lifted again once the job is done,
+# because sending the record back starts a `multiprocessing` feeder
+# thread whose stack would not fit under a tight limit.  The limits
+# guard against runaway solvers, not hostile ones.
+
+cpu_limit = None
+
+cpu_limit_grace = 5
+
+address_space_limit = None
+
+def apply_limits():
+    if cpu_limit is not None:
+        used = resource.getrusage(resource.RUSAGE_SELF)
+        seconds = int(used.ru_utime + used.ru_stime + cpu_limit + 0.999)
+        resource.setrlimit(resource.RLIMIT_CPU, (seconds, seconds + cpu_limit_grace))
+    if address_space_limit is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (address_space_limit, resource.getrlimit(resource.RLIMIT_AS)[1]))
+
+def lift_address_space_limit():
+    if address_space_limit is not None:
+        hard_limit = resource.getrlimit(resource.RLIMIT_AS)[1]
+        resource.setrlimit(resource.RLIMIT_AS, (hard_limit, hard_limit))
+
+def job_worker(index, job, results):
+    apply_limits()
+    record = run_job(job)
+    lift_address_space_limit()
+    results.put((index, record))
+
+# A process's CPU seconds, from its `/proc/<pid>/stat` (which is kept
+# until it is reaped), or `None` if that cannot be read.
+
+clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+def process_cpu_time(pid):
+    try:
+        with open('/proc/{}/stat'.format(pid)) as stat_file:
+            fields = stat_file.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / float(clock_ticks)
+    except (IOError, OSError, IndexError, ValueError):
+        return None
+
+# The status and error of a job whose worker exited with `exitcode`
+# without reporting back, having used `cpu_time` CPU seconds (or
+# `None`, if not known).
+
+def worker_failure(exitcode, cpu_time):
+    if cpu_limit is not None and (
+                -exitcode == signal.SIGXCPU
+                or (-exitcode == signal.SIGKILL and cpu_time is not None and cpu_time >= cpu_limit)
+            ):
+        return 'timeout', 'exceeded CPU limit of {} seconds'.format(cpu_limit)
+    if -exitcode == signal.SIGKILL:
+        return 'killed', 'worker was killed{}, out of memory or from outside'.format(
+                    '' if cpu_time is None else ' after {:.1f} CPU seconds'.format(cpu_time)
+                )
+    return 'crashed', 'worker exited with code {}'.format(exitcode)
+
+def run_parallel(jobs, workers=None, timeout=None):
+
+    workers = workers or multiprocessing.cpu_count()
+
+    for module in sorted(set(engine_module(job) for job in jobs)):
+        try:
+            load_day(module)
+        except Exception:
+            pass
+
+    results = multiprocessing.Queue()
+    pending = list(reversed(list(enumerate(jobs))))
+    running = {}
+    cpu_times = {}
+
+    while pending or running:
+
+        while pending and len(running) < workers:
+            index, job = pending.pop()
+            process = multiprocessing.Process(target=job_worker, args=(index, job, results))
+            process.daemon = True
+            process.start()
+            running[index] = (process, job, timeit.default_timer())
+
+        try:
+            index, record = results.get(timeout=poll_interval)
+            if index in running:
+                running.pop(index)[0].join()
+                cpu_times.pop(index, None)
+                yield record
+        except queue.Empty:
+            pass
+
+        for index, (process, job, started) in list(running.items()):
+
+            cpu_times[index] = process_cpu_time(process.pid) or cpu_times.get(index)
+
+            if timeout is not None and timeit.default_timer() - started > timeout:
+                process.terminate()
+                process.join()
+                del running[index]
+                cpu_times.pop(index, None)
+                record = new_record(job)
+                record['status'] = 'timeout'
+                record['error'] = 'timed out after {} seconds'.format(timeout)
+                yield record
+
+            elif not process.is_alive() and process.exitcode != 0:
+                del running[index]
+                record = new_record(job)
+                record['status'], record['error'] = worker_failure(process.exitcode, cpu_times.pop(index, None))
+                yield record
+
+########################################################################
+#
+# Batch mode.
+#
+# Run one day against every input in a directory, or every input
+# matching a glob pattern, yielding each input's records as soon as all
+# of its parts are done.  Each input is a task for a pool of `workers`
+# processes (default: the number of cores), forked once the day's
+# solver is imported; a task runs every part of its input in turn, so
+# the input is parsed once and shared by its parts (see `parsed_input`,
+# whose disk cache `--parse-cache` extends across runs).  Inputs are
+# independent, so throughput grows with the number of workers.
+#
+# Batch inputs are solved like the day's real input (taking its extra
+# part arguments), and have no expected results.  A pool cannot cancel
+# a task once it has started, so runs with timeouts or resource limits
+# use `run_parallel` instead.
+
+def batch_inputs(pattern):
+    if os.path.isdir(pattern):
+        return sorted(
+                    os.path.join(pattern, filename)
+                    for filename in os.listdir(pattern)
+                    if os.path.isfile(os.path.join(pattern, filename))
+                )
+    return sorted(filename for filename in glob.glob(pattern) if os.path.isfile(filename))
+
+def batch_jobs(day, parts, filenames, engine=reference_engine):
+    return [
+                {
+                    'day': day,
+                    'part': part,
+                    'kind': 'input',
+                    'input': os.path.abspath(filename),
+                    'expected': None,
+                    'engine': day_engine(day, engine),
+                }
+                for filename in filenames
+                for part in parts
+            ]
+
+def batch_worker(jobs):
+    return [run_job(job) for job in jobs]
+
+def run_batch(jobs, workers=None):
+
+    tasks = []
+    for job in jobs:
+        if not tasks or tasks[-1][0]['input'] != job['input']:
+            tasks.append([])
+        tasks[-1].append(job)
+
+    for module in sorted(set(engine_module(job) for job in jobs)):
+        try:
+            load_day(module)
+        except Exception:
+            pass
+
+    pool = multiprocessing.Pool(workers or multiprocessing.cpu_count())
+
+    try:
+        for records in pool.imap_unordered(batch_worker, tasks):
+            for record in records:
+                yield record
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+########################################################################
+#
+# Result cache.
+#
+# `cached_run` wraps one of the `run_*` functions above.  Entries are
+# keyed by the interpreter version as well as the job, so each
+# interpreter keeps its own results.  In `use` mode,
+# jobs with a cached result are answered from the cache and only the
+# rest are run; in `verify` mode every job is run and its result is
+# compared against the cached one; in `off` mode the cache is ignored.
+# Successful results are written back to the cache in `use` and
+# `verify` modes.
+#
+# Only the result and timings are cached, so the record for a cache hit
+# reflects the current job (and its current expected result).
+
+cached_fields = ('result', 'parse_time', 'solve_time')
+
+def job_key(job, digests):
+    if job['input'] not in digests:
+        digests[job['input']] = disk_cache.file_digest(job['input'])
+    return disk_cache.cache_key(
+                'result',
+                digests[job['input']],
+                source_digest(engine_module(job), digests),
+                job['part'],
+                part_arguments.get((job['day'], job['part']), {}).get(job['kind'], ()),
+                interpreter_version,
+            )
+
+def cached_run(run, jobs, mode='use', directory=disk_cache.default_directory, max_bytes=disk_cache.default_max_bytes):
+
+    if mode == 'off':
+        for record in run(jobs):
+            yield record
+        return
+
+    digests = {}
+    keys = {}
+    cached = {}
+    to_run = []
+
+    for job in jobs:
+        key = job_key(job, digests)
+        keys[(job['day'], job.get('engine', reference_engine), job['part'], os.path.relpath(job['input'], base_directory))] = key
+        cached[key] = disk_cache.cache_get(directory, key)
+        if mode == 'use' and cached[key] is not None:
+            record = new_record(job)
+            record.update(cached[key])
+            record['status'] = 'ok'
+            record['cache'] = 'hit'
+            yield check_result(record)
+        else:
+            to_run.append(job)
+
+    for record in run(to_run):
+        key = keys[(record['day'], record['engine'], record['part'], record['input'])]
+        if record['status'] == 'ok':
+            if cached[key] is None:
+                record['cache'] = 'miss'
+            elif cached[key]['result'] == record['result']:
+                record['cache'] = 'verified'
+            else:
+                record['cache'] = 'mismatch'
+                record['error'] = 'cached result was {!r}'.format(cached[key]['result'])
+            disk_cache.cache_put(directory, key, dict((field, record[field]) for field in cached_fields))
+        yield record
+
+    disk_cache.cache_evict(directory, max_bytes)
+
+########################################################################
+#
+# Output writers.
+#
+# Answers which are not JSON-native (tuples are fine; anything more
+# exotic is not) are written using their `repr`.
+
+def write_json(records, output):
+    json.dump(list(records), output, indent=2, separators=(',', ': '), sort_keys=True, default=repr)
+    output.write('\n')
+
+def write_jsonl(records, output):
+    for record in records:
+        output.write(json.dumps(record, sort_keys=True, default=repr) + '\n')
+        output.flush()
+
+def write_csv(records, output):
+    writer = csv.DictWriter(output, record_fields, extrasaction='ignore')
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+
+writers = {
+            'json': write_json,
+            'jsonl': write_jsonl,
+            'csv': write_csv,
+        }
+
+########################################################################
+#
+# Scaling mode.
+#
+# Run each day and part against generated inputs at each of `scales` in
+# turn, yielding each record as it finishes.  Once a part fails at some
+# scale (typically by timing out or going over the memory budget) it is
+# not run at any larger scale.
+
+def scaling_run(run, days, parts, scales, seed=0):
+
+    failed = set()
+
+    for scale in scales:
+
+        jobs = [
+                    job
+                    for day in days
+                    for job in generated_jobs(day, parts, (scale,), seed)
+                    if (job['day'], job['part']) not in failed
+                ]
+
+        for record in run(jobs):
+            if record['status'] != 'ok':
+                failed.add((record['day'], record['part']))
+            yield record
+
+def scaling_scales(start, factor, steps):
+    return sorted(set(int(round(start * factor ** step)) for step in range(steps)))
+
+########################################################################
+#
+# Differential mode.
+#
+# Run every engine of each day on the same inputs, and check each other
+# engine's answers against the reference engine's.  The inputs are the
+# day's samples and generated inputs at each of `scales` with each of
+# `seeds`; the real inputs are left out, as the reference engines are
+# often far too slow for them.  Engines which cannot be imported (for
+# want of an optional dependency, say) are left out, with a note.
+#
+# Each non-reference record's `differential` field is set to `match` or
+# `mismatch` (with the reference answer in its `error`), or left `None`
+# if either engine failed.  The jobs for each input are listed with the
+# reference engine first, but records may arrive in any order when run
+# in parallel, so other engines' records wait for their reference.
+
+differential_scales = (10, 100)
+
+differential_seeds = 5
+
+def available_engines(day):
+    available = []
+    for engine in day_engines(day):
+        try:
+            load_day(engine_module({ 'day': day, 'engine': engine }))
+            available.append(engine)
+        except Exception:
+            sys.stderr.write('{} {} engine: not available: {}\n'.format(day, engine, traceback.format_exc().splitlines()[-1]))
+    return available
+
+def differential_jobs(days, parts, scales, seeds, samples=True):
+    return [
+                dict(job, engine=engine)
+                for day in days
+                for engines_available in [available_engines(day)]
+                if len(engines_available) > 1
+                for job in (
+                    (day_jobs(day, parts, samples, False) if samples else [])
+                    + [
+                        generated_job
+                        for seed in seeds
+                        for generated_job in generated_jobs(day, parts, scales, seed)
+                    ]
+                )
+                for engine in engines_available
+            ]
+
+def compare_engines(record, reference):
+    if record['status'] == 'ok' and reference['status'] == 'ok':
+        if record['result'] == reference['result']:
+            record['differential'] = 'match'
+        else:
+            record['differential'] = 'mismatch'
+            record['error'] = 'reference engine answered {!r}'.format(reference['result'])
+    return record
+
+def differential_run(run):
+
+    references = {}
+    waiting = {}
+
+    for record in run:
+        key = (record['day'], record['part'], record['input'])
+        if record['engine'] == reference_engine:
+            references[key] = record
+            yield record
+            for other in waiting.pop(key, []):
+                yield compare_engines(other, record)
+        elif key in references:
+            yield compare_engines(record, references[key])
+        else:
+            waiting.setdefault(key, []).append(record)
+
+    for records in waiting.values():
+        for record in records:
+            yield record
+
+########################################################################
+#
+# Run under several interpreters.
+#
+# The runner runs itself under each of `pythons` in turn, with the
+# command line `argv` (less the options in `own_options`, which only
+# make sense here), and yields the records of every interpreter as they
+# arrive.  Each record's `python` field tells the interpreters apart,
+# so the same job's timings can be compared side by side.  The child
+# runners report their progress on stderr as usual.
+
+own_options = ('--python', '--format', '--output', '-o')
+
+def child_arguments(argv):
+    arguments = []
+    skip = False
+    for argument in argv:
+        if skip:
+            skip = False
+        elif argument in own_options:
+            skip = True
+        elif not argument.startswith(tuple('{}='.format(option) for option in own_options)):
+            arguments.append(argument)
+    return arguments + ['--format', 'jsonl']
+
+def interpreter_run(pythons, argv):
+    for python in pythons:
+        sys.stderr.write('running under {}\n'.format(python))
+        child = subprocess.Popen(
+                    [python, os.path.abspath(__file__)] + child_arguments(argv),
+                    stdout=subprocess.PIPE,
+                    universal_newlines=True,
+                )
+        for line in iter(child.stdout.readline, ''):
+            yield json.loads(line)
+        child.stdout.close()
+        child.wait()
+
+########################################################################
+#
+# Command line handling.
+#
+# Days may be given as `day_NN`, `NN` or `N`; with no days given, every
+# discovered day is run.
+
+def parse_day(day):
+    match = re.match(r'^(?:day_)?([0-9]+)$', day)
+    if not match:
+        raise argparse.ArgumentTypeError('not a day: {!r}'.format(day))
+    return 'day_{:02d}'.format(int(match.group(1)))
+
+def argument_parser():
+    parser = argparse.ArgumentParser(description='Run and time the day_NN solvers.')
+    parser.add_argument('days', metavar='DAY', nargs='*', type=parse_day,
+                        help='days to run (default: all discovered days)')
+    parser.add_argument('--part', dest='parts', type=int, choices=(1, 2), action='append',
+                        help='part to run; may be repeated (default: both)')
+    parser.add_argument('--no-samples', dest='samples', action='store_false',
+                        help='skip the sample inputs')
+    parser.add_argument('--no-data', dest='data', action='store_false',
+                        help='skip the real inputs')
+    parser.add_argument('--format', choices=sorted(writers),
+                        help='output format (default: json, or jsonl in batch mode)')
+    parser.add_argument('--output', '-o', metavar='FILE',
+                        help='write records to FILE instead of stdout')
+    parser.add_argument('--parallel', action='store_true',
+                        help='run jobs in parallel worker processes')
+    parser.add_argument('--workers', type=int, metavar='N',
+                        help='number of parallel workers (default: number of cores)')
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help='abandon any job running longer than SECONDS (implies worker processes)')
+    parser.add_argument('--cpu-limit', type=int, metavar='SECONDS',
+                        help='kill any job using more than SECONDS of CPU time (implies worker processes)')
+    parser.add_argument('--memory-limit', type=float, metavar='MB',
+                        help='limit each job to MB megabytes of address space, failing it as oom beyond that (implies worker processes)')
+    parser.add_argument('--profile', metavar='DIR',
+                        help='profile each part, writing .pstats files and hotspot reports to DIR (disables the result cache)')
+    parser.add_argument('--memory', action='store_true',
+                        help='record peak memory and top allocation sites for each part (disables the result cache)')
+    parser.add_argument('--step-metrics', action='store_true',
+                        help='count and time the simulation steps of each part (disables the result cache)')
+    parser.add_argument('--memory-budget', metavar='MB', type=float,
+                        help='fail any part whose peak memory exceeds MB megabytes (implies --memory)')
+    parser.add_argument('--repeat', type=int, metavar='N',
+                        help='time each part N times and report the median (default: 1, or {} when saving or comparing a baseline; disables the result cache)'.format(baseline_repeat))
+    parser.add_argument('--warmup', type=int, metavar='N',
+                        help='run each part N untimed times before timing it (default: 0, or {} when saving or comparing a baseline; disables the result cache)'.format(baseline_warmup))
+    parser.add_argument('--save-baseline', metavar='FILE',
+                        help='store the median solve times of this run in the baseline FILE')
+    parser.add_argument('--compare', metavar='FILE',
+                        help='compare solve times against the baseline FILE and fail on regressions')
+    parser.add_argument('--threshold', type=float, default=baseline.default_threshold, metavar='FRACTION',
+                        help='flag solve times more than FRACTION slower than the baseline (default: %(default)s)')
+    parser.add_argument('--min-delta', type=float, default=baseline.default_min_delta, metavar='SECONDS',
+                        help='ignore slowdowns smaller than SECONDS (default: %(default)s)')
+    parser.add_argument('--no-cache', dest='cache', action='store_const', const='off', default='use',
+                        help='ignore the result cache')
+    parser.add_argument('--verify-cache', dest='cache', action='store_const', const='verify',
+                        help='run every job and check its result against the result cache')
+    parser.add_argument('--cache-dir', metavar='DIR', default=disk_cache.default_directory,
+                        help='result cache directory (default: %(default)s)')
+    parser.add_argument('--parse-cache', action='store_true',
+                        help='also cache parsed inputs on disk, in the cache directory')
+    parser.add_argument('--cache-size', metavar='MB', type=float, default=disk_cache.default_max_bytes / (1024.0 * 1024),
+                        help='evict least recently used results beyond MB megabytes (default: %(default)s)')
+    parser.add_argument('--snapshots', metavar='DIR',
+                        help='save snapshots of long simulations to DIR as they run, and resume unfinished jobs from them')
+    parser.add_argument('--snapshot-interval', metavar='SECONDS', type=float, default=snapshots.interval,
+                        help='seconds between snapshots of a simulation (default: %(default)s)')
+    parser.add_argument('--snapshot-size', metavar='MB', type=float, default=snapshots.max_bytes / (1024.0 * 1024),
+                        help='evict least recently used snapshots beyond MB megabytes (default: %(default)s)')
+    parser.add_argument('--generate', dest='scales', metavar='SCALE', type=int, action='append', default=[],
+                        help='also run against a synthetic input of size SCALE; may be repeated')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='random seed for the synthetic inputs (default: %(default)s)')
+    parser.add_argument('--scaling', action='store_true',
+                        help='run each part on generated inputs of increasing scale and fit its growth (implies --memory)')
+    parser.add_argument('--scaling-start', type=int, default=100, metavar='N',
+                        help='smallest scale in scaling mode (default: %(default)s)')
+    parser.add_argument('--scaling-factor', type=float, default=2.0, metavar='F',
+                        help='ratio between successive scales in scaling mode (default: %(default)s)')
+    parser.add_argument('--scaling-steps', type=int, default=6, metavar='N',
+                        help='number of scales in scaling mode (default: %(default)s)')
+    parser.add_argument('--scaling-report', metavar='FILE',
+                        help='write the scaling fits to FILE as JSON')
+    parser.add_argument('--batch', metavar='DIR_OR_GLOB',
+                        help='run the one DAY given against every input in directory DIR_OR_GLOB, or matching the glob pattern, in a pool of --workers processes')
+    parser.add_argument('--engine', default=reference_engine, choices=engine_names(),
+                        help='run this engine on the days which have it, and the reference engine on the rest (default: %(default)s)')
+    parser.add_argument('--differential', action='store_true',
+                        help='run every engine of each day on its samples and generated inputs, and check them against the reference engine')
+    parser.add_argument('--differential-seeds', type=int, default=differential_seeds, metavar='N',
+                        help='generated inputs per scale in differential mode, with seeds from --seed on (default: %(default)s)')
+    parser.add_argument('--python', dest='pythons', metavar='INTERPRETER', action='append',
+                        help='run everything under INTERPRETER instead, reporting every interpreter\'s records together; may be repeated')
+    return parser
+
+def main(argv=None):
+
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.pythons and (args.save_baseline or args.compare or args.scaling):
+        parser.error('--python cannot be combined with baselines or scaling mode')
+    if args.differential and args.scaling:
+        parser.error('--differential cannot be combined with scaling mode')
+    if args.batch is not None and (len(args.days) != 1 or args.differential or args.scaling):
+        parser.error('--batch needs exactly one DAY, and cannot be combined with differential or scaling mode')
+
+    args.format = args.format or ('jsonl' if args.batch is not None else 'json')
+
+    days = args.days or discover_days()
+    parts = tuple(sorted(set(args.parts or (1, 2))))
+
+    if args.batch is not None:
+        jobs = batch_jobs(days[0], parts, batch_inputs(args.batch), args.engine)
+        if not jobs:
+            parser.error('no inputs found in {}'.format(args.batch))
+    elif args.differential:
+        jobs = differential_jobs(
+                    days,
+                    parts,
+                    args.scales or differential_scales,
+                    range(args.seed, args.seed + args.differential_seeds),
+                    args.samples,
+                )
+    else:
+        jobs = [
+                    dict(job, engine=day_engine(day, args.engine))
+                    for day in days
+                    for job in day_jobs(day, parts, args.samples, args.data) + generated_jobs(day, parts, args.scales, args.seed)
+                ]
+
+    global parse_cache_directory, profile_directory, trace_memory, memory_budget, step_metrics, repeat, warmup, separate_instrumentation, cpu_limit, address_space_limit
+    if args.parse_cache:
+        parse_cache_directory = args.cache_dir
+    if args.profile:
+        profile_directory = os.path.abspath(args.profile)
+        args.cache = 'off'
+    if args.memory or args.memory_budget is not None or args.scaling:
+        trace_memory = True
+        args.cache = 'off'
+    if args.memory_budget is not None:
+        memory_budget = int(args.memory_budget * 1024 * 1024)
+    if args.scaling:
+        separate_instrumentation = True
+    if args.step_metrics:
+        step_metrics = True
+        args.cache = 'off'
+    if args.snapshots:
+        snapshots.directory = os.path.abspath(args.snapshots)
+        snapshots.interval = args.snapshot_interval
+        snapshots.max_bytes = int(args.snapshot_size * 1024 * 1024)
+    baselining = args.save_baseline or args.compare
+    if args.repeat is None:
+        args.repeat = baseline_repeat if baselining else 1
+    if args.warmup is None:
+        args.warmup = baseline_warmup if baselining else 0
+
+    if args.repeat != 1 or args.warmup or baselining:
+        repeat, warmup = args.repeat, args.warmup
+        args.cache = 'off'
+
+    if args.cpu_limit is not None:
+        cpu_limit = args.cpu_limit
+    if args.memory_limit is not None:
+        address_space_limit = int(args.memory_limit * 1024 * 1024)
+
+    baseline_times = baseline.load_baseline(args.compare) if args.compare else None
+
+    # batch mode is already parallel, and only needs a process per job to
+    # enforce limits
+
+    limited = args.timeout is not None or args.cpu_limit is not None or args.memory_limit is not None
+
+    if args.batch is not None and not limited:
+        run = lambda jobs: run_batch(jobs, args.workers)
+    elif args.parallel or args.batch is not None:
+        run = lambda jobs: run_parallel(jobs, args.workers, args.timeout)
+    elif limited:
+        run = lambda jobs: run_parallel(jobs, 1, args.timeout)
+    else:
+        run = run_serial
+
+    if args.pythons:
+        run = interpreter_run(args.pythons, argv)
+    elif args.scaling:
+        run = scaling_run(run, days, parts, scaling_scales(args.scaling_start, args.scaling_factor, args.scaling_steps), args.seed)
+    else:
+        run = cached_run(run, jobs, args.cache, args.cache_dir, int(args.cache_size * 1024 * 1024))
+
+    if args.differential and not args.pythons:
+        run = differential_run(run)
+
+    records = []
+
+    def run_jobs():
+        for record in run:
+            if baseline_times is not None:
+                baseline.compare_to_baseline(record, baseline_times, args.threshold, args.min_delta)
+            records.append(record)
+            # the child runners under `--python` report their own progress
+            if not args.pythons:
+                sys.stderr.write('{} part {} {}{}: {}{}{}{}{}\n'.format(
+                            record['day'], record['part'], record['input'],
+                            '' if record['engine'] in (None, reference_engine) else ' [{}]'.format(record['engine']),
+                            record['status'],
+                            '' if record['correct'] is not False else ' (expected {})'.format(record['expected']),
+                            '' if record['differential'] != 'mismatch' else ' (mismatch: {})'.format(record['error']),
+                            '' if not record['regression'] else ' (regression: {:.4f}s vs baseline {:.4f}s)'.format(record['solve_time'], record['baseline_time']),
+                            '' if not record['steps'] else ' ({} steps, {:.0f} steps/s, p50 {:.3g}s, p99 {:.3g}s)'.format(record['steps'], record['steps_per_second'], record['step_p50'], record['step_p99'])
+                        ))
+            yield record
+
+    output = open(args.output, 'w') if args.output else sys.stdout
+    writers[args.format](run_jobs(), output)
+    if args.output:
+        output.close()
+
+    if args.save_baseline:
+        baseline.save_baseline(args.save_baseline, records)
+
+    if args.scaling:
+        fits = scaling.fit_all(records)
+        sys.stderr.write(scaling.scaling_report(fits))
+        if args.scaling_report:
+            with open(args.scaling_report, 'w') as report:
+                json.dump(fits, report, indent=2, separators=(',', ': '), sort_keys=True)
+                report.write('\n')
+        return 1 if any(record['status'] in ('error', 'killed', 'crashed') for record in records) else 0
+
+    return 1 if any(record['status'] != 'ok' or record['correct'] is False or record['cache'] == 'mismatch' or record['regression'] or record['differential'] == 'mismatch' for record in records) else 0
+
+if __name__ == '__main__':
+
+    sys.exit(main())
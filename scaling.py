@@ -0,0 +1,179 @@
+
+import math
+
+########################################################################
+#
+# Empirical complexity estimates.
+#
+# Given a solver's solve times (and peak memory) at a series of input
+# scales `n`, fit two growth models by least squares in log space:
+#
+#   *   `n^k`: `log t = log c + k log n`
+#
+#   *   `n^k log n`: `log (t / log n) = log c + k log n`
+#
+# and report the one with the smaller residual.  Both models have two
+# parameters, so their residuals are comparable; the `n^k log n` model
+# wins for the sort-and-scan solvers whose plain power-law exponent
+# would otherwise come out as a misleading 1.1 or 1.2.
+#
+# Each fit is a dictionary:
+# ```
+#   {
+#       'day': 'day_NN', 'part': 1|2, 'points': <count>,
+#       'scales': [<n>, ...], 'solve_times': [<seconds>, ...],
+#       'model': 'n^k'|'n^k log n', 'exponent': <k>, 'coefficient': <c>,
+#       'residual': <RMS error of log t>,
+#       'memory_exponent': <k for peak memory, or None>,
+#       'largest_scale': <n>, 'largest_time': <seconds>
+#   }
+# ```
+#
+# Timings too small to measure reliably distort the fit, so points below
+# `min_time` seconds are dropped, as long as at least `min_points`
+# remain.
+
+min_points = 3
+
+min_time = 0.001
+
+models = ('n^k', 'n^k log n')
+
+########################################################################
+#
+# Least-squares fit of `y = a + b x`, returning `(a, b, rms residual)`.
+
+def linear_fit(xs, ys):
+
+    count = float(len(xs))
+    mean_x = sum(xs) / count
+    mean_y = sum(ys) / count
+
+    spread_x = sum((x - mean_x) ** 2 for x in xs)
+    slope = (
+                sum((x - mean_x) * (y - mean_y) for (x, y) in zip(xs, ys)) / spread_x
+                if spread_x
+                else 0.0
+            )
+    intercept = mean_y - slope * mean_x
+
+    residual = math.sqrt(sum((y - intercept - slope * x) ** 2 for (x, y) in zip(xs, ys)) / count)
+
+    return intercept, slope, residual
+
+########################################################################
+#
+# Fit one growth model to `values` measured at `scales`, returning
+# `(exponent, coefficient, residual)`.
+
+def fit_model(model, scales, values):
+
+    xs = [math.log(scale) for scale in scales]
+    ys = [
+                math.log(value) - (math.log(math.log(scale)) if model == 'n^k log n' else 0.0)
+                for (scale, value) in zip(scales, values)
+            ]
+
+    intercept, slope, residual = linear_fit(xs, ys)
+
+    return slope, math.exp(intercept), residual
+
+########################################################################
+#
+# Fit the records of one day and part, returning a fit dictionary, or
+# `None` if there are too few usable points.
+
+def fit_records(records):
+
+    points = sorted(
+                (record['scale'], record['solve_time'], record.get('peak_memory'))
+                for record in records
+                if record['status'] == 'ok' and record['scale'] > 1 and record['solve_time'] > 0
+            )
+
+    if len([point for point in points if point[1] >= min_time]) >= min_points:
+        points = [point for point in points if point[1] >= min_time]
+
+    if len(points) < min_points:
+        return None
+
+    scales = [scale for (scale, _, _) in points]
+    times = [solve_time for (_, solve_time, _) in points]
+
+    # Without `tracemalloc` a part that stays below the process's earlier
+    # peak shows no memory growth at all, so only measured points count.
+
+    memory = [(scale, peak_memory) for (scale, _, peak_memory) in points if peak_memory]
+
+    model, (exponent, coefficient, residual) = min(
+                ((model, fit_model(model, scales, times)) for model in models),
+                key=lambda fit: fit[1][2]
+            )
+
+    return {
+                'day': records[0]['day'],
+                'part': records[0]['part'],
+                'points': len(points),
+                'scales': scales,
+                'solve_times': times,
+                'model': model,
+                'exponent': exponent,
+                'coefficient': coefficient,
+                'residual': residual,
+                'memory_exponent': (
+                    fit_model('n^k', [scale for (scale, _) in memory], [peak_memory for (_, peak_memory) in memory])[0]
+                    if len(memory) >= min_points
+                    else None
+                ),
+                'largest_scale': scales[-1],
+                'largest_time': times[-1],
+            }
+
+########################################################################
+#
+# Fit every day and part in `records`, returning the fits ranked from
+# the fastest-growing to the slowest-growing.
+
+def fit_all(records):
+
+    groups = {}
+    for record in records:
+        groups.setdefault((record['day'], record['part']), []).append(record)
+
+    fits = [
+                fit
+                for key in sorted(groups)
+                for fit in [fit_records(groups[key])]
+                if fit is not None
+            ]
+
+    return sorted(
+                fits,
+                key=lambda fit: (fit['exponent'], fit['largest_time']),
+                reverse=True
+            )
+
+########################################################################
+#
+# Render the fits as a table, one line per day and part.
+
+def scaling_report(fits):
+    return '\n'.join(
+                [
+                    '{:<6} {:>4} {:>6} {:>10} {:>7}  {:<10} {:>10} {:>12}'.format(
+                        'day', 'part', 'points', 'largest n', 'time k', 'model', 'memory k', 'largest time'),
+                ]
+                + [
+                    '{:<6} {:>4} {:>6} {:>10} {:>7.2f}  {:<10} {:>10} {:>12.4f}'.format(
+                        fit['day'],
+                        fit['part'],
+                        fit['points'],
+                        fit['largest_scale'],
+                        fit['exponent'],
+                        fit['model'],
+                        '{:.2f}'.format(fit['memory_exponent']) if fit['memory_exponent'] is not None else '-',
+                        fit['largest_time'],
+                    )
+                    for fit in fits
+                ]
+            ) + '\n'
@@ -0,0 +1,231 @@
+
+import sys
+import pickle
+import os
+import hashlib
+import itertools
+import timeit
+
+import disk_cache
+
+########################################################################
+#
+# Checkpoints for long-running simulations.
+#
+# The long simulations (the recipes of day 14, the combat of day 15, the
+# lumber of day 18, the register machine of day 19) can run for minutes
+# or hours at scale, and a crash or timeout used to throw all of that
+# away.  With snapshots on, each long-running stream of states saves its
+# latest state every `interval` seconds, and a later run of the same job
+# picks the stream up from there rather than from the start.
+#
+# A stream is one run of a process from a start state: an `accumulate`
+# (see `support`), a cycle search (see `cycles`), or a register machine
+# run (see `vm`).  Each finds its snapshot by its key, a digest of:
+#
+#   *   the job's `context`, set by the runner with `begin` (the day,
+#       part, engine and input);
+#
+#   *   the kind of stream;
+#
+#   *   and its identity: its start state, and where its step function
+#       is defined along with any values the function closes over.
+#
+# so a stream only ever resumes a run of exactly the same process.
+#
+# A snapshot is `(step, state)`, pickled into the entry for its key in a
+# `disk_cache` directory, so it is written atomically and replaces the
+# stream's previous snapshot; a crash while writing leaves the previous
+# one intact.  Snapshots are never larger than the state they hold,
+# and the directory is held to `max_bytes` by evicting the least
+# recently used entries (see `disk_cache.cache_evict`), so a stream
+# whose state grows beyond that bound is simply not resumed.  A job's
+# snapshots are removed once it succeeds (see `finish`).
+#
+# Each context keeps a manifest entry listing the keys of its streams
+# with snapshots, read once by `begin`.  A stream only works out its key
+# (which pickles its start state) when the manifest says there may be a
+# snapshot to resume, or when it saves one; short streams, such as the
+# path searches inside a combat round, never get that far.
+#
+# With `directory` unset (the default), nothing is saved or resumed.
+
+directory = None
+
+interval = 60.0
+
+max_bytes = 1024 * 1024 * 1024
+
+# Streams look at the clock about every `check_interval` seconds,
+# however long their steps take.
+
+check_interval = 0.1
+
+context = None
+
+manifest = set()
+
+resumed = 0
+
+########################################################################
+#
+# Contexts.
+
+def context_key(name):
+    return disk_cache.cache_key('snapshots', sys.version_info[0], name)
+
+def begin(name):
+    global context, manifest, resumed
+    context = context_key(name)
+    manifest = set(disk_cache.cache_get(directory, context, ()))
+    resumed = 0
+
+def end():
+    global context, manifest
+    context = None
+    manifest = set()
+
+def finish():
+    for key in manifest | set(disk_cache.cache_get(directory, context, ())):
+        remove_entry(key)
+    remove_entry(context)
+    end()
+
+def remove_entry(key):
+    try:
+        os.remove(disk_cache.entry_filename(directory, key))
+    except OSError:
+        pass
+
+########################################################################
+#
+# Stream keys.
+#
+# Functions stand in by where they are defined and, for the function
+# that steps the stream, the values it closes over (functions among
+# those by where they are defined alone).  Other values which cannot be
+# pickled stand in by their type and `repr`.
+
+def code_location(function):
+    code = getattr(function, '__code__', None)
+    return (
+                getattr(function, '__module__', None),
+                getattr(function, '__name__', None),
+                code.co_filename if code is not None else None,
+                code.co_firstlineno if code is not None else None,
+            )
+
+def function_identity(function):
+    return code_location(function) + (
+                tuple(
+                    identity_bytes(code_location(value) if hasattr(value, '__code__') else value)
+                    for cell in (getattr(function, '__closure__', None) or ())
+                    for value in [cell.cell_contents]
+                ),
+            )
+
+def identity_bytes(value):
+    if hasattr(value, '__code__'):
+        value = code_location(value)
+    try:
+        return pickle.dumps(value, 2)
+    except Exception:
+        return '{}:{!r}'.format(type(value).__name__, value).encode('utf-8')
+
+def stream_key(kind, function, start, *extra):
+    digest = hashlib.sha256(context.encode('ascii'))
+    for value in (kind, function_identity(function), start) + extra:
+        digest.update(identity_bytes(value))
+    return digest.hexdigest()
+
+def active():
+    return directory is not None and context is not None
+
+########################################################################
+#
+# Resume and save.
+#
+# `resume` returns a stream's `(step, state)` snapshot, or `None`, and
+# counts the streams resumed since `begin` in `resumed`.
+
+def resume(key):
+    global resumed
+    if key not in manifest:
+        return None
+    found = disk_cache.cache_get(directory, key)
+    if found is not None:
+        resumed += 1
+    return found
+
+def save(key, step, state):
+    try:
+        disk_cache.cache_put(directory, key, (step, state))
+        saved = set(disk_cache.cache_get(directory, context, ()))
+        if key not in saved:
+            disk_cache.cache_put(directory, context, saved | set([key]))
+        disk_cache.cache_evict(directory, max_bytes)
+    except Exception:
+        pass
+
+# A stream's clock: `due(clock)`, called once per step, is true once
+# every `interval` seconds.  It looks at the time every `every` steps,
+# adjusting `every` (at most doubling it) to the steps taken per
+# `check_interval` seconds.
+
+def new_clock():
+    now = timeit.default_timer()
+    return { 'every': 1, 'countdown': 1, 'checked': now, 'due': now + interval }
+
+def due(clock):
+    clock['countdown'] -= 1
+    if clock['countdown'] > 0:
+        return False
+    now = timeit.default_timer()
+    elapsed = now - clock['checked']
+    clock['every'] = max(1, min(2 * clock['every'], int(clock['every'] * check_interval / elapsed) if elapsed > 0 else 2 * clock['every']))
+    clock['countdown'] = clock['every']
+    clock['checked'] = now
+    if now < clock['due']:
+        return False
+    clock['due'] = now + interval
+    return True
+
+########################################################################
+#
+# A resumable `accumulate`.
+#
+# `accumulate(iterable, func)` is run from the stream's snapshot if
+# there is one: the iterable's values for the steps already taken are
+# skipped, and the snapshot's state is yielded in place of the states
+# up to it.  Consumers which look at each state in turn (`dropwhile`,
+# `takewhile`, `next`) see the same states from there on; consumers
+# which count the states yielded must count them in the state instead
+# (see day 15).  `identity` is the step function that identifies the
+# stream, when `func` wraps it.
+
+def resumable_accumulate(accumulate, iterable, func, identity=None):
+
+    values = iter(iterable)
+    try:
+        start = next(values)
+    except StopIteration:
+        return
+
+    identity = identity or func
+    key = stream_key('accumulate', identity, start) if manifest else None
+    step = 0
+    state = start
+
+    found = resume(key) if key is not None else None
+    if found is not None:
+        (step, state) = found
+        next(itertools.islice(values, step, step), None)
+
+    clock = new_clock()
+
+    for state in accumulate(itertools.chain([state], values), func):
+        yield state
+        if due(clock):
+            key = key or stream_key('accumulate', identity, start)
+            save(key, step, state)
+        step += 1
@@ -0,0 +1,358 @@
+
+import os
+import os.path
+import sys
+import mmap
+import time
+import timeit
+import pprint
+import operator
+import functools
+import itertools
+import contextlib
+
+import tracing
+import snapshots
+
+########################################################################
+#
+# Shared support for the day_NN solvers.
+#
+# Every solver used to carry its own copy of `accumulate`, the debugging
+# versions of `reduce` and `accumulate`, `debug_value`, and a main
+# controller to find and run its samples and real input.  They live here
+# now, so a process running many days defines them once.
+#
+# Solvers pull in the plain versions, and swap in the debugging versions
+# at import time only when debugging, so the debugging versions cost
+# nothing when they are off:
+# ```
+#   from support import accumulate, reduce
+#
+#   DEBUGGING = False
+#
+#   if DEBUGGING:
+#       from support import debug_accumulate as accumulate, debug_reduce as reduce
+# ```
+
+########################################################################
+#
+# `accumulate` and `reduce`.
+#
+# Python 3's `itertools.accumulate` is used where it exists; otherwise
+# this is the pure-Python equivalent from the Python 3 documentation.
+# Either way, `accumulate` itself goes through the step metrics hook
+# below, and through `snapshots` when they are on.
+
+try:
+
+    from itertools import accumulate as plain_accumulate
+
+except ImportError:
+
+    def plain_accumulate(iterable, func=operator.add):
+        'Return running totals'
+        # accumulate([1,2,3,4,5]) --> 1 3 6 10 15
+        # accumulate([1,2,3,4,5], operator.mul) --> 1 2 6 24 120
+        it = iter(iterable)
+        try:
+            total = next(it)
+        except StopIteration:
+            return
+        yield total
+        for element in it:
+            total = func(total, element)
+            yield total
+
+def accumulate(iterable, func=operator.add):
+    step = func if metrics is None else metered_step(func, metrics)
+    if not snapshots.active():
+        return plain_accumulate(iterable, step)
+    return snapshots.resumable_accumulate(plain_accumulate, iterable, step, identity=func)
+
+reduce = functools.reduce
+
+########################################################################
+#
+# Step metrics.
+#
+# Most simulations are an `accumulate` of a step function over a
+# counter, so whether a run got slower because it took more steps or
+# because its steps got slower shows up in the steps themselves.  When
+# `metrics` is set to a dictionary from `new_metrics`, every step of
+# every `accumulate` started while it is set is counted and timed:
+# ```
+#   {
+#       'steps': <steps taken>, 'time': <seconds spent in steps>,
+#       'samples': <a sample of step times>, 'stride': <steps per sample>,
+#       'active': <whether a step is running>
+#   }
+# ```
+# Only the outermost running step is counted, so the steps of an
+# `accumulate` run inside another's step (a path search inside a combat
+# round, say) are part of the outer step's time, not steps of their own.
+#
+# Step times are sampled every `stride` steps; when `metrics_samples`
+# samples have been kept, every other one is dropped and the stride is
+# doubled, so the sample stays spread evenly over the whole run in
+# bounded memory.  `metrics_summary` reports the steps, the steps per
+# second spent stepping, and the median and 99th percentile step times.
+#
+# Simulations which are not an `accumulate` report their steps with
+# `record_steps`, which counts a batch of steps timed together, at their
+# average step time (see `vm`, whose steps are instructions).
+#
+# With `metrics` unset (the default), `accumulate` checks it once per
+# call and the steps run untouched.
+
+metrics = None
+
+metrics_samples = 4096
+
+def new_metrics():
+    return { 'steps': 0, 'time': 0.0, 'samples': [], 'stride': 1, 'active': False }
+
+def record_step(metrics, step_time):
+    metrics['steps'] += 1
+    metrics['time'] += step_time
+    if metrics['steps'] % metrics['stride'] == 0:
+        metrics['samples'].append(step_time)
+        if len(metrics['samples']) >= metrics_samples:
+            metrics['samples'] = metrics['samples'][::2]
+            metrics['stride'] *= 2
+
+def record_steps(metrics, steps, steps_time):
+    step_time = steps_time / steps if steps else 0.0
+    while steps:
+        # take the steps up to the next one sampled, or all that are left
+        taken = min(steps, metrics['stride'] - metrics['steps'] % metrics['stride'])
+        metrics['steps'] += taken
+        metrics['time'] += taken * step_time
+        steps -= taken
+        if metrics['steps'] % metrics['stride'] == 0:
+            metrics['samples'].append(step_time)
+            if len(metrics['samples']) >= metrics_samples:
+                metrics['samples'] = metrics['samples'][::2]
+                metrics['stride'] *= 2
+
+def metered_step(func, metrics):
+    timer = timeit.default_timer
+    def step(state, value):
+        if metrics['active']:
+            return func(state, value)
+        metrics['active'] = True
+        t = timer()
+        try:
+            return func(state, value)
+        finally:
+            record_step(metrics, timer() - t)
+            metrics['active'] = False
+    return step
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else None
+
+def metrics_summary(metrics):
+    return {
+                'steps': metrics['steps'],
+                'steps_per_second': metrics['steps'] / metrics['time'] if metrics['time'] else None,
+                'step_p50': percentile(metrics['samples'], 0.5),
+                'step_p99': percentile(metrics['samples'], 0.99),
+            }
+
+########################################################################
+#
+# Python 2 and 3 compatibility.
+#
+# Solvers run unchanged under both, so they take `range` from here:
+# Python 2's lazy `xrange` where it exists, otherwise the builtin.
+# Solvers which count into the billions (or stop part-way through a
+# range) must not build the whole list in Python 2.
+
+try:
+
+    range = xrange
+
+except NameError:
+
+    range = range
+
+########################################################################
+#
+# Debugging versions of `accumulate` and `reduce`, which offer each
+# step's incoming state and value to a sampling tracer (see `tracing`),
+# dumping it if an exception escapes the step, and `debug_value`, which
+# prints a value on its way through an expression.
+#
+# Every step is still traced, but only the sampled ones are kept, and
+# nothing is formatted until the tracer is dumped at exit, so they are
+# cheap enough to leave on.  To sample, say, every 1000th step:
+# ```
+#   if DEBUGGING:
+#       import tracing
+#       tracing.every = 1000
+# ```
+
+def debug_accumulate(iterable, func=operator.add):
+    tracer = tracing.tracer('accumulate')
+    def debug(state, value):
+        tracing.trace_step(tracer, state, value)
+        return func(state, value)
+    try:
+        for state in accumulate(iterable, debug):
+            yield state
+    except Exception:
+        tracing.dump(tracer, reason='exception')
+        raise
+
+def debug_reduce(func, *args):
+    tracer = tracing.tracer('reduce')
+    def debug(state, value):
+        tracing.trace_step(tracer, state, value)
+        return func(state, value)
+    try:
+        return reduce(debug, *args)
+    except Exception:
+        tracing.dump(tracer, reason='exception')
+        raise
+
+def debug_value(prefix, value):
+    sys.stderr.write('{}{}\n'.format(prefix, value))
+    return value
+
+########################################################################
+#
+# Input loading.
+#
+# A day's files are named after the part of the solver's filename up
+# to the first dot, so `day_09.blist.py` shares `day_09`'s inputs.
+#
+# There are two sample layouts in the repository:
+#
+#   *   The older layout has a single `day_NN.sample` used by both
+#       parts, optionally with a `day_NN.sample.2` used instead for
+#       part 2.  There are no expected-results files for these.
+#
+#   *   The newer layout has numbered samples `day_NN.sample.M`, each
+#       with optional `day_NN.sample.results.partP.M` expected results.
+#
+# Every day also has a `day_NN.input` real input.
+
+def base_filename(solver_filename):
+    return os.path.join(
+                os.path.dirname(os.path.abspath(solver_filename)),
+                os.path.basename(solver_filename).split('.')[0]
+            )
+
+def read_input(input_filename):
+    with open(input_filename) as input_file:
+        return input_file.read()
+
+# Map an input file into memory read-only, for solvers whose parsers
+# can work on a buffer (typically with a bytes regex's `finditer`)
+# without first copying the whole file into a string.  Solvers opt in by
+# setting `mapped_input = True`.
+#
+# The buffer is only valid inside the `with` block, so a mapped-input
+# parser must not hold on to it.  An empty file cannot be mapped, and is
+# passed as an empty string.
+
+@contextlib.contextmanager
+def mapped_file(input_filename):
+    with open(input_filename, 'rb') as input_file:
+        if os.fstat(input_file.fileno()).st_size == 0:
+            yield b''
+            return
+        buffer = mmap.mmap(input_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield buffer
+        finally:
+            buffer.close()
+
+def parse_input(process_input_data, input_filename, mapped=False):
+    if not mapped:
+        return process_input_data(read_input(input_filename))
+    with mapped_file(input_filename) as buffer:
+        return process_input_data(buffer)
+
+# Read an expected-results file, returning `None` if it does not exist.
+# Results are normally integers; anything else is returned as a string.
+
+def read_expected(results_filename):
+    if not os.path.exists(results_filename):
+        return None
+    expected = read_input(results_filename).strip()
+    try:
+        return int(expected)
+    except ValueError:
+        return expected
+
+# Return a list of `(sample filename, expected result)` for one part.
+
+def sample_inputs(base_filename, part):
+
+    if os.path.exists('{}.sample'.format(base_filename)):
+        if part == 2 and os.path.exists('{}.sample.2'.format(base_filename)):
+            return [('{}.sample.2'.format(base_filename), None)]
+        return [('{}.sample'.format(base_filename), None)]
+
+    return [
+                (
+                    '{}.sample.{}'.format(base_filename, sample_num),
+                    read_expected('{}.sample.results.part{}.{}'.format(base_filename, part, sample_num)),
+                )
+                for sample_num in itertools.takewhile(lambda num:os.path.exists('{}.sample.{}'.format(base_filename, num)), itertools.count(1))
+            ]
+
+########################################################################
+#
+# Main controller.
+#
+# Run each part against the day's samples and then its real input,
+# printing the time taken and the result, and noting any sample result
+# which differs from the expected one.  Each file is parsed once.
+#
+# `arguments` maps a part number to the extra arguments for the part,
+# as `{ 'sample': (...), 'input': (...) }`.  When `debugging`, the
+# input is rendered with `render` (if given) before each run, and
+# results are pretty-printed.  With `mapped`, inputs are passed to
+# `process_input_data` as memory-mapped buffers.
+
+def main(solver_filename, process_input_data, part_1, part_2, arguments=None, parts=(1, 2), samples=True, data=True, debugging=False, render=None, mapped=False):
+
+    arguments = arguments or {}
+    base = base_filename(solver_filename)
+    solvers = { 1: part_1, 2: part_2 }
+    parsed = {}
+
+    def run(part, kind, input_filename, label, expected=None):
+
+        if input_filename not in parsed:
+            parsed[input_filename] = parse_input(process_input_data, input_filename, mapped)
+
+        if debugging:
+            sys.stderr.write('\nprocessing {}{}\n'.format(input_filename, ' with expected results {}'.format(expected) if expected is not None else ''))
+            if render is not None:
+                sys.stderr.write('{}\n'.format(render(parsed[input_filename])))
+
+        t = time.time()
+        result = solvers[part](parsed[input_filename], *arguments.get(part, {}).get(kind, ()))
+        t = time.time() - t
+
+        sys.stdout.write('{}: {}: part {} = {}{}\n'.format(
+                    t,
+                    label,
+                    part,
+                    '\n' + pprint.pformat(result) + '\n' if debugging else result,
+                    ' (expected {})'.format(expected) if expected is not None and result != expected else ''
+                ))
+
+    for part in parts:
+
+        if samples:
+            for sample_num, (sample_filename, expected) in enumerate(sample_inputs(base, part), 1):
+                run(part, 'sample', sample_filename, 'sample {}'.format(sample_num), expected)
+
+        if data:
+            run(part, 'input', '{}.input'.format(base), 'input data')
@@ -0,0 +1,114 @@
+
+import sys
+import atexit
+import pprint
+import collections
+
+########################################################################
+#
+# Sampling step tracer.
+#
+# The debugging versions of `reduce` and `accumulate` (see `support`)
+# used to pretty-print the whole state on every step, which for the
+# days with large states (the maps of days 13, 15 and 17) made a
+# debugging run thousands of times slower than a normal one.  Instead,
+# each step is now offered to a tracer, which keeps a reference to the
+# step's state and value in a bounded ring buffer when the step is
+# sampled, and formats nothing until the buffer is dumped.
+#
+# A step is sampled when its number is a multiple of `every`, or, if a
+# `predicate` is set, when `predicate(state, value)` is true.  The
+# buffer holds the last `capacity` sampled steps, so a dump shows how a
+# run ended (or failed) without keeping its whole history.  The most
+# recent step is always kept as well, sampled or not, so a dump after an
+# exception shows the step that raised it.
+#
+# Tracers are dumped to stderr when the process exits, and by the
+# debugging `reduce` and `accumulate` when an exception passes through
+# them; a dump empties the buffer, so a nested reduction's failure is
+# reported once.  States are kept by reference, which is fine for the
+# solvers' immutable states.  A solver whose states are mutated after
+# their step (day 14's recipes) sets `freeze`, a function from a state
+# to an immutable summary of it, which is kept in its place; it runs
+# on every step, so it should be cheap.
+#
+# Each tracer is a dictionary:
+# ```
+#   {
+#       'name': <name>, 'every': <N>, 'predicate': <function or None>,
+#       'freeze': <function or None>,
+#       'steps': <steps seen>, 'buffer': <deque of (step, state, value)>,
+#       'last': <(step, state, value) of the most recent step, or None>
+#   }
+# ```
+# and `tracer(name)` returns the one for `name`, creating it with the
+# module's current `every`, `capacity`, `predicate` and `freeze`
+# settings; change those before the first step to trace differently,
+# e.g. in a solver's `if DEBUGGING:` block.
+
+every = 1
+
+capacity = 16
+
+predicate = None
+
+freeze = None
+
+tracers = collections.OrderedDict()
+
+def tracer(name):
+    if name not in tracers:
+        tracers[name] = {
+                    'name': name,
+                    'every': every,
+                    'predicate': predicate,
+                    'freeze': freeze,
+                    'steps': 0,
+                    'buffer': collections.deque(maxlen=capacity),
+                    'last': None,
+                }
+    return tracers[name]
+
+########################################################################
+#
+# Offer one step to a tracer.
+
+def trace_step(tracer, state, value):
+    tracer['steps'] += 1
+    tracer['last'] = (tracer['steps'], state if tracer['freeze'] is None else tracer['freeze'](state), value)
+    if (
+                tracer['steps'] % tracer['every'] == 0
+                if tracer['predicate'] is None
+                else tracer['predicate'](state, value)
+            ):
+        tracer['buffer'].append(tracer['last'])
+
+########################################################################
+#
+# Dump a tracer's sampled steps and its most recent step, oldest first,
+# and empty it.
+
+def dump(tracer, output=None, reason='exit'):
+
+    output = output or sys.stderr
+
+    if tracer['last'] is None:
+        return
+
+    steps = list(tracer['buffer'])
+    if not steps or steps[-1] is not tracer['last']:
+        steps.append(tracer['last'])
+
+    output.write('>>{}<< {} of {} steps, dumped on {}\n'.format(
+                tracer['name'], len(steps), tracer['steps'], reason))
+    for (step, state, value) in steps:
+        output.write('>>{}<< step {} value={!r}\n{}\n'.format(tracer['name'], step, value, pprint.pformat(state)))
+
+    tracer['buffer'].clear()
+    tracer['last'] = None
+
+def dump_all(output=None, reason='exit'):
+    for tracer in tracers.values():
+        dump(tracer, output, reason)
+
+atexit.register(dump_all)
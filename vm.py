@@ -0,0 +1,262 @@
+
+import os.path
+import sys
+import timeit
+import argparse
+import operator
+
+import support
+import snapshots
+
+########################################################################
+#
+# Register machine shared by days 16 and 19.
+#
+# Both days use the same sixteen instructions, and each used to define
+# them over immutable registers: day 16 rebuilt its register list by
+# slicing, and day 19 rebuilt a dictionary of its registers, on every
+# instruction.  Here the registers are a plain list updated in place,
+# and each instruction is a function `(registers, a, b, c)` which stores
+# its result in register `c`, so an instruction costs one store rather
+# than a copy of every register.
+#
+# A program is decoded once, when the machine is made: each instruction
+# becomes a `(function, a, b, c)` tuple, so running it looks nothing up
+# by name.  Instructions may be given by name (day 19) or by opcode
+# number, with a list of names in opcode order (day 16).  A program may
+# start with directives; the only one is `#ip N`, which binds the
+# instruction pointer to register `N`.
+#
+# A machine is a dictionary:
+# ```
+#   {
+#       'program': [(function, a, b, c), ...],
+#       'registers': [<value>, ...],
+#       'ip': <instruction pointer>,
+#       'ip_register': <register bound to the instruction pointer, or None>,
+#       'executed': <instructions executed so far>
+#   }
+# ```
+#
+# The instruction pointer starts at 0.  While it is bound to a register,
+# it is written to that register before each instruction and read back
+# from it afterwards; either way it then moves on to the next
+# instruction, and the machine halts when it leaves the program.
+
+setitem = operator.setitem
+
+instructions = {
+    'addr': lambda regs, a, b, c: setitem(regs, c, regs[a] + regs[b]),
+    'addi': lambda regs, a, b, c: setitem(regs, c, regs[a] + b),
+    'mulr': lambda regs, a, b, c: setitem(regs, c, regs[a] * regs[b]),
+    'muli': lambda regs, a, b, c: setitem(regs, c, regs[a] * b),
+    'banr': lambda regs, a, b, c: setitem(regs, c, regs[a] & regs[b]),
+    'bani': lambda regs, a, b, c: setitem(regs, c, regs[a] & b),
+    'borr': lambda regs, a, b, c: setitem(regs, c, regs[a] | regs[b]),
+    'bori': lambda regs, a, b, c: setitem(regs, c, regs[a] | b),
+    'setr': lambda regs, a, b, c: setitem(regs, c, regs[a]),
+    'seti': lambda regs, a, b, c: setitem(regs, c, a),
+    'gtir': lambda regs, a, b, c: setitem(regs, c, 1 if a > regs[b] else 0),
+    'gtri': lambda regs, a, b, c: setitem(regs, c, 1 if regs[a] > b else 0),
+    'gtrr': lambda regs, a, b, c: setitem(regs, c, 1 if regs[a] > regs[b] else 0),
+    'eqir': lambda regs, a, b, c: setitem(regs, c, 1 if a == regs[b] else 0),
+    'eqri': lambda regs, a, b, c: setitem(regs, c, 1 if regs[a] == b else 0),
+    'eqrr': lambda regs, a, b, c: setitem(regs, c, 1 if regs[a] == regs[b] else 0),
+}
+
+directives = ('#ip',)
+
+instruction_names = dict((function, name) for (name, function) in instructions.items())
+
+########################################################################
+#
+# Run one instruction, given as `(opcode, a, b, c)`, against a copy of
+# `registers`, returning the copy.
+
+def apply(function, registers, instruction):
+    registers = list(registers)
+    function(registers, *instruction[1:])
+    return registers
+
+########################################################################
+#
+# Decode a program and make a machine to run it.
+#
+# Each line of `program` is `(name or opcode, a, b, c)`, or a directive
+# `('#ip', N)` at the start.  `registers` is the initial register list
+# (which the machine then owns), or a number of registers all set to 0.
+
+def decode(program, opcodes=None):
+    return [
+                (instructions[opcodes[line[0]] if opcodes is not None else line[0]],) + tuple(line[1:4])
+                for line in program
+            ]
+
+def new_machine(program, registers=6, opcodes=None):
+
+    ip_register = None
+    start = 0
+    while start < len(program) and program[start][0] in directives:
+        ip_register = program[start][1]
+        start += 1
+
+    return {
+                'program': decode(program[start:], opcodes),
+                'registers': [0] * registers if isinstance(registers, int) else registers,
+                'ip': 0,
+                'ip_register': ip_register,
+                'executed': 0,
+            }
+
+########################################################################
+#
+# Run a machine until it halts, or for at most `limit` instructions,
+# returning the machine.  A machine stopped by `limit` can be run on.
+#
+# With snapshots on (see `snapshots`), the machine runs
+# `snapshot_instructions` at a time, saving its registers, instruction
+# pointer and count of instructions executed between runs, and resumes
+# from them (unless they are beyond `limit`).
+#
+# With step metrics on (see `support.metrics`), each instruction is a
+# step: the machine runs `metered_instructions` at a time, and each run
+# is recorded as that many steps at their average time, as timing every
+# instruction would cost more than running it.  A machine run inside an
+# `accumulate` step is part of that step instead.
+
+snapshot_instructions = 1000000
+
+metered_instructions = 10000
+
+def run(machine, limit=None):
+    if not snapshots.active():
+        return metered_run(machine, limit)
+    return resumable_run(machine, limit)
+
+def metered_run(machine, limit=None):
+
+    metrics = support.metrics
+    if metrics is None or metrics['active']:
+        return run_machine(machine, limit)
+
+    end = machine['executed'] + limit if limit is not None else None
+
+    metrics['active'] = True
+    try:
+        while 0 <= machine['ip'] < len(machine['program']):
+            chunk = metered_instructions if end is None else min(metered_instructions, end - machine['executed'])
+            if chunk <= 0:
+                break
+            executed = machine['executed']
+            t = timeit.default_timer()
+            run_machine(machine, chunk)
+            support.record_steps(metrics, machine['executed'] - executed, timeit.default_timer() - t)
+    finally:
+        metrics['active'] = False
+
+    return machine
+
+def run_machine(machine, limit=None):
+
+    program = machine['program']
+    registers = machine['registers']
+    ip_register = machine['ip_register']
+    size = len(program)
+    ip = machine['ip']
+    remaining = limit if limit is not None else -1
+
+    if ip_register is None:
+        while 0 <= ip < size and remaining:
+            function, a, b, c = program[ip]
+            function(registers, a, b, c)
+            ip += 1
+            remaining -= 1
+    else:
+        while 0 <= ip < size and remaining:
+            registers[ip_register] = ip
+            function, a, b, c = program[ip]
+            function(registers, a, b, c)
+            ip = registers[ip_register] + 1
+            remaining -= 1
+
+    machine['executed'] += (limit if limit is not None else -1) - remaining
+    machine['ip'] = ip
+
+    return machine
+
+def resumable_run(machine, limit=None):
+
+    stream = snapshots.stream_key(
+                'vm',
+                run,
+                [(instruction_names[line[0]],) + tuple(line[1:]) for line in machine['program']],
+                machine['registers'],
+                machine['ip'],
+                machine['ip_register'],
+                machine['executed'],
+            )
+    end = machine['executed'] + limit if limit is not None else None
+
+    found = snapshots.resume(stream)
+    if found is not None and (end is None or found[0] <= end):
+        (_, (registers, machine['ip'], machine['executed'])) = found
+        machine['registers'][:] = registers
+
+    clock = snapshots.new_clock()
+
+    while 0 <= machine['ip'] < len(machine['program']):
+        chunk = snapshot_instructions if end is None else min(snapshot_instructions, end - machine['executed'])
+        if chunk <= 0:
+            break
+        metered_run(machine, chunk)
+        if snapshots.due(clock):
+            snapshots.save(stream, machine['executed'], (list(machine['registers']), machine['ip'], machine['executed']))
+
+    return machine
+
+########################################################################
+#
+# Benchmark: run day 19 style programs (by default day 19's input, with
+# part 2's initial registers, which runs for far longer than anyone will
+# wait) for a fixed number of instructions, and report the machine's
+# speed in instructions per second.
+#
+# Programs are parsed by day 19's solver, which is imported here rather
+# than at the top, as it imports this module.
+
+default_program = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'day_19.input')
+
+def benchmark(filename, instructions_limit, register_0=1):
+
+    import day_19
+
+    machine = new_machine(
+                support.parse_input(day_19.process_input_data, filename),
+                [register_0] + [0] * 5
+            )
+
+    t = timeit.default_timer()
+    run(machine, instructions_limit)
+    t = timeit.default_timer() - t
+
+    return machine['executed'], t
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(description='Benchmark the day 16 and day 19 register machine.')
+    parser.add_argument('programs', metavar='PROGRAM', nargs='*', default=[default_program],
+                        help='program files (default: day 19\'s input)')
+    parser.add_argument('--instructions', type=int, default=5000000, metavar='N',
+                        help='instructions to run per program (default: %(default)s)')
+    parser.add_argument('--register-0', type=int, default=1, metavar='VALUE',
+                        help='initial value of register 0 (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    for filename in args.programs:
+        executed, t = benchmark(filename, args.instructions, args.register_0)
+        sys.stdout.write('{}: {} instructions in {:.3f}s: {:.0f} instructions/s\n'.format(
+                    filename, executed, t, executed / t if t else float('inf')))
+
+if __name__ == '__main__':
+
+    main()